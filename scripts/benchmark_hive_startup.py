@@ -0,0 +1,90 @@
+'''
+Benchmark opening a SlabHive which contains a large number of keys.
+
+Populates a hive slab with --users user vars dicts of --vars keys each
+( 1M keys by default ) and then measures the time to open the hive, open
+a single vars dict, and get() values which were never opened.  With --full
+the time to load the entire tree ( as the hive did at startup before nodes
+were loaded on demand ) is measured with saveHiveTree() for comparison.
+
+Usage:
+
+    python -m scripts.benchmark_hive_startup [--users 1000] [--vars 1000] [--full]
+'''
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+import synapse.common as s_common
+
+import synapse.lib.hive as s_hive
+import synapse.lib.const as s_const
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdbslab as s_slab
+
+def genrows(opts):
+    for i in range(opts.users):
+        iden = s_common.guid(i)
+        yield s_hive.getHiveKey(('auth', 'users', iden)), s_msgpack.en(f'user{i}')
+        for j in range(opts.vars):
+            full = ('auth', 'users', iden, 'vars', f'var{j:06d}')
+            yield s_hive.getHiveKey(full), s_msgpack.en({'valu': j, 'user': i})
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_hive_startup')
+    pars.add_argument('--users', type=int, default=1000, help='The number of user vars dicts.')
+    pars.add_argument('--vars', type=int, default=1000, help='The number of keys in each vars dict.')
+    pars.add_argument('--gets', type=int, default=10000, help='The number of random get() calls.')
+    pars.add_argument('--full', default=False, action='store_true',
+                      help='Also measure loading the entire tree ( requires several GB of memory for 1M keys ).')
+    opts = pars.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as dirn:
+
+        async with await s_slab.Slab.anit(dirn, map_size=s_const.gibibyte) as slab:
+            db = slab.initdb('hive')
+            rows = list(genrows(opts))
+            rows.sort()
+            for i in range(0, len(rows), 100000):
+                slab.putmulti(rows[i:i + 100000], db=db)
+            slab.forcecommit()
+            print(f'populated {len(rows)} hive keys')
+
+        async with await s_slab.Slab.anit(dirn, map_size=s_const.gibibyte) as slab:
+
+            db = slab.initdb('hive')
+
+            t0 = time.perf_counter()
+            hive = await s_hive.SlabHive.anit(slab, db=db)
+            t1 = time.perf_counter()
+            print(f'startup: {t1 - t0:.4f}s nodes={len(hive.nodes)}')
+
+            iden = s_common.guid(0)
+            t0 = time.perf_counter()
+            pvars = await hive.dict(('auth', 'users', iden, 'vars'))
+            t1 = time.perf_counter()
+            print(f'open one vars dict: {t1 - t0:.4f}s keys={len(list(pvars.items()))} nodes={len(hive.nodes)}')
+
+            fulls = [('auth', 'users', s_common.guid(random.randrange(opts.users)), 'vars',
+                      f'var{random.randrange(opts.vars):06d}') for i in range(opts.gets)]
+
+            t0 = time.perf_counter()
+            for full in fulls:
+                await hive.get(full)
+            t1 = time.perf_counter()
+            print(f'get: {opts.gets / (t1 - t0):.0f} gets/sec nodes={len(hive.nodes)}')
+
+            if opts.full:
+                t0 = time.perf_counter()
+                await hive.saveHiveTree(())
+                t1 = time.perf_counter()
+                print(f'load entire tree: {t1 - t0:.4f}s nodes={len(hive.nodes)}')
+
+            await hive.fini()
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
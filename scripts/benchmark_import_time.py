@@ -0,0 +1,82 @@
+'''
+Benchmark the time to import synapse.cortex and the CLI tools.
+
+Each module is imported in a fresh python process ( --runs times ) and the
+best and median times are reported, along with the slowest modules from
+python -X importtime for the first module.
+
+Usage:
+
+    python -m scripts.benchmark_import_time [--runs 5] [modname ...]
+'''
+import sys
+import argparse
+import statistics
+import subprocess
+
+mods = (
+    'synapse.cortex',
+    'synapse.lib.scrape',
+    'synapse.tools.cmdr',
+    'synapse.tools.feed',
+    'synapse.tools.backup',
+    'synapse.tools.csvtool',
+    'synapse.tools.pushfile',
+    'synapse.tools.cellauth',
+)
+
+code = '''
+import time
+tick = time.perf_counter()
+import %s
+print(time.perf_counter() - tick)
+'''
+
+def timeImport(name):
+    outp = subprocess.check_output([sys.executable, '-c', code % (name,)])
+    return float(outp.strip())
+
+def getImportTimes(name):
+    '''
+    Return a list of (usecs, modname) tuples for the modules imported by a module ( slowest first ).
+    '''
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {name}'],
+                          stderr=subprocess.PIPE, check=True)
+
+    retn = []
+    for line in proc.stderr.decode().splitlines():
+
+        if not line.startswith('import time:'):
+            continue
+
+        parts = line[12:].split('|')
+        if not parts[0].strip().isdigit():
+            continue
+
+        retn.append((int(parts[0]), parts[2].strip()))
+
+    retn.sort(reverse=True)
+    return retn
+
+def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_import_time')
+    pars.add_argument('--runs', type=int, default=5, help='The number of imports of each module.')
+    pars.add_argument('--top', type=int, default=10, help='The number of slowest modules to show.')
+    pars.add_argument('mods', nargs='*', default=mods, help='The modules to import.')
+    opts = pars.parse_args(argv)
+
+    for name in opts.mods:
+        # the first import warms the filesystem ( and synapse cache ) for the module
+        timeImport(name)
+        times = [timeImport(name) for i in range(opts.runs)]
+        print(f'{name:<28} best={min(times):.3f}s median={statistics.median(times):.3f}s')
+
+    print(f'slowest modules ( self time ) imported by {opts.mods[0]}:')
+    for usecs, modname in getImportTimes(opts.mods[0])[:opts.top]:
+        print(f'    {usecs / 1000000:.3f}s {modname}')
+
+    return 0
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,86 @@
+'''
+Benchmark Link message throughput over a unix socket and TCP on localhost.
+
+Usage:
+
+    python -m scripts.benchmark_link [--size 1024] [--chunk 1048576]
+'''
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+
+import synapse.lib.link as s_link
+import synapse.lib.const as s_const
+
+async def transfer(opts, listen, connect):
+    '''
+    Send --size MiB as ('chunk', bytes) messages and return the elapsed time.
+    '''
+    byts = os.urandom(opts.chunk)
+    count = (opts.size * s_const.mebibyte) // opts.chunk
+
+    done = asyncio.Event()
+
+    async def onlink(link):
+
+        recv = 0
+        while recv < count:
+            mesg = await link.rx()
+            assert mesg[0] == 'chunk'
+            recv += 1
+
+        await link.tx(('done', {}))
+        await link.fini()
+
+    server = await listen(onlink)
+    link = await connect(server)
+
+    t0 = time.perf_counter()
+
+    for i in range(count):
+        await link.tx(('chunk', byts))
+
+    mesg = await link.rx()
+    assert mesg[0] == 'done'
+
+    took = time.perf_counter() - t0
+
+    await link.fini()
+    server.close()
+
+    return took
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_link')
+    pars.add_argument('--size', type=int, default=1024, help='MiB to transfer.')
+    pars.add_argument('--chunk', type=int, default=s_const.mebibyte, help='Bytes per message.')
+    opts = pars.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as dirn:
+
+        path = os.path.join(dirn, 'sock')
+
+        async def unixlisten(onlink):
+            return await s_link.unixlisten(path, onlink)
+
+        async def unixconnect(server):
+            return await s_link.unixconnect(path)
+
+        async def tcplisten(onlink):
+            return await s_link.listen('127.0.0.1', 0, onlink)
+
+        async def tcpconnect(server):
+            host, port = server.sockets[0].getsockname()
+            return await s_link.connect(host, port)
+
+        for name, listen, connect in (('unix', unixlisten, unixconnect), ('tcp', tcplisten, tcpconnect)):
+            took = await transfer(opts, listen, connect)
+            rate = opts.size / took
+            print(f'{name:<5} {opts.size}MiB in {opts.chunk} byte messages: {took:.2f}s ({rate:.0f} MiB/sec)')
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,87 @@
+'''
+Benchmark storm parser construction, query parsing, and cortex startup.
+
+Usage:
+
+    python -m scripts.benchmark_storm_parse [--count 5]
+'''
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import synapse.cortex as s_cortex
+
+import synapse.lib.grammar as s_grammar
+
+Queries = (
+    'inet:ipv4',
+    'inet:fqdn=woot.com -> inet:dns:a -> inet:ipv4',
+    '[ inet:ipv4=1.2.3.4 :asn=10 +#foo.bar=(2018, 2019) ]',
+    'inet:fqdn | tee { -> inet:dns:a } { -> inet:dns:ns } | uniq | limit 100',
+    '$x=$lib.set() inet:ipv4 $x.add(:asn) for $a in $x { [ inet:asn=$a ] }',
+    'file:bytes#mal.apt1 -> inet:dns:request +:query:name*re=".*woot.*" | max :time',
+)
+
+def timeImport(nocache):
+    '''
+    Time importing the grammar module in a fresh interpreter.
+    '''
+    if nocache:
+        try:
+            os.unlink(s_grammar.LarkCachePath)
+        except FileNotFoundError:
+            pass
+
+    code = 'import time; t0 = time.perf_counter(); import synapse.lib.grammar; print(time.perf_counter() - t0)'
+    outp = subprocess.check_output([sys.executable, '-c', code])
+    return float(outp)
+
+def timeParse(count):
+    '''
+    Time parsing each query without the cortex query cache.
+    '''
+    took = []
+    for _ in range(count):
+        t0 = time.perf_counter()
+        for text in Queries:
+            s_grammar.Parser(text).query()
+        took.append(time.perf_counter() - t0)
+    return min(took) / len(Queries)
+
+async def timeStartup(count):
+    '''
+    Time opening an existing cortex directory.
+    '''
+    took = []
+    with tempfile.TemporaryDirectory() as dirn:
+
+        async with await s_cortex.Cortex.anit(dirn) as core:
+            await core.addTrigger('node:add', '[ +#foo ]', info={'form': 'inet:ipv4'})
+
+        for _ in range(count):
+            t0 = time.perf_counter()
+            async with await s_cortex.Cortex.anit(dirn) as core:
+                took.append(time.perf_counter() - t0)
+
+    return min(took)
+
+def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_storm_parse')
+    pars.add_argument('--count', type=int, default=5, help='Number of repetitions for each measurement.')
+    opts = pars.parse_args(argv)
+
+    cold = timeImport(True)
+    warm = min(timeImport(False) for _ in range(opts.count))
+
+    print(f'grammar import (no parser cache): {cold:.3f}s')
+    print(f'grammar import (parser cache):    {warm:.3f}s')
+    print(f'parse time per query:             {timeParse(opts.count) * 1000:.2f}ms')
+    print(f'cortex startup:                   {asyncio.run(timeStartup(opts.count)):.3f}s')
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main(sys.argv[1:]))
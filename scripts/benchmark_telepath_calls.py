@@ -0,0 +1,82 @@
+'''
+Benchmark small concurrent telepath calls with and without multiplexed links.
+
+Usage:
+
+    python -m scripts.benchmark_telepath_calls [--callers 1000] [--calls 20]
+'''
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+import synapse.daemon as s_daemon
+import synapse.telepath as s_telepath
+
+class CallApi:
+
+    async def getPropNorm(self, prop, valu):
+        return valu, {}
+
+def serve(port, evnt):
+
+    async def run():
+        async with await s_daemon.Daemon.anit() as dmon:
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('calls', CallApi())
+            port.value = addr[1]
+            evnt.set()
+            await dmon.waitfini()
+
+    asyncio.run(run())
+
+async def timeCalls(port, opts, mux):
+
+    async with await s_telepath.openurl('tcp://127.0.0.1/calls', port=port) as prox:
+
+        prox.mux = prox.mux and mux
+
+        async def caller():
+            for i in range(opts.calls):
+                await prox.getPropNorm('inet:ipv4', i)
+
+        # warm up the link pool
+        await asyncio.gather(*[caller() for i in range(opts.callers)])
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*[caller() for i in range(opts.callers)])
+        took = time.perf_counter() - t0
+
+        links = len(prox.muxlinks) if prox.mux else len(prox.links)
+        return took, links
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_telepath_calls')
+    pars.add_argument('--callers', type=int, default=1000, help='Number of concurrent callers.')
+    pars.add_argument('--calls', type=int, default=20, help='Number of calls made by each caller.')
+    opts = pars.parse_args(argv)
+
+    port = multiprocessing.Value('i', 0)
+    evnt = multiprocessing.Event()
+
+    proc = multiprocessing.Process(target=serve, args=(port, evnt), daemon=True)
+    proc.start()
+
+    try:
+
+        evnt.wait()
+
+        total = opts.callers * opts.calls
+
+        for mux in (False, True):
+            took, links = await timeCalls(port.value, opts, mux)
+            name = 'mux' if mux else 'pool'
+            print(f'{name:<5} {opts.callers} callers, {total} calls in {took:.2f}s ({total / took:.0f} calls/sec, {links} pooled links)')
+
+    finally:
+        proc.terminate()
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,87 @@
+'''
+Measure client and server memory while streaming to a slow telepath consumer.
+
+Usage:
+
+    python -m scripts.benchmark_telepath_credit [--count 10000000] [--window 10000]
+'''
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+import synapse.daemon as s_daemon
+import synapse.telepath as s_telepath
+
+Item = {'props': {'.created': 1546300800000, 'asn': 10, 'type': 'unicast'}, 'pad': 'x' * 64}
+
+class ItemApi:
+
+    async def items(self, count):
+        for i in range(count):
+            yield Item
+
+def serve(port, evnt):
+
+    async def run():
+        async with await s_daemon.Daemon.anit() as dmon:
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('items', ItemApi())
+            port.value = addr[1]
+            evnt.set()
+            await dmon.waitfini()
+
+    asyncio.run(run())
+
+def maxrss(pid='self'):
+    '''
+    Return the peak resident set size of a process in MiB.
+    '''
+    with open(f'/proc/{pid}/status') as fd:
+        for line in fd:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_telepath_credit')
+    pars.add_argument('--count', type=int, default=10000000, help='Number of items to stream.')
+    pars.add_argument('--window', type=int, default=10000, help='The client credit window in items.')
+    pars.add_argument('--every', type=int, default=1000, help='Sleep 1ms after consuming this many items.')
+    opts = pars.parse_args(argv)
+
+    port = multiprocessing.Value('i', 0)
+    evnt = multiprocessing.Event()
+
+    proc = multiprocessing.Process(target=serve, args=(port, evnt), daemon=True)
+    proc.start()
+
+    try:
+
+        evnt.wait()
+
+        async with await s_telepath.openurl('tcp://127.0.0.1/items', port=port.value) as prox:
+
+            prox.credititems = opts.window
+
+            t0 = time.perf_counter()
+
+            count = 0
+            async for item in prox.items(opts.count):
+                count += 1
+                if count % opts.every == 0:
+                    await asyncio.sleep(0.001)
+
+                if count % (opts.count // 10) == 0:
+                    print(f'{count:>10} items  client rss {maxrss():.1f}MiB  server rss {maxrss(proc.pid):.1f}MiB')
+
+            took = time.perf_counter() - t0
+
+        print(f'streamed {count} items in {took:.2f}s ({count / took:.0f} items/sec)')
+
+    finally:
+        proc.terminate()
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
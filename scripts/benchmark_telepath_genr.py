@@ -0,0 +1,88 @@
+'''
+Benchmark streaming generator results over telepath with and without batching.
+
+Usage:
+
+    python -m scripts.benchmark_telepath_genr [--count 1000000]
+'''
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+import synapse.common as s_common
+import synapse.daemon as s_daemon
+import synapse.telepath as s_telepath
+
+Pode = (('inet:ipv4', 0x01020304), {
+    'iden': s_common.ehex(s_common.buid(('inet:ipv4', 0x01020304))),
+    'tags': {'foo': (None, None), 'foo.bar': (None, None)},
+    'props': {'.created': 1546300800000, 'asn': 10, 'type': 'unicast', 'loc': 'us'},
+    'path': {},
+})
+
+class PodeApi:
+
+    async def storm(self, count):
+        '''
+        Yield ('node', pode) messages shaped like those from Cortex.streamstorm().
+        '''
+        for i in range(count):
+            yield ('node', Pode)
+
+def serve(port, evnt):
+    '''
+    Run the daemon in its own process so the client and server do not share a CPU.
+    '''
+    async def run():
+        async with await s_daemon.Daemon.anit() as dmon:
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('pods', PodeApi())
+            port.value = addr[1]
+            evnt.set()
+            await dmon.waitfini()
+
+    asyncio.run(run())
+
+async def timeStream(url, port, count, batch):
+
+    async with await s_telepath.openurl(url, port=port, batch=batch) as prox:
+
+        t0 = time.perf_counter()
+
+        total = 0
+        async for mesg in prox.storm(count):
+            total += 1
+
+        assert total == count
+        return time.perf_counter() - t0
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_telepath_genr')
+    pars.add_argument('--count', type=int, default=1000000, help='Number of pods to stream.')
+    opts = pars.parse_args(argv)
+
+    port = multiprocessing.Value('i', 0)
+    evnt = multiprocessing.Event()
+
+    proc = multiprocessing.Process(target=serve, args=(port, evnt), daemon=True)
+    proc.start()
+
+    try:
+
+        evnt.wait()
+
+        url = 'tcp://127.0.0.1/pods'
+
+        for batch in (False, True):
+            took = await timeStream(url, port.value, opts.count, batch)
+            name = 'batched' if batch else 'unbatched'
+            print(f'{name:<10} {opts.count} pods in {took:.2f}s ({opts.count / took:.0f} pods/sec)')
+
+    finally:
+        proc.terminate()
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
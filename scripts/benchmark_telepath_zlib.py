@@ -0,0 +1,107 @@
+'''
+Benchmark streaming splice-like messages over telepath with and without zlib.
+
+Usage:
+
+    python -m scripts.benchmark_telepath_zlib [--count 100000] [--level 6]
+'''
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+
+import synapse.common as s_common
+import synapse.daemon as s_daemon
+import synapse.telepath as s_telepath
+
+User = s_common.guid()
+
+class SpliceApi:
+
+    async def splices(self, count):
+        '''
+        Yield (offs, splice) tuples shaped like those from Cortex.splices().
+        '''
+        for i in range(count):
+            yield (i, ('node:add', {
+                'ndef': ('inet:ipv4', i),
+                'user': User,
+                'time': 1546300800000 + i,
+                'prov': s_common.guid(i // 100),
+            }))
+            yield (i, ('prop:set', {
+                'ndef': ('inet:ipv4', i),
+                'prop': 'asn',
+                'valu': i % 1000,
+                'oldv': None,
+                'user': User,
+                'time': 1546300800000 + i,
+                'prov': s_common.guid(i // 100),
+            }))
+
+def serve(port, evnt):
+
+    async def run():
+        async with await s_daemon.Daemon.anit() as dmon:
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('splices', SpliceApi())
+            port.value = addr[1]
+            evnt.set()
+            await dmon.waitfini()
+
+    asyncio.run(run())
+
+async def timeStream(port, count, zlib):
+
+    async with await s_telepath.openurl('tcp://127.0.0.1/splices', port=port, zlib=zlib) as prox:
+
+        t0 = time.perf_counter()
+
+        total = 0
+        async for item in prox.splices(count):
+            total += 1
+
+        took = time.perf_counter() - t0
+
+        size = zsize = cpu = 0
+        for iden, info in prox._getZlibInfo():
+            size += info['rx']['size']
+            zsize += info['rx']['zsize']
+            cpu += info['rx']['time']
+
+        return total, took, size, zsize, cpu
+
+async def main(argv):
+
+    pars = argparse.ArgumentParser(prog='benchmark_telepath_zlib')
+    pars.add_argument('--count', type=int, default=100000, help='Number of nodes worth of splices to stream.')
+    pars.add_argument('--level', type=int, default=6, help='The zlib compression level.')
+    opts = pars.parse_args(argv)
+
+    port = multiprocessing.Value('i', 0)
+    evnt = multiprocessing.Event()
+
+    proc = multiprocessing.Process(target=serve, args=(port, evnt), daemon=True)
+    proc.start()
+
+    try:
+
+        evnt.wait()
+
+        for zlib in (None, opts.level):
+
+            total, took, size, zsize, cpu = await timeStream(port.value, opts.count, zlib)
+
+            name = 'plain' if zlib is None else f'zlib={zlib}'
+            print(f'{name:<7} {total} splices in {took:.2f}s ({total / took:.0f} splices/sec)')
+
+            if zsize:
+                print(f'        {size / 1048576:.1f}MiB sent as {zsize / 1048576:.1f}MiB '
+                      f'(ratio {size / zsize:.1f}) client decompress cpu {cpu:.2f}s')
+
+    finally:
+        proc.terminate()
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
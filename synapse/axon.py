@@ -1,3 +1,7 @@
+import os
+import lzma
+import mmap
+import zlib
 import asyncio
 import hashlib
 import logging
@@ -8,6 +12,7 @@ import synapse.common as s_common
 
 import synapse.lib.cell as s_cell
 import synapse.lib.base as s_base
+import synapse.lib.coro as s_coro
 import synapse.lib.const as s_const
 import synapse.lib.share as s_share
 import synapse.lib.lmdbslab as s_lmdbslab
@@ -18,6 +23,64 @@ logger = logging.getLogger(__name__)
 CHUNK_SIZE = 16 * s_const.mebibyte
 MAX_SPOOL_SIZE = CHUNK_SIZE * 32  # 512 mebibytes
 
+# writes at least this large are hashed in a thread ( hashlib releases the GIL )
+HASH_THREAD_SIZE = 64 * s_const.kibibyte
+
+# the maximum number of files saved concurrently by Axon.puts()
+MAX_PUTS = 8
+
+# the first byte of each chunk in a compressed blob
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+CODEC_LZMA = 2
+
+# the chunk compression codecs which may be selected by the Axon "compress" config
+codecs = {
+    'zlib': CODEC_ZLIB,
+    'lzma': CODEC_LZMA,
+}
+
+# compressed chunks larger than this ratio of the raw chunk are stored raw
+MAX_COMPRESS_RATIO = 0.9
+
+def _encChunk(codec, byts):
+    '''
+    Compress a chunk and prepend the codec header ( storing it raw if it does not compress ).
+    '''
+    if codec == CODEC_ZLIB:
+        zbyts = zlib.compress(byts)
+    elif codec == CODEC_LZMA:
+        zbyts = lzma.compress(byts)
+    else:
+        raise s_exc.BadArg(mesg=f'Invalid chunk codec: {codec}', codec=codec)
+
+    if len(zbyts) > len(byts) * MAX_COMPRESS_RATIO:
+        return bytes((CODEC_RAW,)) + byts
+
+    return bytes((codec,)) + zbyts
+
+def _decChunk(valu):
+    '''
+    Decompress a chunk with a codec header.
+    '''
+    codec = valu[0]
+
+    if codec == CODEC_RAW:
+        return valu[1:]
+
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(valu[1:])
+
+    if codec == CODEC_LZMA:
+        return lzma.decompress(valu[1:])
+
+    raise s_exc.InconsistentStorage(mesg=f'Invalid chunk codec: {codec}', codec=codec)
+
+def _sliceChunk(byts, head, tail):
+    if head or tail < len(byts):
+        return byts[head:tail]
+    return byts
+
 class UpLoad(s_base.Base):
 
     async def __anit__(self, axon):
@@ -28,10 +91,15 @@ class UpLoad(s_base.Base):
         self.fd = tempfile.SpooledTemporaryFile(max_size=MAX_SPOOL_SIZE)
         self.size = 0
         self.sha256 = hashlib.sha256()
+        self.streams = {}
+        # writes may yield to the executor so they are serialized to keep the byte order
+        self.writelock = asyncio.Lock()
         self.onfini(self._uploadFini)
 
-    def _uploadFini(self):
+    async def _uploadFini(self):
         self.fd.close()
+        for upload in list(self.streams.values()):
+            await upload.fini()
 
     def _reset(self):
         if self.fd._rolled or self.fd.closed:
@@ -44,12 +112,59 @@ class UpLoad(s_base.Base):
         self.size = 0
         self.sha256 = hashlib.sha256()
 
-    async def write(self, byts):
-        self.size += len(byts)
+    async def stream(self):
+        '''
+        Open an additional upload stream which may be written concurrently.
+
+        Returns:
+            (str): The iden of the stream to pass as the stream argument of write() and save().
+        '''
+        iden = s_common.guid()
+        self.streams[iden] = await UpLoad.anit(self.axon)
+        return iden
+
+    async def close(self, stream):
+        '''
+        Close an upload stream opened with stream().
+        '''
+        upload = self.streams.pop(stream, None)
+        if upload is not None:
+            await upload.fini()
+
+    def _reqStream(self, stream):
+        upload = self.streams.get(stream)
+        if upload is None:
+            raise s_exc.NoSuchIden(mesg=f'No upload stream: {stream}', iden=stream)
+        return upload
+
+    def _writeBytes(self, byts):
         self.sha256.update(byts)
         self.fd.write(byts)
 
-    async def save(self):
+    async def write(self, byts, stream=None):
+
+        if stream is not None:
+            return await self._reqStream(stream).write(byts)
+
+        async with self.writelock:
+
+            self.size += len(byts)
+
+            if len(byts) >= HASH_THREAD_SIZE:
+                await s_coro.executor(self._writeBytes, byts)
+                return
+
+            self._writeBytes(byts)
+
+    async def save(self, stream=None):
+
+        if stream is not None:
+            return await self._reqStream(stream).save()
+
+        async with self.writelock:
+            return await self._save()
+
+    async def _save(self):
 
         sha256 = self.sha256.digest()
         rsize = self.size
@@ -84,6 +199,270 @@ class UpLoadShare(UpLoad, s_share.Share):
         await UpLoad.__anit__(self, axon)
         await s_share.Share.__anit__(self, link, None)
 
+class BlobStor(s_base.Base):
+    '''
+    The base class for Axon blob storage backends.
+
+    Notes:
+        The Axon tracks which files exist and their sizes.  A BlobStor only
+        stores and retrieves the bytes for each sha256.
+    '''
+    async def __anit__(self, dirn, compress=None):
+        await s_base.Base.__anit__(self)
+        self.dirn = dirn
+        self.compress = compress
+
+    async def has(self, sha256):
+        '''
+        Return True if the bytes for the sha256 are stored.
+        '''
+        raise s_exc.NoSuchImpl(name='has')
+
+    async def save(self, sha256, genr):
+        '''
+        Store the bytes from a generator of chunks.
+
+        Returns:
+            (int, int): The logical size and the number of bytes stored.
+        '''
+        raise s_exc.NoSuchImpl(name='save')
+
+    def iterBlob(self, sha256, offset=0, end=None):
+        '''
+        Yield chunks of the bytes for the sha256 from offset up to end.
+        '''
+        raise s_exc.NoSuchImpl(name='iterBlob')
+
+    async def get(self, sha256, offset=0, end=None):
+        for byts in self.iterBlob(sha256, offset=offset, end=end):
+            yield byts
+            await asyncio.sleep(0)
+
+class LmdbBlobStor(BlobStor):
+    '''
+    Store blob chunks in the blob.lmdb slab.
+
+    Notes:
+        Chunks are keyed by sha256 + chunk index.  The offsets db maps
+        sha256 + chunk end offset to the chunk start offset + chunk index
+        so that a read may seek to the chunk which contains an offset.
+
+        When compress is set, each chunk is stored with a one byte codec
+        header and the sha256 is added to the zblobs db.  Chunks which do
+        not compress are stored raw, and blobs saved without compression
+        have no headers, so both may be read from the same slab.
+    '''
+    async def __anit__(self, dirn, compress=None):
+
+        await BlobStor.__anit__(self, dirn, compress=compress)
+
+        self.codec = None
+        if compress is not None:
+            self.codec = codecs.get(compress)
+
+        path = s_common.gendir(dirn, 'blob.lmdb')
+        self.slab = await s_lmdbslab.Slab.anit(path, map_async=True)
+        self.blobs = self.slab.initdb('blobs')
+        self.offsets = self.slab.initdb('offsets')
+        self.zblobs = self.slab.initdb('zblobs')
+        self.onfini(self.slab.fini)
+
+    async def has(self, sha256):
+        # empty files have no chunks
+        for item in self.slab.scanByPref(sha256, db=self.blobs):
+            return True
+        return False
+
+    async def save(self, sha256, genr):
+
+        if self.codec is not None:
+            self.slab.put(sha256, bytes((self.codec,)), db=self.zblobs)
+
+        size = 0
+        stored = 0
+        for i, byts in enumerate(genr):
+
+            valu = byts
+            if self.codec is not None:
+                valu = await s_coro.executor(_encChunk, self.codec, byts)
+
+            indx = i.to_bytes(8, 'big')
+            self.slab.put(sha256 + indx, valu, db=self.blobs)
+            stored += len(valu)
+
+            # index the chunk by end offset to allow reads to seek
+            if byts:
+                offs = size.to_bytes(8, 'big')
+                size += len(byts)
+                self.slab.put(sha256 + size.to_bytes(8, 'big'), offs + indx, db=self.offsets)
+
+            await asyncio.sleep(0)
+        return size, stored
+
+    def _isZipped(self, sha256):
+        return self.slab.get(sha256, db=self.zblobs) is not None
+
+    async def get(self, sha256, offset=0, end=None):
+
+        if not self._isZipped(sha256):
+            async for byts in BlobStor.get(self, sha256, offset=offset, end=end):
+                yield byts
+            return
+
+        # decompress chunks in a thread
+        for valu, head, tail in self._iterZipChunks(sha256, offset, end):
+            byts = await s_coro.executor(_decChunk, valu)
+            yield _sliceChunk(byts, head, tail)
+
+    def iterBlob(self, sha256, offset=0, end=None):
+
+        if self._isZipped(sha256):
+            for valu, head, tail in self._iterZipChunks(sha256, offset, end):
+                yield _sliceChunk(_decChunk(valu), head, tail)
+            return
+
+        if offset == 0 and end is None:
+            for lkey, byts in self.slab.scanByPref(sha256, db=self.blobs):
+                yield byts
+            return
+
+        indx, chunkoff = self._getChunkOffs(sha256, offset)
+
+        lmin = sha256 + indx.to_bytes(8, 'big')
+        for lkey, byts in self.slab.scanByRange(lmin, lmax=sha256, db=self.blobs):
+
+            size = len(byts)
+            chunkend = chunkoff + size
+
+            if chunkend > offset:
+
+                head = max(offset - chunkoff, 0)
+                tail = size if end is None else min(end - chunkoff, size)
+
+                yield _sliceChunk(byts, head, tail)
+
+            if end is not None and chunkend >= end:
+                return
+
+            chunkoff = chunkend
+
+    def _iterZipChunks(self, sha256, offset, end):
+        '''
+        Yield (valu, head, tail) for the stored chunks of a compressed blob which contain the range.
+
+        Notes:
+            Compressed blobs always have chunk offsets, so the logical size
+            of each chunk is known without decompressing it.
+        '''
+        lmin = sha256 + (offset + 1).to_bytes(8, 'big')
+        for lkey, lval in self.slab.scanByRange(lmin, lmax=sha256, db=self.offsets):
+
+            chunkend = int.from_bytes(lkey[32:], 'big')
+            chunkoff = int.from_bytes(lval[:8], 'big')
+            size = chunkend - chunkoff
+
+            valu = self.slab.get(sha256 + lval[8:], db=self.blobs)
+
+            head = max(offset - chunkoff, 0)
+            tail = size if end is None else min(end - chunkoff, size)
+
+            yield valu, head, tail
+
+            if end is not None and chunkend >= end:
+                return
+
+    def _getChunkOffs(self, sha256, offset):
+        '''
+        Return the (index, offset) of the chunk which contains the given file offset.
+        '''
+        lmin = sha256 + (offset + 1).to_bytes(8, 'big')
+        for lkey, lval in self.slab.scanByRange(lmin, lmax=sha256, db=self.offsets):
+            return int.from_bytes(lval[8:], 'big'), int.from_bytes(lval[:8], 'big')
+
+        # files saved without chunk offsets are read from the first chunk
+        return 0, 0
+
+class FileBlobStor(BlobStor):
+    '''
+    Store each blob as a content addressed file in the blobs directory.
+
+    Notes:
+        Files are stored as blobs/<h[0:2]>/<h[2:4]>/<h> where h is the hex
+        sha256.  Each file is written to blobs/tmp, fsync'd and renamed into
+        place so a partially written blob is never visible.  Blobs are read
+        using mmap so only the requested range is paged in.  Blobs are never
+        compressed so that range reads may be served directly from the file.
+    '''
+    async def __anit__(self, dirn, compress=None):
+        await BlobStor.__anit__(self, dirn, compress=compress)
+        self.blobdir = s_common.gendir(dirn, 'blobs')
+        self.tmpdir = s_common.gendir(self.blobdir, 'tmp')
+
+    def _blobPath(self, sha256):
+        hexs = s_common.ehex(sha256)
+        return os.path.join(self.blobdir, hexs[:2], hexs[2:4], hexs)
+
+    async def has(self, sha256):
+        return os.path.isfile(self._blobPath(sha256))
+
+    async def save(self, sha256, genr):
+
+        size = 0
+
+        path = self._blobPath(sha256)
+        tmppath = os.path.join(self.tmpdir, s_common.guid())
+
+        try:
+
+            with open(tmppath, 'wb') as fd:
+
+                for byts in genr:
+                    fd.write(byts)
+                    size += len(byts)
+                    await asyncio.sleep(0)
+
+                fd.flush()
+                await s_coro.executor(os.fsync, fd.fileno())
+
+            dirn = s_common.gendir(os.path.dirname(path))
+            os.replace(tmppath, path)
+
+            await s_coro.executor(self._fsyncDir, dirn)
+
+        finally:
+            if os.path.isfile(tmppath):
+                os.unlink(tmppath)
+
+        return size, size
+
+    def _fsyncDir(self, dirn):
+        fd = os.open(dirn, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def iterBlob(self, sha256, offset=0, end=None):
+
+        with open(self._blobPath(sha256), 'rb') as fd:
+
+            size = os.fstat(fd.fileno()).st_size
+            if end is None or end > size:
+                end = size
+
+            if offset >= end:
+                return
+
+            with mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offs in range(offset, end, CHUNK_SIZE):
+                    yield mm[offs:min(offs + CHUNK_SIZE, end)]
+
+# the blob storage backends which may be selected by the Axon "blobstor" config
+blobstors = {
+    'lmdb': LmdbBlobStor,
+    'files': FileBlobStor,
+}
+
 class AxonApi(s_cell.CellApi, s_share.Share):
 
     async def __anit__(self, cell, link, user):
@@ -95,10 +474,19 @@ class AxonApi(s_cell.CellApi, s_share.Share):
         async for byts in self.cell.get(sha256):
             yield byts
 
+    async def read(self, sha256, offset=0, size=None):
+        await self._reqUserAllowed('axon', 'get')
+        async for byts in self.cell.read(sha256, offset=offset, size=size):
+            yield byts
+
     async def has(self, sha256):
         await self._reqUserAllowed('axon', 'has')
         return await self.cell.has(sha256)
 
+    async def hasmulti(self, sha256s):
+        await self._reqUserAllowed('axon', 'has')
+        return await self.cell.hasmulti(sha256s)
+
     async def hashes(self, offs):
         await self._reqUserAllowed('axon', 'has')
         async for item in self.cell.hashes(offs):
@@ -132,7 +520,16 @@ class AxonApi(s_cell.CellApi, s_share.Share):
 class Axon(s_cell.Cell):
 
     cellapi = AxonApi
-    confdefs = ()
+    confdefs = (  # type: ignore
+        ('blobstor', {
+            'type': 'str', 'defval': 'lmdb',
+            'doc': 'The blob storage backend ( "lmdb" or "files" ).  Use synapse.tools.blobmove to change it.'
+        }),
+        ('compress', {
+            'type': 'str', 'defval': None,
+            'doc': 'Compress new chunks in the lmdb blobstor using "zlib" or "lzma".'
+        }),
+    )
 
     async def __anit__(self, dirn, conf=None):
 
@@ -154,6 +551,11 @@ class Axon(s_cell.Cell):
         self.axonmetrics = await node.dict()
         self.axonmetrics.setdefault('size:bytes', 0)
         self.axonmetrics.setdefault('file:count', 0)
+        # bytes stored after compression ( previously everything was stored raw )
+        self.axonmetrics.setdefault('size:stored', self.axonmetrics.get('size:bytes'))
+
+        # sha256 -> asyncio.Event() for saves in progress
+        self.saving = {}
 
         self.addHealthFunc(self._axonHealth)
 
@@ -164,10 +566,22 @@ class Axon(s_cell.Cell):
         health.update('axon', 'nominal', '', data=await self.metrics())
 
     async def _initBlobStor(self):
-        path = s_common.gendir(self.dirn, 'blob.lmdb')
-        self.blobslab = await s_lmdbslab.Slab.anit(path, map_async=True)
-        self.blobs = self.blobslab.initdb('blobs')
-        self.onfini(self.blobslab.fini)
+        self.blobstor = await self._openBlobStor(self.conf.get('blobstor'))
+        self.onfini(self.blobstor.fini)
+
+    async def _openBlobStor(self, name):
+        '''
+        Construct a BlobStor backend by name.
+        '''
+        ctor = blobstors.get(name)
+        if ctor is None:
+            raise s_exc.BadConfValu(name='blobstor', valu=name, mesg=f'Valid blobstor names: {", ".join(blobstors)}')
+
+        compress = self.conf.get('compress')
+        if compress is not None and compress not in codecs:
+            raise s_exc.BadConfValu(name='compress', valu=compress, mesg=f'Valid compress names: {", ".join(codecs)}')
+
+        return await ctor.anit(self.dirn, compress=compress)
 
     def _addSyncItem(self, item):
         self.axonhist.add(item)
@@ -186,7 +600,39 @@ class Axon(s_cell.Cell):
         if not await self.has(sha256):
             raise s_exc.NoSuchFile(sha256=s_common.ehex(sha256))
 
-        for lkey, byts in self.blobslab.scanByPref(sha256, db=self.blobs):
+        async for byts in self.blobstor.get(sha256):
+            yield byts
+
+    async def read(self, sha256, offset=0, size=None):
+        '''
+        Yield the bytes of a file starting at offset ( up to size bytes ).
+
+        Args:
+            sha256 (bytes): The sha256 hash of the file.
+            offset (int): The offset of the first byte to read.
+            size (int): The maximum number of bytes to read ( or None for the rest of the file ).
+
+        Notes:
+            Only the chunks which contain the requested bytes are read.
+
+        Yields:
+            bytes: Chunks of the requested bytes.
+        '''
+        byts = self.axonslab.get(sha256, db=self.sizes)
+        if byts is None:
+            raise s_exc.NoSuchFile(sha256=s_common.ehex(sha256))
+
+        if offset < 0 or (size is not None and size < 0):
+            raise s_exc.BadArg(mesg='Axon.read() offset and size must be positive.', offset=offset, size=size)
+
+        end = int.from_bytes(byts, 'big')
+        if size is not None:
+            end = min(end, offset + size)
+
+        if offset >= end:
+            return
+
+        async for byts in self.blobstor.get(sha256, offset=offset, end=end):
             yield byts
 
     async def put(self, byts):
@@ -198,7 +644,19 @@ class Axon(s_cell.Cell):
             return await fd.save()
 
     async def puts(self, files):
-        return [await self.put(b) for b in files]
+        '''
+        Save a list of bytes ( up to MAX_PUTS at a time ).
+
+        Returns:
+            (list): A list of (size, sha256) tuples in the same order as files.
+        '''
+        sema = asyncio.Semaphore(MAX_PUTS)
+
+        async def put(byts):
+            async with sema:
+                return await self.put(byts)
+
+        return await asyncio.gather(*[put(b) for b in files])
 
     async def upload(self):
         return await UpLoad.anit(self)
@@ -206,37 +664,53 @@ class Axon(s_cell.Cell):
     async def has(self, sha256):
         return self.axonslab.get(sha256, db=self.sizes) is not None
 
+    async def hasmulti(self, sha256s):
+        '''
+        Given a list of sha256 bytes, returns a list of True/False for each hash being present.
+        '''
+        return [v is not None for v in self.axonslab.getmulti(sha256s, db=self.sizes)]
+
     async def metrics(self):
         return dict(self.axonmetrics.items())
 
     async def save(self, sha256, genr):
 
-        byts = self.axonslab.get(sha256, db=self.sizes)
-        if byts is not None:
-            return int.from_bytes(byts, 'big')
+        while True:
 
-        size = await self._saveFileGenr(sha256, genr)
+            byts = self.axonslab.get(sha256, db=self.sizes)
+            if byts is not None:
+                return int.from_bytes(byts, 'big')
 
-        self._addSyncItem((sha256, size))
+            # concurrent uploads of the same bytes wait for the first save
+            evnt = self.saving.get(sha256)
+            if evnt is None:
+                break
 
-        await self.axonmetrics.set('file:count', self.axonmetrics.get('file:count') + 1)
-        await self.axonmetrics.set('size:bytes', self.axonmetrics.get('size:bytes') + size)
+            await evnt.wait()
 
-        self.axonslab.put(sha256, size.to_bytes(8, 'big'), db=self.sizes)
+        evnt = self.saving[sha256] = asyncio.Event()
 
-        return size
+        try:
 
-    async def _saveFileGenr(self, sha256, genr):
-        size = 0
-        for i, byts in enumerate(genr):
-            size += len(byts)
-            lkey = sha256 + i.to_bytes(8, 'big')
-            self.blobslab.put(lkey, byts, db=self.blobs)
-            await asyncio.sleep(0)
-        return size
+            size, stored = await self.blobstor.save(sha256, genr)
+
+            self._addSyncItem((sha256, size))
+
+            await self.axonmetrics.set('file:count', self.axonmetrics.get('file:count') + 1)
+            await self.axonmetrics.set('size:bytes', self.axonmetrics.get('size:bytes') + size)
+            await self.axonmetrics.set('size:stored', self.axonmetrics.get('size:stored') + stored)
+
+            self.axonslab.put(sha256, size.to_bytes(8, 'big'), db=self.sizes)
+
+            return size
+
+        finally:
+            self.saving.pop(sha256, None)
+            evnt.set()
 
     async def wants(self, sha256s):
         '''
         Given a list of sha256 bytes, returns a list of the hashes we want bytes for.
         '''
-        return [s for s in sha256s if not await self.has(s)]
+        sha256s = list(sha256s)
+        return [s for s, has in zip(sha256s, await self.hasmulti(sha256s)) if not has]
@@ -1,4 +1,6 @@
 import os
+import json
+import time
 import asyncio
 import logging
 import itertools
@@ -18,6 +20,7 @@ import synapse.lib.base as s_base
 import synapse.lib.cell as s_cell
 import synapse.lib.coro as s_coro
 import synapse.lib.hive as s_hive
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.snap as s_snap
 import synapse.lib.cache as s_cache
 import synapse.lib.layer as s_layer
@@ -30,7 +33,6 @@ import synapse.lib.modules as s_modules
 import synapse.lib.trigger as s_trigger
 import synapse.lib.modelrev as s_modelrev
 import synapse.lib.lmdblayer as s_lmdblayer
-import synapse.lib.stormhttp as s_stormhttp
 import synapse.lib.provenance as s_provenance
 import synapse.lib.stormtypes as s_stormtypes
 import synapse.lib.remotelayer as s_remotelayer
@@ -41,6 +43,21 @@ logger = logging.getLogger(__name__)
 A Cortex implements the synapse hypergraph object.
 '''
 
+StormBudgetKeys = ('rows', 'nodes', 'time', 'queries')
+
+# the maximum number of seconds a feed loop waits for new tank items per request
+FEED_WAIT = 30
+
+# the number of splice batches the push loop keeps in flight to the remote cortex
+PUSH_WINDOW = 4
+# push batches are sized to take about PUSH_LATENCY seconds for the remote to ingest
+PUSH_LATENCY = 0.5
+PUSH_SIZE_MIN = 100
+PUSH_SIZE_MAX = 10000
+
+def _unpackFeedRows(rows):
+    return [(indx, s_msgpack.un(byts)) for indx, byts in rows]
+
 class View(s_base.Base):
     '''
     A view represents a cortex as seen from a specific set of layers.
@@ -168,6 +185,20 @@ class CoreApi(s_cell.CellApi):
         ret = await self.cell.joinTeleLayer(url, indx=indx)
         return ret
 
+    @s_cell.adminapi
+    async def setStormBudget(self, budget, user=None):
+        '''
+        Set the storm query budget and admission limits globally or for a user.
+        '''
+        return await self.cell.setStormBudget(budget, user=user)
+
+    @s_cell.adminapi
+    def getStormBudgets(self):
+        '''
+        Return the storm query budgets keyed by 'global' or user iden.
+        '''
+        return self.cell.getStormBudgets()
+
     async def getNodesBy(self, full, valu, cmpr='='):
         '''
         Yield Node.pack() tuples which match the query.
@@ -509,9 +540,34 @@ class CoreApi(s_cell.CellApi):
                 snap.strict = False
                 return await snap.addFeedData(name, items, seqn=seqn)
 
+    async def addOrderedFeedData(self, name, items, seqn):
+        '''
+        Add feed data once the items before seqn have been added.
+
+        Args:
+            name (str): The name of the feed record format.
+            items (list): A list of items to ingest.
+            seqn ((str,int)): An (iden, offs) tuple for this feed chunk.
+
+        Notes:
+            This allows a client to keep several chunks from one feed in
+            flight while they are still ingested in order.  Chunks ( or
+            parts of chunks ) which have already been added are skipped.
+
+        Returns:
+            (int): The next expected offset.
+        '''
+        await self._reqUserAllowed('feed:data', *name.split('.'))
+
+        with s_provenance.claim('feed:data', name=name):
+            return await self.cell.addOrderedFeedData(name, items, seqn, user=self.user)
+
     def getFeedOffs(self, iden):
         return self.cell.getFeedOffs(iden)
 
+    def getFeedMetrics(self):
+        return self.cell.getFeedMetrics()
+
     @s_cell.adminapi
     def setFeedOffs(self, iden, offs):
         return self.cell.setFeedOffs(iden, offs)
@@ -560,6 +616,23 @@ class CoreApi(s_cell.CellApi):
         async for item in self.cell.syncLayerSplices(iden, offs):
             yield item
 
+    async def syncLayerStors(self, iden, offs):
+        '''
+        Yield (indx, (sops, soffs, splices)) storage operation log entries for the given layer beginning at offset.
+
+        Once caught up, this API will begin yielding entries in real-time.
+        '''
+        await self._reqUserAllowed('layer:sync', iden)
+        async for item in self.cell.syncLayerStors(iden, offs):
+            yield item
+
+    async def hasLayerStorLog(self, iden):
+        '''
+        Return True if the given layer logs storage operations for physical mirrors.
+        '''
+        await self._reqUserAllowed('layer:sync', iden)
+        return self.cell.hasLayerStorLog(iden)
+
     @s_cell.adminapi
     async def splices(self, offs, size):
         '''
@@ -733,6 +806,11 @@ class Cortex(s_cell.Cell):
             'doc': 'Set the default lmdb:map_async value in LMDB layers.'
         }),
 
+        ('layer:lmdb:storlog', {
+            'type': 'bool', 'defval': False,
+            'doc': 'Set the default lmdb:storlog value in LMDB layers ( required for physical mirrors ).'
+        }),
+
         ('axon', {
             'type': 'str', 'defval': None,
             'doc': 'A telepath URL for a remote axon.',
@@ -743,7 +821,14 @@ class Cortex(s_cell.Cell):
 
     async def __anit__(self, dirn, conf=None):
 
-        await s_cell.Cell.__anit__(self, dirn, conf=conf)
+        tick = time.perf_counter()
+
+        # phase name -> seconds for each step of Cortex startup
+        self.initphases = {}
+        self.inittook = None
+
+        with self._initPhase('cell'):
+            await s_cell.Cell.__anit__(self, dirn, conf=conf)
 
         # share ourself via the cell dmon as "cortex"
         # for potential default remote use
@@ -756,9 +841,16 @@ class Cortex(s_cell.Cell):
         self.splicers = {}
         self.layrctors = {}
         self.feedfuncs = {}
+        self.feedmetrics = {}
         self.stormcmds = {}
+
+        # pulsed when an ordered feed chunk updates its feed offset
+        self.feedoffsevnt = asyncio.Event()
+        self.onfini(self.feedoffsevnt.set)
         self.stormvars = None  # type: s_hive.HiveDict
+        self.stormbudgets = None  # type: s_hive.HiveDict
         self.stormrunts = {}
+        self.querycache = s_cache.LruDict(10000)  # query text -> parsed Query
 
         self._runtLiftFuncs = {}
         self._runtPropSetFuncs = {}
@@ -774,41 +866,53 @@ class Cortex(s_cell.Cell):
 
         self.axon = None  # type: s_axon.AxonApi
         self.axready = asyncio.Event()
+        self.axonlock = asyncio.Lock()
+        self.axontask = None
 
         # generic fini handler for the Cortex
         self.onfini(self._onCoreFini)
 
         # async inits
-        await self._initCoreHive()
+        with self._initPhase('hive'):
+            await self._initCoreHive()
 
         # sync inits
-        self._initSplicers()
-        self._initStormCmds()
-        self._initStormLibs()
-        self._initFeedFuncs()
-        self._initFormCounts()
-        self._initLayerCtors()
-        self._initCortexHttpApi()
+        with self._initPhase('registry'):
+            self._initSplicers()
+            self._initStormCmds()
+            self._initStormLibs()
+            self._initFeedFuncs()
+            self._initLayerCtors()
+            self._initCortexHttpApi()
 
-        self.model = s_datamodel.Model()
+        with self._initPhase('formcounts'):
+            self._initFormCounts()
 
         # Perform module loading
-        mods = list(s_modules.coremods)
-        mods.extend(self.conf.get('modules'))
-        await self._loadCoreMods(mods)
-        await self._loadExtModel()
+        with self._initPhase('model'):
+            self.model = s_datamodel.Model()
+            mods = list(s_modules.coremods)
+            mods.extend(self.conf.get('modules'))
+            await self._loadCoreMods(mods)
+            await self._loadExtModel()
 
         # Initialize our storage and views
-        await self._initCoreAxon()
-        await self._initCoreLayers()
-        await self._checkLayerModels()
-        await self._initCoreViews()
-        # our "main" view has the same iden as we do
-        self.view = self.views.get(self.iden)
+        with self._initPhase('axon'):
+            await self._initCoreAxon()
+
+        with self._initPhase('layers'):
+            await self._initCoreLayers()
+            await self._checkLayerModels()
 
-        self.provstor = await s_provenance.ProvStor.anit(self.dirn)
-        self.onfini(self.provstor.fini)
-        self.provstor.migratePre010(self.view.layers[0])
+        with self._initPhase('views'):
+            await self._initCoreViews()
+            # our "main" view has the same iden as we do
+            self.view = self.views.get(self.iden)
+
+        with self._initPhase('provenance'):
+            self.provstor = await s_provenance.ProvStor.anit(self.dirn)
+            self.onfini(self.provstor.fini)
+            self.provstor.migratePre010(self.view.layers[0])
 
         self.addHealthFunc(self._cortexHealth)
 
@@ -818,12 +922,16 @@ class Cortex(s_cell.Cell):
 
         self.onfini(fini)
 
-        self.triggers = s_trigger.Triggers(self)
-        self.agenda = await s_agenda.Agenda.anit(self)
-        self.onfini(self.agenda)
+        with self._initPhase('triggers'):
+            self.triggers = s_trigger.Triggers(self)
+
+        with self._initPhase('agenda'):
+            self.agenda = await s_agenda.Agenda.anit(self)
+            self.onfini(self.agenda)
 
         # Finalize coremodule loading
-        await self._initCoreMods()
+        with self._initPhase('modules'):
+            await self._initCoreMods()
 
         # Now start agenda AFTER all coremodules have finished loading.
         if self.conf.get('cron:enable'):
@@ -834,6 +942,31 @@ class Cortex(s_cell.Cell):
         self._initPushLoop()
         self._initFeedLoops()
 
+        # the local axon is opened in the background so it does not delay startup
+        # ( the task is not cancelled by fini so a partially opened axon is never left behind )
+        if self.conf.get('axon') is None:
+            self.axontask = asyncio.create_task(self.getAxon())
+
+        self.inittook = time.perf_counter() - tick
+
+        info = {
+            'iden': self.iden,
+            'took': round(self.inittook, 6),
+            'phases': {name: round(took, 6) for (name, took) in self.initphases.items()},
+        }
+        logger.info(f'Cortex startup took {self.inittook:.3f}s: {json.dumps(info)}')
+
+    @contextlib.contextmanager
+    def _initPhase(self, name):
+        '''
+        Record the duration of a step of Cortex startup.
+        '''
+        tick = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.initphases[name] = time.perf_counter() - tick
+
     async def _cortexHealth(self, health):
         health.update('cortex', 'nominal')
 
@@ -961,8 +1094,18 @@ class Cortex(s_cell.Cell):
         '''
         Generic fini handler for cortex components which may change or vary at runtime.
         '''
-        if self.axon:
-            await self.axon.fini()
+        # wait for a local axon which is still being opened
+        if self.axontask is not None:
+            try:
+                await self.axontask
+            except s_exc.IsFini:
+                pass
+            except Exception:  # pragma: no cover
+                logger.exception('error opening the local axon')
+
+        async with self.axonlock:
+            if self.axon:
+                await self.axon.fini()
 
     async def syncLayerSplices(self, iden, offs):
         '''
@@ -984,6 +1127,29 @@ class Cortex(s_cell.Cell):
         '''
         self.schedCoro(self._initCoreMirror(url))
 
+    async def syncLayerStors(self, iden, offs):
+        '''
+        Yield (indx, (sops, soffs, splices)) tuples from the storage operation log of a layer.
+        '''
+        layr = self.getLayer(iden)
+        if layr is None:
+            raise s_exc.NoSuchLayer(iden=iden)
+
+        if getattr(layr, 'storlog', None) is None:
+            mesg = f'Layer {iden} does not log storage operations ( see layer:lmdb:storlog ).'
+            raise s_exc.BadConfValu(mesg=mesg, name='lmdb:storlog', valu=False)
+
+        async for item in layr.syncStors(offs):
+            yield item
+
+    def hasLayerStorLog(self, iden):
+
+        layr = self.getLayer(iden)
+        if layr is None:
+            raise s_exc.NoSuchLayer(iden=iden)
+
+        return getattr(layr, 'storlog', None) is not None
+
     async def _initCoreMirror(self, url):
 
         while not self.isfini:
@@ -1001,62 +1167,138 @@ class Cortex(s_cell.Cell):
                     # assume only the main layer for now...
                     layr = self.getLayer()
 
-                    offs = await layr.getOffset(layr.iden)
-                    logger.warning(f'mirror loop connected ({url} offset={offs})')
+                    # use physical replication when both layers log storage operations
+                    if getattr(layr, 'storlog', None) is not None and await self._hasMirrorStorLog(proxy, layr):
+                        await self._runMirrorStors(proxy, layr, url)
+                    else:
+                        await self._runMirrorSplices(proxy, layr, url)
+
+            except asyncio.CancelledError: # pragma: no cover
+                return
+
+            except s_exc.InconsistentStorage as e:
+                # retrying would only skip or duplicate data
+                logger.error(f'mirror refused ( the layer must be restored from a new backup ): {e}')
+                return
+
+            except Exception:
+                logger.exception('error in initCoreMirror loop')
 
-                    if offs == 0:
-                        stat = await layr.stat()
-                        offs = stat.get('splicelog_indx', 0)
-                        await layr.setOffset(layr.iden, offs)
+            await self.waitfini(1)
 
-                    while not proxy.isfini:
+    async def _runMirrorSplices(self, proxy, layr, url):
 
-                        # gotta do this in the loop as welll...
-                        offs = await layr.getOffset(layr.iden)
+        offs = await layr.getOffset(layr.iden)
+        logger.warning(f'mirror loop connected ({url} offset={offs})')
 
-                        # pump them into a queue so we can consume them in chunks
-                        q = asyncio.Queue(maxsize=1000)
+        if offs == 0:
+            stat = await layr.stat()
+            offs = stat.get('splicelog_indx', 0)
+            await layr.setOffset(layr.iden, offs)
 
-                        async def consume(x):
-                            try:
-                                async for item in proxy.syncLayerSplices(layr.iden, x):
-                                    await q.put(item)
-                            finally:
-                                await q.put(None)
+        while not proxy.isfini:
 
-                        proxy.schedCoro(consume(offs))
+            # gotta do this in the loop as welll...
+            offs = await layr.getOffset(layr.iden)
 
-                        done = False
-                        while not done:
+            async for items in self._iterMirrorChunks(proxy, proxy.syncLayerSplices(layr.iden, offs)):
 
-                            # get the next item so we maybe block...
-                            item = await q.get()
-                            if item is None:
-                                break
+                splices = [i[1] for i in items]
+                await self.addFeedData('syn.splice', splices)
+                await layr.setOffset(layr.iden, items[-1][0])
 
-                            items = [item]
+    async def _hasMirrorStorLog(self, proxy, layr):
+        try:
+            return await proxy.hasLayerStorLog(layr.iden)
+        except s_exc.NoSuchMeth:
+            return False
 
-                            # check if there are more we can eat
-                            for i in range(q.qsize()):
+    async def _runMirrorStors(self, proxy, layr, url):
+        '''
+        Apply the storage operations logged by the upstream layer directly to our layer.
 
-                                nexi = await q.get()
-                                if nexi is None:
-                                    done = True
-                                    break
+        Notes:
+            Both layers must have had lmdb:storlog enabled when the backup was
+            made, so the local log offset is the next upstream entry.  Since
+            the storage operations are already normalized no model, trigger or
+            EditAtom logic runs on the mirror.  Both the storage operation log
+            and the splice log offsets of each entry must match the local
+            layer ( which they will not if the storage operation log was
+            enabled on only one of the layers after the backup was made ).
+        '''
+        offs = layr.storlog.index()
+        logger.warning(f'mirror loop connected using storage operations ({url} offset={offs})')
 
-                                items.append(nexi)
+        async for items in self._iterMirrorChunks(proxy, proxy.syncLayerStors(layr.iden, offs)):
 
-                            splices = [i[1] for i in items]
-                            await self.addFeedData('syn.splice', splices)
-                            await layr.setOffset(layr.iden, items[-1][0])
+            for indx, (sops, soffs, splices) in items:
 
-            except asyncio.CancelledError: # pragma: no cover
+                if indx != layr.storlog.index():
+                    mesg = f'Mirror storage operation log offset {indx} != {layr.storlog.index()}'
+                    raise s_exc.InconsistentStorage(mesg=mesg, indx=indx)
+
+                if soffs != layr.splicelog.index():
+                    mesg = f'Mirror splice log offset {soffs} != {layr.splicelog.index()} ( the layer logs do not line up )'
+                    raise s_exc.InconsistentStorage(mesg=mesg, indx=indx, soffs=soffs)
+
+                await self._storLayerSops(layr, sops, splices)
+
+            await layr.setOffset(layr.iden, layr.splicelog.index())
+            await self.fire('core:mirror:stors', offs=layr.storlog.index())
+
+    async def _storLayerSops(self, layr, sops, splices):
+        '''
+        Apply logged storage operations ( and their splices ) directly to a layer.
+        '''
+        await layr.stor(sops, splices=splices)
+
+        for splice in splices:
+            if splice[0] == 'node:add':
+                self.pokeFormCount(splice[1]['ndef'][0], 1)
+            elif splice[0] == 'node:del':
+                self.pokeFormCount(splice[1]['ndef'][0], -1)
+
+    async def _iterMirrorChunks(self, proxy, genr):
+        '''
+        Yield lists of the items from a remote generator which are ready to be consumed.
+        '''
+        # pump them into a queue so we can consume them in chunks
+        q = asyncio.Queue(maxsize=1000)
+
+        async def consume():
+            try:
+                async for item in genr:
+                    await q.put(item)
+            finally:
+                await q.put(None)
+
+        proxy.schedCoro(consume())
+
+        while True:
+
+            # get the next item so we maybe block...
+            item = await q.get()
+            if item is None:
                 return
 
-            except Exception:
-                logger.exception('error in initCoreMirror loop')
+            items = [item]
 
-            await self.waitfini(1)
+            done = False
+
+            # check if there are more we can eat
+            for i in range(q.qsize()):
+
+                nexi = await q.get()
+                if nexi is None:
+                    done = True
+                    break
+
+                items.append(nexi)
+
+            yield items
+
+            if done:
+                return
 
     async def _getWaitFor(self, name, valu):
         form = self.model.form(name)
@@ -1066,13 +1308,41 @@ class Cortex(s_cell.Cell):
         stormvars = await self.hive.open(('cortex', 'storm', 'vars'))
         self.stormvars = await stormvars.dict()
 
+        stormbudgets = await self.hive.open(('cortex', 'storm', 'budgets'))
+        self.stormbudgets = await stormbudgets.dict()
+
+    async def getAxon(self):
+        '''
+        Get the Axon for the Cortex.
+
+        Notes:
+            The local Axon is opened in the background once the Cortex has
+            started ( setting axready ) or on the first call to getAxon().
+            This waits for a remote Axon to be connected.
+
+        Returns:
+            The local Axon or a telepath Proxy to the remote Axon.
+        '''
+        if self.axon is None and self.conf.get('axon') is None:
+
+            async with self.axonlock:
+
+                if self.isfini:
+                    raise s_exc.IsFini()
+
+                if self.axon is None:
+                    path = os.path.join(self.dirn, 'axon')
+                    self.axon = await s_axon.Axon.anit(path)
+                    self.axon.onfini(self.axready.clear)
+                    self.axready.set()
+
+        await self.axready.wait()
+        return self.axon
+
     async def _initCoreAxon(self):
         turl = self.conf.get('axon')
         if turl is None:
-            path = os.path.join(self.dirn, 'axon')
-            self.axon = await s_axon.Axon.anit(path)
-            self.axon.onfini(self.axready.clear)
-            self.axready.set()
+            # the local axon is opened by getAxon() once startup completes
             return
 
         async def teleloop():
@@ -1121,7 +1391,8 @@ class Cortex(s_cell.Cell):
         self.addStormLib(('user',), s_stormtypes.LibUser)
         self.addStormLib(('bytes',), s_stormtypes.LibBytes)
         self.addStormLib(('globals',), s_stormtypes.LibGlobals)
-        self.addStormLib(('inet', 'http'), s_stormhttp.LibHttp)
+        # imported on first use ( see getStormLib() )
+        self.addStormLib(('inet', 'http'), 'synapse.lib.stormhttp.LibHttp')
         self.addStormLib(('base64',), s_stormtypes.LibBase64)
 
     def _initSplicers(self):
@@ -1564,8 +1835,8 @@ class Cortex(s_cell.Cell):
         node = await self.hive.open(('cortex', 'layers'))
 
         # TODO eventually hold this and watch for changes
-        for iden, node in node:
-            await self._layrFromNode(node)
+        # layers are independent of each other so they are opened concurrently
+        await asyncio.gather(*[self._layrFromNode(kidn) for (iden, kidn) in node])
 
         self._migrOrigLayer()
 
@@ -1595,7 +1866,9 @@ class Cortex(s_cell.Cell):
         return self.stormcmds.get(name)
 
     def addStormLib(self, path, ctor):
-
+        '''
+        Register a Storm Library ctor ( or the dotted python path to one ) at a lib path.
+        '''
         root = self.libroot
         # (name, {kids}, {funcs})
 
@@ -1615,6 +1888,11 @@ class Cortex(s_cell.Cell):
             if step is None:
                 return None
             root = step
+
+        ctor = root[2].get('ctor')
+        if isinstance(ctor, str):
+            root[2]['ctor'] = s_dyndeps.tryDynLocal(ctor)
+
         return root
 
     def getStormCmds(self):
@@ -1646,24 +1924,7 @@ class Cortex(s_cell.Cell):
                     # use our iden as the feed iden
                     offs = await core.getFeedOffs(iden)
 
-                    while not self.isfini:
-                        layer = self.view.layers[0]
-
-                        items = [x async for x in layer.splices(offs, 10000)]
-
-                        if not items:
-                            await self.waitfini(timeout=1)
-                            continue
-
-                        size = len(items)
-                        indx = (await layer.stat())['splicelog_indx']
-
-                        perc = float(offs) / float(indx) * 100.0
-
-                        logger.info('splice push: %d %d/%d (%.4f%%)', size, offs, indx, perc)
-
-                        offs = await core.addFeedData('syn.splice', items, seqn=(iden, offs))
-                        await self.fire('core:splice:sync:sent')
+                    await self._pushSplices(core, iden, offs)
 
             except asyncio.CancelledError:
                 break
@@ -1675,6 +1936,99 @@ class Cortex(s_cell.Cell):
                 logger.exception('sync error')
                 await self.waitfini(timeout)
 
+    async def _pushSplices(self, core, iden, offs):
+        '''
+        Push splices to a remote cortex keeping up to PUSH_WINDOW batches in flight.
+
+        Notes:
+            Batches are acknowledged in order, and each batch is sized to
+            take about PUSH_LATENCY seconds for the remote cortex to ingest.
+            Remote cortexes which can not order in flight batches are sent
+            one batch at a time.
+        '''
+        size = PUSH_SIZE_MIN
+        window = PUSH_WINDOW
+
+        sendoffs = offs
+        lastack = time.monotonic()
+
+        inflight = collections.deque()
+
+        async def push(items, seqn):
+            if window > 1:
+                return await core.addOrderedFeedData('syn.splice', items, seqn)
+            return await core.addFeedData('syn.splice', items, seqn=seqn)
+
+        try:
+
+            while not self.isfini:
+
+                layer = self.view.layers[0]
+
+                while len(inflight) < window:
+
+                    items = [x async for x in layer.splices(sendoffs, size)]
+                    if not items:
+                        break
+
+                    indx = (await layer.stat())['splicelog_indx']
+                    perc = float(sendoffs) / float(indx) * 100.0
+
+                    logger.info('splice push: %d %d/%d (%.4f%%)', len(items), sendoffs, indx, perc)
+
+                    task = self.schedCoro(push(items, (iden, sendoffs)))
+                    inflight.append((task, time.monotonic()))
+
+                    sendoffs += len(items)
+
+                if not inflight:
+                    # wake as soon as there are new splices
+                    await s_coro.event_wait(layer.spliced, timeout=FEED_WAIT)
+                    continue
+
+                task, tick = inflight[0]
+
+                if not task.done() and len(inflight) < window:
+
+                    # also wake for new splices while waiting on the oldest batch
+                    wake = asyncio.ensure_future(layer.spliced.wait())
+
+                    try:
+                        await asyncio.wait((task, wake), return_when=asyncio.FIRST_COMPLETED)
+                    finally:
+                        wake.cancel()
+
+                    if not task.done():
+                        continue
+
+                inflight.popleft()
+
+                try:
+                    offs = await task
+
+                except s_exc.NoSuchMeth:
+                    logger.warning('splice push: remote cortex does not support ordered feeds')
+
+                    [t.cancel() for t, _ in inflight]
+                    inflight.clear()
+
+                    window = 1
+                    sendoffs = offs
+                    continue
+
+                # measure the time the remote spent on this batch alone
+                tock = time.monotonic()
+                took = max(tock - max(tick, lastack), 0.001)
+                lastack = tock
+
+                size = int(size * min(max(PUSH_LATENCY / took, 0.5), 2.0))
+                size = min(max(size, PUSH_SIZE_MIN), PUSH_SIZE_MAX)
+
+                await self.fire('core:splice:sync:sent')
+
+        finally:
+            [t.cancel() for t, _ in inflight]
+
     def _initCryoLoop(self):
 
         tankurl = self.conf.get('splice:cryotank')
@@ -1688,6 +2042,9 @@ class Cortex(s_cell.Cell):
         feeds:
             - cryotank: tcp://cryo.vertex.link/cryo00/tank01
               type: syn.splice
+              # optional server side filter ( see synapse.cryotank.getSliceFilt() )
+              filter:
+                - [[0], '=', 'node:add']
         '''
         feeds = self.conf.get('feeds', ())
         if not feeds:
@@ -1707,6 +2064,7 @@ class Cortex(s_cell.Cell):
         url = feed.get('cryotank')
         typename = feed.get('type')
         fsize = feed.get('size', 1000)
+        filt = feed.get('filter')
 
         logger.info('feed loop init: %s @ %s', typename, url)
 
@@ -1724,19 +2082,94 @@ class Cortex(s_cell.Cell):
 
                     offs = await layer.getOffset(iden)
 
-                    while not self.isfini:
+                    metrics = self.feedmetrics.get(iden)
+                    if metrics is None:
+                        metrics = self.feedmetrics[iden] = {
+                            'type': typename,
+                            'offs': offs,
+                            'lag:count': None,
+                            'time': None,
+                            'rate': 0,
+                            'count': 0,
+                            'bytes': 0,
+                            'chunks': 0,
+                            'fetch': 0,
+                            'ingest': 0,
+                        }
 
-                        items = [item async for item in tank.slice(offs, fsize)]
-                        if not items:
-                            await self.waitfini(timeout=2)
-                            continue
+                    async def fetch(offs):
+
+                        # long-poll the tank so new items arrive as soon as they are added
 
-                        datas = [i[1] for i in items]
+                        # filters run in the tank so the items arrive decoded
+                        if filt is not None:
+                            genr = tank.waitSlice(offs, fsize, timeout=FEED_WAIT, filt=filt, scanned=True)
+                            items = [item async for item in genr]
+                            # the tank reports the offset it scanned to ( past the items which did not match )
+                            nextoff, _ = items.pop()
+                            return items, 0, nextoff
 
-                        offs = await self.addFeedData(typename, datas, seqn=(iden, offs))
-                        await self.fire('core:feed:loop')
-                        logger.debug('Processed [%s] records with [%s]',
-                                     len(datas), typename)
+                        # pull raw rows and decode them once in a worker thread
+                        rows = [row async for row in tank.waitRows(offs, fsize, timeout=FEED_WAIT)]
+                        items = await s_coro.executor(_unpackFeedRows, rows)
+
+                        nextoff = offs
+                        if items:
+                            nextoff = items[-1][0] + 1
+
+                        return items, sum(len(r[1]) for r in rows), nextoff
+
+                    task = self.schedCoro(fetch(offs))
+
+                    try:
+
+                        while not self.isfini:
+
+                            tick = time.perf_counter()
+                            items, size, nextoff = await task
+                            tock = time.perf_counter()
+
+                            if not items:
+
+                                # records which did not match the filter are not scanned again
+                                if nextoff != offs:
+                                    await layer.setOffset(iden, nextoff)
+                                    offs = metrics['offs'] = nextoff
+
+                                metrics['lag:count'] = 0
+                                task = self.schedCoro(fetch(offs))
+                                continue
+
+                            # prefetch the next chunk while this one is ingested
+                            task = self.schedCoro(fetch(nextoff))
+
+                            datas = [i[1] for i in items]
+
+                            # filtered items may skip offsets so the offset is not derived from the item count
+                            await self.addFeedData(typename, datas)
+                            await layer.setOffset(iden, nextoff)
+                            offs = nextoff
+
+                            took = time.perf_counter() - tock
+
+                            last = await tank.last()
+
+                            metrics['offs'] = offs
+                            metrics['lag:count'] = 0 if last is None else max(last[0] + 1 - offs, 0)
+                            metrics['time'] = s_common.now()
+                            metrics['rate'] = len(datas) / max(time.perf_counter() - tick, 0.000001)
+                            metrics['count'] += len(datas)
+                            metrics['bytes'] += size
+                            metrics['chunks'] += 1
+                            metrics['fetch'] += tock - tick
+                            metrics['ingest'] += took
+
+                            await self.fire('core:feed:loop')
+                            logger.debug('Processed [%s] records with [%s]',
+                                         len(datas), typename)
+
+                    finally:
+                        task.cancel()
 
             except asyncio.CancelledError:
                 break
@@ -1747,6 +2180,17 @@ class Cortex(s_cell.Cell):
                 logger.exception('feed error')
                 await self.waitfini(timeout)
 
+    def getFeedMetrics(self):
+        '''
+        Return a dict of tank iden to throughput and lag metrics for the configured feeds.
+
+        Notes:
+            The lag:count is the number of records in the tank which have not
+            been ingested ( as of the last chunk ).  The fetch and ingest values are
+            the total seconds spent waiting for chunks and ingesting them.
+        '''
+        return {iden: dict(info) for iden, info in self.feedmetrics.items()}
+
     async def _runCryoLoop(self):
 
         online = False
@@ -2021,10 +2465,28 @@ class Cortex(s_cell.Cell):
         if user is None:
             user = self.auth.getUserByName('root')
 
-        await self.boss.promote('storm', user=user, info={'query': text})
-        async with await self.snap(user=user) as snap:
-            async for node in snap.eval(text, opts=opts, user=user):
-                yield node
+        synt = await self.boss.promote('storm', user=user, info={'query': text})
+        async with self._admitStorm(synt):
+            async with await self.snap(user=user) as snap:
+                snap.budget = self.getStormBudget(user)
+                async for node in snap.eval(text, opts=opts, user=user):
+                    yield node
+
+    @s_coro.genrhelp
+    async def evalStormQuery(self, query, opts=None, user=None):
+        '''
+        Evaluate an already parsed storm Query and yield Nodes only.
+        '''
+        if user is None:
+            user = self.auth.getUserByName('root')
+
+        synt = await self.boss.promote('storm', user=user, info={'query': query.text})
+        async with self._admitStorm(synt):
+            async with await self.snap(user=user) as snap:
+                snap.budget = self.getStormBudget(user)
+                with snap.getStormRuntime(opts=opts, user=user) as runt:
+                    async for node, path in runt.iterStormQuery(query):
+                        yield node
 
     @s_coro.genrhelp
     async def storm(self, text, opts=None, user=None):
@@ -2036,10 +2498,12 @@ class Cortex(s_cell.Cell):
         if user is None:
             user = self.auth.getUserByName('root')
 
-        await self.boss.promote('storm', user=user, info={'query': text})
-        async with await self.snap(user=user) as snap:
-            async for mesg in snap.storm(text, opts=opts, user=user):
-                yield mesg
+        synt = await self.boss.promote('storm', user=user, info={'query': text})
+        async with self._admitStorm(synt):
+            async with await self.snap(user=user) as snap:
+                snap.budget = self.getStormBudget(user)
+                async for mesg in snap.storm(text, opts=opts, user=user):
+                    yield mesg
 
     async def nodes(self, text, opts=None, user=None):
         '''
@@ -2081,22 +2545,25 @@ class Cortex(s_cell.Cell):
                 await chan.put(('init', {'tick': tick, 'text': text, 'task': synt.iden}))
 
                 shownode = (show is None or 'node' in show)
-                async with await self.snap(user=user) as snap:
+                async with self._admitStorm(synt):
+                    async with await self.snap(user=user) as snap:
 
-                    if show is None:
-                        snap.link(chan.put)
+                        snap.budget = self.getStormBudget(user)
 
-                    else:
-                        [snap.on(n, chan.put) for n in show]
+                        if show is None:
+                            snap.link(chan.put)
 
-                    if shownode:
-                        async for pode in snap.iterStormPodes(text, opts=opts, user=user):
-                            await chan.put(('node', pode))
-                            count += 1
+                        else:
+                            [snap.on(n, chan.put) for n in show]
 
-                    else:
-                        async for item in snap.storm(text, opts=opts, user=user):
-                            count += 1
+                        if shownode:
+                            async for pode in snap.iterStormPodes(text, opts=opts, user=user):
+                                await chan.put(('node', pode))
+                                count += 1
+
+                        else:
+                            async for item in snap.storm(text, opts=opts, user=user):
+                                count += 1
 
             except asyncio.CancelledError:
                 logger.warning('Storm runtime cancelled.')
@@ -2133,18 +2600,130 @@ class Cortex(s_cell.Cell):
         if user is None:
             user = self.auth.getUserByName('root')
 
-        await self.boss.promote('storm', user=user, info={'query': text})
-        async with await self.snap(user=user) as snap:
-            async for pode in snap.iterStormPodes(text, opts=opts, user=user):
-                yield pode
+        synt = await self.boss.promote('storm', user=user, info={'query': text})
+        async with self._admitStorm(synt):
+            async with await self.snap(user=user) as snap:
+                snap.budget = self.getStormBudget(user)
+                async for pode in snap.iterStormPodes(text, opts=opts, user=user):
+                    yield pode
+
+    def getStormBudgets(self):
+        '''
+        Return the configured storm budgets keyed by 'global' or user iden.
+        '''
+        return dict(self.stormbudgets.items())
+
+    async def setStormBudget(self, budget, user=None):
+        '''
+        Set the storm query budget and admission limits globally or for a user.
+
+        Args:
+            budget (dict): A dict of limits ( or None to remove them ).
+            user (str): A user iden, or None to set the global defaults.
+
+        Notes:
+            The following limits are supported::
+
+                rows - The maximum number of storage rows lifted by a query.
+                nodes - The maximum number of nodes yielded by a query.
+                time - The maximum run time of a query in milliseconds.
+                queries - The maximum number of concurrent queries ( globally or for the user ).
+
+            The global budget may also specify "user:queries" as the default
+            maximum number of concurrent queries for each user.
+        '''
+        name = 'global'
+        if user is not None:
+            if self.auth.user(user) is None:
+                raise s_exc.NoSuchUser(iden=user)
+            name = user
+
+        if budget is None:
+            await self.stormbudgets.pop(name)
+            return
+
+        valid = StormBudgetKeys
+        if user is None:
+            valid = valid + ('user:queries',)
+
+        for key, valu in budget.items():
+
+            if key not in valid:
+                mesg = f'Invalid storm budget key: {key}.'
+                raise s_exc.BadArg(mesg=mesg, name=key)
+
+            if valu is not None and (not isinstance(valu, int) or valu < 1):
+                mesg = f'Storm budget {key} must be a positive integer.'
+                raise s_exc.BadArg(mesg=mesg, name=key, valu=valu)
+
+        budget = {k: v for (k, v) in budget.items() if v is not None}
+        await self.stormbudgets.set(name, budget)
+
+    def _getStormLimits(self, user):
+
+        limits = dict(self.stormbudgets.get('global', default={}))
+
+        defuser = limits.pop('user:queries', None)
+        limits['user:queries'] = defuser
+
+        if user is not None:
+            info = self.stormbudgets.get(user.iden)
+            if info is not None:
+                for key, valu in info.items():
+                    if key == 'queries':
+                        limits['user:queries'] = valu
+                        continue
+                    limits[key] = valu
+
+        return limits
+
+    def getStormBudget(self, user):
+        '''
+        Return a storm.Budget() for a query run by the given user ( or None ).
+        '''
+        limits = self._getStormLimits(user)
+
+        rows = limits.get('rows')
+        nodes = limits.get('nodes')
+        time = limits.get('time')
+
+        if rows is None and nodes is None and time is None:
+            return None
+
+        return s_storm.Budget(rows=rows, nodes=nodes, time=time)
+
+    @contextlib.asynccontextmanager
+    async def _admitStorm(self, synt):
+        '''
+        Wait for the storm task to be admitted under the concurrency limits.
+        '''
+        limits = self._getStormLimits(synt.user)
+
+        maxtasks = limits.get('queries')
+        maxuser = limits.get('user:queries')
+
+        if maxtasks is None and maxuser is None:
+            yield
+            return
+
+        async with self.boss.admit(synt, maxtasks=maxtasks, maxuser=maxuser):
+            yield
 
-    @s_cache.memoize(size=10000)
     def getStormQuery(self, text):
         '''
         Parse storm query text and return a Query object.
+
+        Notes:
+            Parsed queries are kept in a bounded LRU cache keyed by the query text.
         '''
+        query = self.querycache.get(text)
+        if query is not None:
+            return query
+
         query = s_grammar.Parser(text).query()
         query.init(self)
+
+        self.querycache[text] = query
         return query
 
     def _logStormQuery(self, text, user):
@@ -2240,6 +2819,50 @@ class Cortex(s_cell.Cell):
             snap.strict = False
             return await snap.addFeedData(name, items, seqn=seqn)
 
+    async def addOrderedFeedData(self, name, items, seqn, user=None):
+        '''
+        Add data using a feed/parser function once the items before seqn have been added.
+
+        Args:
+            name (str): The name of the feed record format.
+            items (list): A list of items to ingest.
+            seqn ((str,int)): An (iden, offs) tuple for this feed chunk.
+            user (auth.User): The user to add the data as.
+
+        Returns:
+            (int): The next expected offset.
+        '''
+        iden, offs = seqn
+
+        nextoff = offs + len(items)
+        deadline = time.monotonic() + FEED_WAIT
+
+        while True:
+
+            if self.isfini:
+                raise s_exc.IsFini()
+
+            curoff = await self.getFeedOffs(iden)
+            if curoff >= nextoff:
+                return curoff
+
+            if curoff >= offs:
+                break
+
+            # wait for the prior chunks which are still in flight
+            if not await s_coro.event_wait(self.feedoffsevnt, deadline - time.monotonic()):
+                mesg = f'Timed out waiting for feed offset {offs} (currently {curoff}).'
+                raise s_exc.TimeOut(mesg=mesg, iden=iden, offs=offs)
+
+        async with await self.snap(user=user) as snap:
+            snap.strict = False
+            retn = await snap.addFeedData(name, items[curoff - offs:], seqn=(iden, curoff))
+
+        self.feedoffsevnt.set()
+        self.feedoffsevnt.clear()
+
+        return retn
+
     async def getFeedOffs(self, iden):
         return await self.view.layers[0].getOffset(iden)
 
@@ -2383,6 +3006,10 @@ class Cortex(s_cell.Cell):
             'iden': self.iden,
             'layer': await self.view.layers[0].stat(),
             'formcounts': self.counts,
+            'startup': {
+                'took': self.inittook,
+                'phases': dict(self.initphases),
+            },
         }
         return stats
 
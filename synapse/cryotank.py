@@ -1,4 +1,6 @@
 import os
+import time
+import bisect
 import shutil
 import asyncio
 import logging
@@ -8,17 +10,204 @@ import synapse.common as s_common
 
 import synapse.lib.base as s_base
 import synapse.lib.cell as s_cell
+import synapse.lib.coro as s_coro
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.lmdbslab as s_lmdbslab
 import synapse.lib.slabseqn as s_slabseqn
 
 logger = logging.getLogger(__name__)
 
+# the default maximum number of items in a tank segment
+SEG_SIZE = 10000000
+
+novalu = object()
+
+sliceTypes = {
+    'dict': (dict,),
+    'list': (list, tuple),
+    'str': (str,),
+    'int': (int,),
+    'float': (float,),
+    'bytes': (bytes,),
+    'bool': (bool,),
+    'null': (type(None),),
+}
+
+def _getPathValu(item, path):
+
+    for name in path:
+
+        if isinstance(item, dict):
+            item = item.get(name, novalu)
+            if item is novalu:
+                return novalu
+            continue
+
+        if isinstance(item, (list, tuple)) and isinstance(name, int):
+            if name >= len(item) or name < -len(item):
+                return novalu
+            item = item[name]
+            continue
+
+        return novalu
+
+    return item
+
+def _reqSlicePath(path):
+
+    if isinstance(path, (str, int)):
+        return (path,)
+
+    if not isinstance(path, (list, tuple)):
+        raise s_exc.BadArg(mesg=f'Invalid slice path: {path!r}', path=path)
+
+    return tuple(path)
+
+def _cmprType(valu):
+
+    types = sliceTypes.get(valu)
+    if types is None:
+        raise s_exc.BadArg(mesg=f'Invalid slice type name: {valu!r}', valu=valu)
+
+    if valu == 'int':
+        return lambda x: isinstance(x, int) and not isinstance(x, bool)
+
+    return lambda x: isinstance(x, types)
+
+def _cmprPref(valu):
+
+    if isinstance(valu, str):
+        return lambda x: isinstance(x, str) and x.startswith(valu)
+
+    if isinstance(valu, bytes):
+        return lambda x: isinstance(x, bytes) and x.startswith(valu)
+
+    if isinstance(valu, (list, tuple)):
+        valu = tuple(valu)
+        size = len(valu)
+        return lambda x: isinstance(x, (list, tuple)) and tuple(x[:size]) == valu
+
+    raise s_exc.BadArg(mesg=f'Invalid slice prefix: {valu!r}', valu=valu)
+
+def _cmprIn(valu):
+
+    if not isinstance(valu, (list, tuple)):
+        raise s_exc.BadArg(mesg=f'Invalid slice "in" values: {valu!r}', valu=valu)
+
+    valu = tuple(valu)
+    return lambda x: x in valu
+
+sliceCmprs = {
+    '=': lambda valu: lambda x: x == valu,
+    '!=': lambda valu: lambda x: x != valu,
+    '^=': _cmprPref,
+    'in': _cmprIn,
+    'type': _cmprType,
+}
+
+def getSliceFilt(filt):
+    '''
+    Construct a function which returns True for items which match a slice filter.
+
+    Args:
+        filt (list): A list of (path, cmpr, valu) conditions which must all match.
+
+    Notes:
+        A path is a list of dict keys and list indexes into the item ( or a
+        single key ).  The empty path () refers to the item itself.  Items
+        which do not have a value at the path do not match.  The supported
+        comparators are:
+
+            =       The value is equal to valu.
+            !=      The value is not equal to valu.
+            ^=      The str, bytes or list value begins with valu.
+            in      The value is one of the list of values in valu.
+            type    The value is of the named type ( dict, list, str, int, float, bytes, bool or null ).
+
+    Example:
+
+        # syn.nodes records for inet:fqdn nodes in the .com zone
+        filt = (
+            ((0, 0), '=', 'inet:fqdn'),
+            ((1, 'props', 'zone'), '=', 'com'),
+        )
+
+    Returns:
+        (function): A function which takes an item and returns a bool.
+    '''
+    conds = []
+    for cond in filt:
+
+        if not isinstance(cond, (list, tuple)) or len(cond) != 3:
+            raise s_exc.BadArg(mesg=f'Invalid slice filter condition: {cond!r}', cond=cond)
+
+        path, cmpr, valu = cond
+
+        ctor = sliceCmprs.get(cmpr)
+        if ctor is None:
+            raise s_exc.BadArg(mesg=f'Invalid slice comparator: {cmpr!r}', cmpr=cmpr)
+
+        conds.append((_reqSlicePath(path), ctor(valu)))
+
+    def func(item):
+
+        for path, cmpr in conds:
+
+            valu = _getPathValu(item, path)
+            if valu is novalu or not cmpr(valu):
+                return False
+
+        return True
+
+    return func
+
+def getSliceProj(proj):
+    '''
+    Construct a function which projects a list of paths from an item.
+
+    Args:
+        proj (list): A list of paths ( see getSliceFilt() ).
+
+    Returns:
+        (function): A function which takes an item and returns a tuple of values ( None for missing values ).
+    '''
+    paths = [_reqSlicePath(p) for p in proj]
+
+    def func(item):
+        retn = []
+        for path in paths:
+            valu = _getPathValu(item, path)
+            retn.append(None if valu is novalu else valu)
+        return tuple(retn)
+
+    return func
+
 class TankApi(s_cell.CellApi):
 
-    async def slice(self, offs, size=None, iden=None):
-        async for item in self.cell.slice(offs, size=size, iden=iden):
+    async def slice(self, offs, size=None, iden=None, filt=None, proj=None):
+        async for item in self.cell.slice(offs, size=size, iden=iden, filt=filt, proj=proj):
+            yield item
+
+    async def rows(self, offs, size=None, iden=None):
+        async for item in self.cell.rows(offs, size=size, iden=iden):
+            yield item
+
+    async def waitSlice(self, offs, size=None, timeout=None, iden=None, filt=None, proj=None, scanned=False):
+        async for item in self.cell.waitSlice(offs, size=size, timeout=timeout, iden=iden, filt=filt, proj=proj,
+                                              scanned=scanned):
+            yield item
+
+    async def waitRows(self, offs, size=None, timeout=None, iden=None):
+        async for item in self.cell.waitRows(offs, size=size, timeout=timeout, iden=iden):
             yield item
 
+    async def follow(self, offs, iden=None, filt=None, proj=None):
+        async for item in self.cell.follow(offs, iden=iden, filt=filt, proj=proj):
+            yield item
+
+    async def last(self):
+        return self.cell.last()
+
     async def puts(self, items, seqn=None):
         return await self.cell.puts(items, seqn=seqn)
 
@@ -32,9 +221,46 @@ class TankApi(s_cell.CellApi):
     async def iden(self):
         return await self.cell.iden()
 
+class TankSeg:
+    '''
+    A contiguous range of CryoTank items stored in one slab.
+
+    Notes:
+        Items are keyed by their global tank offset, so a segment which
+        starts at offset 1000 stores its first item at index 1000.
+    '''
+    def __init__(self, slab, start, info, path=None):
+
+        self.slab = slab
+        self.path = path
+        self.info = info
+        self.start = start
+
+        self.items = s_slabseqn.SlabSeqn(slab, 'items')
+
+        # the number of active iterators over the segment ( see CryoTank._iterTankSegs() )
+        self.readers = 0
+
+        # nextindx() of an empty sequence is 0
+        if self.items.index() < start:
+            self.items.indx = start
+
+    def count(self):
+        return self.items.index() - self.start
+
 class CryoTank(s_base.Base):
     '''
     A CryoTank implements a stream of structured data.
+
+    Notes:
+        Items are stored in a series of segment slabs ( tanks created
+        before segments were added keep their items in tank.lmdb as the
+        first segment ).  A new segment is started once the current one
+        has segment:size items or is older than segment:time milliseconds.
+        Old segments are removed as a whole under the retention:segments
+        and retention:time options ( along with their metrics rows ).
+        Retention is applied when a new segment is started and when the
+        tank is opened.
     '''
     async def __anit__(self, dirn, conf=None):
 
@@ -54,11 +280,211 @@ class CryoTank(s_base.Base):
 
         self.offs = s_lmdbslab.Offs(self.slab, 'offsets')
 
-        self._items = s_slabseqn.SlabSeqn(self.slab, 'items')
         self._metrics = s_slabseqn.SlabSeqn(self.slab, 'metrics')
 
+        # pulsed when items are added to wake waitSlice() / follow() callers
+        self.itemevnt = asyncio.Event()
+        self.onfini(self.itemevnt.set)
+
+        self.segs = []
+        # segments removed by retention which are still being read
+        self.oldsegs = set()
+        self.segdir = s_common.gendir(self.dirn, 'segs')
+
+        # segment start offset -> segment info
+        self.segsdb = self.slab.initdb('segs')
+
+        self.onfini(self._finiTankSegs)
         self.onfini(self.slab.fini)
 
+        await self._initTankSegs()
+
+    async def _initTankSegs(self):
+
+        for lkey, lval in self.slab.scanByFull(db=self.segsdb):
+            await self._loadTankSeg(s_common.int64un(lkey), s_msgpack.un(lval))
+
+        if not self.segs:
+
+            legacy = TankSeg(self.slab, 0, {})
+            if legacy.count():
+                info = {'time': s_common.now(), 'legacy': True}
+                self.slab.put(s_common.int64en(0), s_msgpack.en(info), db=self.segsdb)
+                self.segs.append(TankSeg(self.slab, 0, info))
+
+        await self._pruneTankSegs()
+
+    async def _finiTankSegs(self):
+
+        for seg in self.segs:
+            if seg.path is not None:
+                await seg.slab.fini()
+
+        for seg in list(self.oldsegs):
+            await self._rmTankSeg(seg)
+
+    def _getSegPath(self, start):
+        return os.path.join(self.segdir, '%.16x.lmdb' % (start,))
+
+    async def _loadTankSeg(self, start, info):
+
+        if info.get('legacy'):
+            seg = TankSeg(self.slab, start, info)
+
+        else:
+            path = self._getSegPath(start)
+            slab = await s_lmdbslab.Slab.anit(path)
+            seg = TankSeg(slab, start, info, path=path)
+
+        self.segs.append(seg)
+        return seg
+
+    def _isSegFull(self, seg):
+
+        if not seg.count():
+            return False
+
+        size = self.conf.get('segment:size', SEG_SIZE)
+        if size is not None and seg.count() >= size:
+            return True
+
+        maxtime = self.conf.get('segment:time')
+        if maxtime is not None and s_common.now() - seg.info.get('time') >= maxtime:
+            return True
+
+        return False
+
+    async def _getWriteSeg(self):
+
+        if self.segs:
+
+            seg = self.segs[-1]
+            if not self._isSegFull(seg):
+                return seg
+
+            seg.info['tock'] = s_common.now()
+            self.slab.put(s_common.int64en(seg.start), s_msgpack.en(seg.info), db=self.segsdb)
+
+        start = self.index()
+        info = {'time': s_common.now()}
+
+        self.slab.put(s_common.int64en(start), s_msgpack.en(info), db=self.segsdb)
+
+        seg = await self._loadTankSeg(start, info)
+
+        await self._pruneTankSegs()
+
+        return seg
+
+    async def _pruneTankSegs(self):
+        '''
+        Remove the oldest segments according to the retention options ( the current segment is never removed ).
+        '''
+        maxsegs = self.conf.get('retention:segments')
+        maxtime = self.conf.get('retention:time')
+
+        while len(self.segs) > 1:
+
+            seg = self.segs[0]
+
+            if maxsegs is not None and len(self.segs) > maxsegs:
+                await self._delTankSeg(seg)
+                continue
+
+            tock = seg.info.get('tock')
+            if maxtime is not None and tock is not None and s_common.now() - tock >= maxtime:
+                await self._delTankSeg(seg)
+                continue
+
+            return
+
+    async def _delTankSeg(self, seg):
+
+        logger.info('Removing tank segment [%s] at offset %d (%d items)', self.dirn, seg.start, seg.count())
+
+        self.segs.remove(seg)
+        self.slab.delete(s_common.int64en(seg.start), db=self.segsdb)
+
+        self._pruneTankMetrics(seg.start + seg.count())
+
+        self.oldsegs.add(seg)
+
+        # a segment which is being read is removed once the last reader is done
+        if seg.readers:
+            return
+
+        await self._rmTankSeg(seg)
+
+    def _pruneTankMetrics(self, offs):
+        '''
+        Remove the metrics rows for saves which ended at or before offs ( the last row is kept to preserve the metrics index ).
+        '''
+        last = self._metrics.last()
+        if last is None:
+            return
+
+        lkeys = []
+        for indx, item in self._metrics.iter(0):
+
+            if indx == last[0] or item.get('indx') > offs:
+                break
+
+            lkeys.append(s_common.int64en(indx))
+
+        for lkey in lkeys:
+            self.slab.delete(lkey, db=self._metrics.db)
+
+    async def _rmTankSeg(self, seg):
+
+        if seg not in self.oldsegs:
+            return
+
+        self.oldsegs.remove(seg)
+
+        if seg.path is None:
+            self.slab.dropdb('items')
+            return
+
+        await seg.slab.fini()
+        shutil.rmtree(seg.path, ignore_errors=True)
+
+    def _iterTankSegs(self, offs):
+        '''
+        Yield the segments which may contain items at or after offs ( including segments added while iterating ).
+
+        Notes:
+            A segment which is removed by retention while it is being read
+            is not deleted until the last reader is done with it.
+        '''
+        starts = [seg.start for seg in self.segs]
+        indx = max(bisect.bisect_right(starts, offs) - 1, 0)
+
+        while indx < len(self.segs):
+
+            seg = self.segs[indx]
+
+            seg.readers += 1
+
+            try:
+                yield seg
+
+            finally:
+                seg.readers -= 1
+                if not seg.readers and seg in self.oldsegs and not self.isfini:
+                    self.schedCoro(self._rmTankSeg(seg))
+
+            # removed segments are skipped
+            starts = [seg.start for seg in self.segs]
+            indx = bisect.bisect_right(starts, seg.start)
+
+    def index(self):
+        '''
+        Return the offset of the next item to be added to the tank.
+        '''
+        if not self.segs:
+            return 0
+        return self.segs[-1].items.index()
+
     async def iden(self):
         return self._iden
 
@@ -98,7 +524,10 @@ class CryoTank(s_base.Base):
         '''
         Return an (offset, item) tuple for the last element in the tank ( or None ).
         '''
-        return self._items.last()
+        for seg in reversed(self.segs):
+            last = seg.items.last()
+            if last is not None:
+                return last
 
     async def puts(self, items, seqn=None):
         '''
@@ -114,10 +543,26 @@ class CryoTank(s_base.Base):
         size = 0
 
         for chunk in s_common.chunks(items, 1000):
-            metrics = self._items.save(chunk)
-            self._metrics.add(metrics)
-            await self.fire('cryotank:puts', numrecords=len(chunk))
-            size += len(chunk)
+
+            while chunk:
+
+                seg = await self._getWriteSeg()
+
+                # do not overfill the segment
+                segsize = self.conf.get('segment:size', SEG_SIZE)
+                if segsize is not None:
+                    save, chunk = chunk[:segsize - seg.count()], chunk[segsize - seg.count():]
+                else:
+                    save, chunk = chunk, ()
+
+                metrics = seg.items.save(save)
+                self._metrics.add(metrics)
+                await self.fire('cryotank:puts', numrecords=len(save))
+                size += len(save)
+
+                self.itemevnt.set()
+                self.itemevnt.clear()
+
             await asyncio.sleep(0)
 
         if seqn is not None:
@@ -144,13 +589,19 @@ class CryoTank(s_base.Base):
 
             yield indx, item
 
-    async def slice(self, offs, size=None, iden=None):
+    async def slice(self, offs, size=None, iden=None, filt=None, proj=None):
         '''
         Yield a number of items from the CryoTank starting at a given offset.
 
         Args:
             offs (int): The index of the desired datum (starts at 0)
             size (int): The max number of items to yield.
+            filt (list): A list of (path, cmpr, valu) conditions items must match ( see getSliceFilt() ).
+            proj (list): A list of paths to yield from each item instead of the item ( see getSliceProj() ).
+
+        Notes:
+            When a filter is specified, size limits the number of matching
+            items and the index of each item is its offset in the tank.
 
         Yields:
             ((index, object)): Index and item values.
@@ -158,11 +609,56 @@ class CryoTank(s_base.Base):
         if iden is not None:
             self.setOffset(iden, offs)
 
-        for i, (indx, item) in enumerate(self._items.iter(offs)):
+        async for item in self._slice(offs, size=size, filt=filt, proj=proj):
+            yield item
 
-            if size is not None and i >= size:
+    async def _slice(self, offs, size=None, filt=None, proj=None, scan=None):
+        '''
+        Yield items as slice() does while recording the offset after the last item scanned in scan['offs'].
+        '''
+        if scan is None:
+            scan = {}
+
+        scan['offs'] = offs
+
+        if filt is None and proj is None:
+
+            for i, (indx, item) in enumerate(self._iterItems(offs)):
+
+                if size is not None and i >= size:
+                    return
+
+                scan['offs'] = indx + 1
+                yield indx, item
+
+            return
+
+        filtfunc = None
+        if filt is not None:
+            filtfunc = getSliceFilt(filt)
+
+        projfunc = None
+        if proj is not None:
+            projfunc = getSliceProj(proj)
+
+        count = 0
+        for i, (indx, item) in enumerate(self._iterItems(offs)):
+
+            if size is not None and count >= size:
                 return
 
+            if i % 1000 == 999:
+                await asyncio.sleep(0)
+
+            scan['offs'] = indx + 1
+
+            if filtfunc is not None and not filtfunc(item):
+                continue
+
+            if projfunc is not None:
+                item = projfunc(item)
+
+            count += 1
             yield indx, item
 
     async def rows(self, offs, size=None, iden=None):
@@ -179,13 +675,118 @@ class CryoTank(s_base.Base):
         if iden is not None:
             self.setOffset(iden, offs)
 
-        for i, (indx, byts) in enumerate(self._items.rows(offs)):
+        for i, (indx, byts) in enumerate(self._iterRows(offs)):
 
             if size is not None and i >= size:
                 return
 
             yield indx, byts
 
+    async def waitItems(self, offs, timeout=None):
+        '''
+        Wait for the tank to contain items at or after the given offset.
+
+        Args:
+            offs (int): The offset of the desired item.
+            timeout (float): The maximum number of seconds to wait ( or None to wait forever ).
+
+        Returns:
+            (bool): True if the tank contains items at or after offs.
+        '''
+        while self.index() <= offs:
+
+            if self.isfini:
+                return False
+
+            if not await s_coro.event_wait(self.itemevnt, timeout=timeout):
+                return self.index() > offs
+
+        return True
+
+    async def waitSlice(self, offs, size=None, timeout=None, iden=None, filt=None, proj=None, scanned=False):
+        '''
+        Wait up to timeout seconds for items at offs and then yield them as slice() does.
+
+        Args:
+            scanned (bool): Yield a final (offs, None) tuple with the offset after the last item scanned.
+
+        Notes:
+            This allows a consumer to long-poll the tank rather than sleeping
+            between calls to slice() which return no items.  When a filter is
+            specified, this waits until matching items are added.  A filtered
+            consumer should resume from the scanned offset so the items which
+            did not match are not scanned again.
+        '''
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+
+        while True:
+
+            wait = None
+            if deadline is not None:
+                wait = max(deadline - time.monotonic(), 0)
+
+            if not await self.waitItems(offs, timeout=wait):
+                break
+
+            if iden is not None:
+                self.setOffset(iden, offs)
+
+            count = 0
+            scan = {}
+            async for item in self._slice(offs, size=size, filt=filt, proj=proj, scan=scan):
+                count += 1
+                yield item
+
+            # none of the new items may have matched the filter
+            offs = scan['offs']
+
+            if count or filt is None:
+                break
+
+        if scanned:
+            yield offs, None
+
+    async def waitRows(self, offs, size=None, timeout=None, iden=None):
+        '''
+        Wait up to timeout seconds for items at offs and then yield them as rows() does.
+        '''
+        await self.waitItems(offs, timeout=timeout)
+        async for item in self.rows(offs, size=size, iden=iden):
+            yield item
+
+    async def follow(self, offs, iden=None, filt=None, proj=None):
+        '''
+        Yield (indx, item) tuples from offs and then yield new items as they are added.
+
+        Notes:
+            This generator does not return until the tank is fini'd.  When an
+            iden is specified, its offset is updated each time the follower
+            catches up.
+        '''
+        while not self.isfini:
+
+            async for indx, item in self.slice(offs, iden=iden, filt=filt, proj=proj):
+                offs = indx + 1
+                yield indx, item
+
+            # filtered items may have been skipped
+            offs = max(offs, self.index())
+
+            if iden is not None:
+                self.setOffset(iden, offs)
+
+            await self.waitItems(offs)
+
+    def _iterItems(self, offs):
+        for seg in self._iterTankSegs(offs):
+            yield from seg.items.iter(offs)
+
+    def _iterRows(self, offs):
+        for seg in self._iterTankSegs(offs):
+            yield from seg.items.rows(offs)
+
     async def info(self):
         '''
         Returns information about the CryoTank instance.
@@ -193,8 +794,18 @@ class CryoTank(s_base.Base):
         Returns:
             dict: A dict containing items and metrics indexes.
         '''
-        stat = self._items.stat()
-        return {'indx': self._items.index(), 'metrics': self._metrics.index(), 'stat': stat}
+        stat = {'entries': 0, 'branch_pages': 0, 'leaf_pages': 0, 'overflow_pages': 0}
+        segs = []
+
+        for seg in self.segs:
+
+            segstat = seg.items.stat()
+            for name in stat:
+                stat[name] += segstat.get(name)
+
+            segs.append((seg.start, seg.count(), dict(seg.info)))
+
+        return {'indx': self.index(), 'metrics': self._metrics.index(), 'stat': stat, 'segs': segs}
 
 class CryoApi(s_cell.CellApi):
     '''
@@ -206,9 +817,9 @@ class CryoApi(s_cell.CellApi):
         await self.cell.init(name, conf=conf)
         return True
 
-    async def slice(self, name, offs, size=None, iden=None):
+    async def slice(self, name, offs, size=None, iden=None, filt=None, proj=None):
         tank = await self.cell.init(name)
-        async for item in tank.slice(offs, size=size, iden=iden):
+        async for item in tank.slice(offs, size=size, iden=iden, filt=filt, proj=proj):
             yield item
 
     async def list(self):
@@ -231,6 +842,22 @@ class CryoApi(s_cell.CellApi):
         async for item in tank.rows(offs, size, iden=iden):
             yield item
 
+    async def waitSlice(self, name, offs, size=None, timeout=None, iden=None, filt=None, proj=None, scanned=False):
+        tank = await self.cell.init(name)
+        async for item in tank.waitSlice(offs, size=size, timeout=timeout, iden=iden, filt=filt, proj=proj,
+                                         scanned=scanned):
+            yield item
+
+    async def waitRows(self, name, offs, size=None, timeout=None, iden=None):
+        tank = await self.cell.init(name)
+        async for item in tank.waitRows(offs, size=size, timeout=timeout, iden=iden):
+            yield item
+
+    async def follow(self, name, offs, iden=None, filt=None, proj=None):
+        tank = await self.cell.init(name)
+        async for item in tank.follow(offs, iden=iden, filt=filt, proj=proj):
+            yield item
+
     async def metrics(self, name, offs, size=None):
         tank = await self.cell.init(name)
         async for item in tank.metrics(offs, size=size):
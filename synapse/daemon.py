@@ -1,3 +1,4 @@
+import time
 import types
 import asyncio
 import logging
@@ -12,8 +13,11 @@ import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
 import synapse.lib.scope as s_scope
+import synapse.lib.const as s_const
 import synapse.lib.share as s_share
 import synapse.lib.certdir as s_certdir
+import synapse.lib.callstats as s_callstats
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.urlhelp as s_urlhelp
 import synapse.lib.reflect as s_reflect
 
@@ -27,6 +31,12 @@ class Sess(s_base.Base):
         self.iden = s_common.guid()
         self.user = None
 
+        # set during tele:syn if the client can receive t2:yields batches
+        self.batch = False
+
+        # the zlib level negotiated during tele:syn ( or None )
+        self.zlib = None
+
     def getSessItem(self, name):
         return self.items.get(name)
 
@@ -36,6 +46,73 @@ class Sess(s_base.Base):
     def popSessItem(self, name):
         return self.items.pop(name, None)
 
+class Credit:
+    '''
+    The items and bytes which a client has granted to a t2 generator stream.
+
+    Notes:
+        A limit of None is unlimited.  Bytes are only counted for items which
+        are sent in t2:yields batches because the client measures the encoded
+        size of each batched item when it grants more credit.
+    '''
+    def __init__(self, info=None):
+
+        self.items = None
+        self.size = None
+
+        # the window from the t2:init message ( or None )
+        if info is not None:
+            self.items = info.get('items')
+            self.size = info.get('bytes')
+
+        self.isfini = False
+        self.evnt = asyncio.Event()
+
+    def grant(self, items=0, size=0):
+
+        if self.items is not None:
+            self.items += items
+
+        if self.size is not None:
+            self.size += size
+
+        if self.ready():
+            self.evnt.set()
+
+    def take(self, size=0):
+
+        if self.items is not None:
+            self.items -= 1
+
+        if self.size is not None:
+            self.size -= size
+
+    def ready(self):
+
+        if self.items is not None and self.items <= 0:
+            return False
+
+        if self.size is not None and self.size <= 0:
+            return False
+
+        return True
+
+    async def wait(self):
+        '''
+        Wait for the client to grant credit.
+        '''
+        while not self.ready():
+
+            if self.isfini:
+                raise s_exc.IsFini()
+
+            self.evnt.clear()
+            await self.evnt.wait()
+
+    def fini(self):
+        self.isfini = True
+        self.evnt.set()
+
 class Genr(s_share.Share):
 
     typename = 'genr'
@@ -120,6 +197,16 @@ class Daemon(s_base.Base):
 
         self.televers = s_telepath.televers
 
+        # limits for t2:yields batches sent to clients which support them
+        self.batchitems = 1000
+        self.batchbytes = s_const.mebibyte
+
+        # allow clients to negotiate zlib compressed links
+        self.zlib = True
+
+        # per-method stats for t2 calls ( wait is the time spent waiting to be scheduled )
+        self.callstats = s_callstats.CallStats(hists=('took', 'wait'))
+
         self.addr = None    # our main listen address
         self.cells = {}     # all cells are shared.  not all shared are cells.
         self.shared = {}    # objects provided by daemon
@@ -135,6 +222,8 @@ class Daemon(s_base.Base):
 
             # task version 2 API
             't2:init': self._onTaskV2Init,
+            't2:credit': self._onTaskV2Credit,
+            't2:cancel': self._onTaskV2Cancel,
         }
 
         self.onfini(self._onDmonFini)
@@ -180,6 +269,16 @@ class Daemon(s_base.Base):
 
         return ret
 
+    def getCallStats(self):
+        '''
+        Get per-method stats for the t2 calls handled by the Daemon.
+
+        Returns:
+            dict: A dict of method name to count, errs, rxsize, txsize and
+            "took" / "wait" latency histograms ( in seconds ).
+        '''
+        return self.callstats.pack()
+
     def share(self, name, item):
         '''
         Share an object via the telepath protocol.
@@ -228,12 +327,12 @@ class Daemon(s_base.Base):
                 if mesg is None:
                     return
 
-                coro = self._onLinkMesg(link, mesg)
+                coro = self._onLinkMesg(link, mesg, link.rxsize, time.perf_counter())
                 self.schedCoro(coro)
 
         self.schedCoro(rxloop())
 
-    async def _onLinkMesg(self, link, mesg):
+    async def _onLinkMesg(self, link, mesg, size=0, tick=None):
 
         try:
             func = self.mesgfuncs.get(mesg[0])
@@ -241,6 +340,9 @@ class Daemon(s_base.Base):
                 logger.exception('Dmon.onLinkMesg Invalid: %.80r' % (mesg,))
                 return
 
+            # the message size and receive time are used for call stats
+            s_scope.set('link:rx', (size, tick))
+
             await func(link, mesg)
 
         except Exception:
@@ -301,6 +403,8 @@ class Daemon(s_base.Base):
 
             link.set('sess', sess)
 
+            sess.batch = bool(mesg[1].get('batch'))
+
             if isinstance(item, s_telepath.Aware):
                 item = await s_coro.ornot(item.getTeleApi, link, mesg, path)
                 if isinstance(item, s_base.Base):
@@ -311,12 +415,27 @@ class Daemon(s_base.Base):
             sess.setSessItem(None, item)
             reply[1]['sess'] = sess.iden
 
+            # we route t2 responses by call id for multiplexed links
+            reply[1]['mux'] = True
+
+            zlvl = mesg[1].get('zlib')
+            if zlvl and self.zlib:
+                sess.zlib = min(max(int(zlvl), 1), 9)
+                reply[1]['zlib'] = sess.zlib
+                # the client may compress as soon as it receives the reply
+                link.allowZlib()
+
         except Exception as e:
             logger.exception('tele:syn error')
             reply[1]['retn'] = s_common.retnexc(e)
 
         await link.tx(reply)
 
+        # the reply is sent uncompressed so the client can read it either way
+        zlvl = reply[1].get('zlib')
+        if zlvl is not None:
+            link.setZlib(zlvl)
+
     async def _runTodoMeth(self, link, meth, args, kwargs):
 
         valu = meth(*args, **kwargs)
@@ -348,6 +467,22 @@ class Daemon(s_base.Base):
         sidn = mesg[1].get('sess')
         todo = mesg[1].get('todo')
 
+        # the call id is used by clients which have many calls in flight on the link
+        call = mesg[1].get('call')
+
+        calls = self._getLinkCalls(link)
+
+        credit = Credit(mesg[1].get('credit'))
+        calls[call] = (asyncio.current_task(), credit)
+
+        tick = time.perf_counter()
+        rxsize, rxtick = s_scope.get('link:rx', (0, None))
+
+        if rxtick is None:
+            rxtick = tick
+
+        stat = {'name': None, 'txsize': 0, 'err': False}
+
         try:
 
             if sidn is None or todo is None:
@@ -357,6 +492,10 @@ class Daemon(s_base.Base):
             if sess is None:
                 raise s_exc.NoSuchObj(name=name)
 
+            # pool links do not handshake so compress using the session level
+            if sess.zlib is not None:
+                link.setZlib(sess.zlib)
+
             item = sess.getSessItem(name)
             if item is None:
                 raise s_exc.NoSuchObj(name=name)
@@ -374,6 +513,9 @@ class Daemon(s_base.Base):
                 logger.warning(f'{item!r} has no method: {methname}')
                 raise s_exc.NoSuchMeth(name=methname)
 
+            # only record stats for methods which exist ( the name is client supplied )
+            stat['name'] = methname
+
             valu = meth(*args, **kwargs)
 
             if s_coro.iscoro(valu):
@@ -383,48 +525,228 @@ class Daemon(s_base.Base):
                 if isinstance(valu, types.AsyncGeneratorType):
                     desc = 'async generator'
 
-                    await link.tx(('t2:genr', {}))
+                    stat['txsize'] += await link.tx(('t2:genr', {'call': call}))
+
+                    if sess.batch:
+                        await self._txAsyncGenrBatches(link, call, valu, credit, stat)
+                        return
 
                     async for item in valu:
-                        await link.tx(('t2:yield', {'retn': (True, item)}))
+                        stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': (True, item)}))
+                        credit.take()
+                        await credit.wait()
 
-                    await link.tx(('t2:yield', {'retn': None}))
+                    stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': None}))
                     return
 
                 elif isinstance(valu, types.GeneratorType):
                     desc = 'generator'
 
-                    await link.tx(('t2:genr', {}))
+                    stat['txsize'] += await link.tx(('t2:genr', {'call': call}))
+
+                    if sess.batch:
+                        await self._txGenrBatches(link, call, valu, credit, stat)
+                        return
 
                     for item in valu:
-                        await link.tx(('t2:yield', {'retn': (True, item)}))
+                        stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': (True, item)}))
+                        credit.take()
+                        await credit.wait()
 
-                    await link.tx(('t2:yield', {'retn': None}))
+                    stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': None}))
                     return
 
+            except asyncio.CancelledError as e:
+                # the task was killed or the client cancelled the call
+                stat['err'] = True
+                if not link.isfini:
+                    retn = s_common.retnexc(e)
+                    stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': retn}))
+
+                return
+
             except Exception as e:
+                stat['err'] = True
                 logger.exception(f'error during {desc} task: {methname}')
                 if not link.isfini:
                     retn = s_common.retnexc(e)
-                    await link.tx(('t2:yield', {'retn': retn}))
+                    stat['txsize'] += await link.tx(('t2:yield', {'call': call, 'retn': retn}))
 
                 return
 
             if isinstance(valu, s_share.Share):
                 sess.onfini(valu)
                 info = s_reflect.getShareInfo(valu)
-                await link.tx(('t2:share', {'iden': valu.iden, 'sharinfo': info}))
+                stat['txsize'] += await link.tx(('t2:share', {'call': call, 'iden': valu.iden, 'sharinfo': info}))
                 return
 
-            await link.tx(('t2:fini', {'retn': (True, valu)}))
+            stat['txsize'] += await link.tx(('t2:fini', {'call': call, 'retn': (True, valu)}))
 
         except Exception as e:
 
+            stat['err'] = True
             logger.exception('on t2:init: %r' % (mesg,))
 
             if not link.isfini:
                 retn = s_common.retnexc(e)
-                await link.tx(('t2:fini', {'retn': retn}))
+                stat['txsize'] += await link.tx(('t2:fini', {'call': call, 'retn': retn}))
+
+        finally:
+            calls.pop(call, None)
+
+            if stat['name'] is not None:
+                self.callstats.add(stat['name'], time.perf_counter() - tick, rxsize=rxsize,
+                                   txsize=stat['txsize'], err=stat['err'], wait=tick - rxtick)
+
+    def _getLinkCalls(self, link):
+
+        calls = link.get('calls')
+        if calls is None:
+
+            calls = {}
+            link.set('calls', calls)
+
+            async def fini():
+                for task, credit in list(calls.values()):
+                    credit.fini()
+
+            link.onfini(fini)
+
+        return calls
+
+    async def _onTaskV2Credit(self, link, mesg):
+
+        # t2:credit is sent by clients as they consume generator items
+        item = self._getLinkCalls(link).get(mesg[1].get('call'))
+        if item is None:
+            return
+
+        task, credit = item
+        credit.grant(items=mesg[1].get('items', 0), size=mesg[1].get('bytes', 0))
+
+    async def _onTaskV2Cancel(self, link, mesg):
+
+        # t2:cancel is sent by clients which stop consuming a generator on a shared link
+        item = self._getLinkCalls(link).get(mesg[1].get('call'))
+        if item is None:
+            return
+
+        task, credit = item
+        task.cancel()
+
+    async def _txGenrBatches(self, link, call, genr, credit, stat):
+        '''
+        Transmit the items from a generator as t2:yields batches.
+        '''
+        size = 0
+        items = []
+
+        try:
+
+            for item in genr:
+
+                byts = s_msgpack.en((True, item))
+
+                size += len(byts)
+                items.append(byts)
+
+                credit.take(len(byts))
+
+                if len(items) >= self.batchitems or size >= self.batchbytes or not credit.ready():
+                    stat['txsize'] += await link.tx(('t2:yields', {'call': call, 'items': items}))
+                    size = 0
+                    items = []
+
+                await credit.wait()
+
+            items.append(s_msgpack.en(None))
+
+        except Exception as e:
+            stat['err'] = True
+            logger.exception('error during batched generator task')
+            items.append(s_msgpack.en(s_common.retnexc(e)))
+
+        stat['txsize'] += await link.tx(('t2:yields', {'call': call, 'items': items}))
+
+    async def _txAsyncGenrBatches(self, link, call, genr, credit, stat):
+        '''
+        Transmit the items from an async generator as t2:yields batches.
+
+        Notes:
+            The generator is consumed by a separate task so that each batch
+            contains whatever items are ready when the link is able to send.
+            A batch is never held back waiting for more items to arrive, and
+            the generator is paused while the client has granted no credit.
+        '''
+        ready = asyncio.Event()     # the pump has items for us
+        drained = asyncio.Event()   # we have taken the items from the pump
+
+        todo = {'size': 0, 'items': [], 'done': False}
+
+        def addItem(retn):
+            byts = s_msgpack.en(retn)
+            todo['size'] += len(byts)
+            todo['items'].append(byts)
+            ready.set()
+            return len(byts)
+
+        async def pump():
+
+            try:
+
+                async for item in genr:
+
+                    credit.take(addItem((True, item)))
+
+                    if len(todo['items']) >= self.batchitems or todo['size'] >= self.batchbytes:
+                        drained.clear()
+                        await drained.wait()
+
+                    await credit.wait()
+
+                addItem(None)
+
+            except asyncio.CancelledError as e:
+                # the generator task may be killed ( such as a storm query )
+                stat['err'] = True
+                addItem(s_common.retnexc(e))
+                raise
+
+            except Exception as e:
+                stat['err'] = True
+                logger.exception('error during batched async generator task')
+                addItem(s_common.retnexc(e))
+
+            finally:
+                todo['done'] = True
+                ready.set()
+                await genr.aclose()
+
+        task = link.schedCoro(pump())
+
+        try:
+
+            while True:
+
+                await ready.wait()
+
+                items = todo['items']
+                done = todo['done']
+
+                todo['size'] = 0
+                todo['items'] = []
+
+                ready.clear()
+                drained.set()
+
+                if items:
+                    stat['txsize'] += await link.tx(('t2:yields', {'call': call, 'items': items}))
+
+                if done:
+                    return
+
+        finally:
+            task.cancel()
 
     async def _onTaskInit(self, link, mesg):
 
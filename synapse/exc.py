@@ -190,3 +190,4 @@ class StepTimeout(SynErr):
 
 class StormRuntimeError(SynErr): pass
 class StormVarListError(StormRuntimeError): pass
+class StormBudgetExceeded(StormRuntimeError): pass
@@ -245,6 +245,7 @@ class _Appt:
         self.recur = recur # does this appointment repeat
         self.indx = indx  # incremented for each appt added ever.  Used for nexttime tiebreaking for stable ordering
         self.query = query  # query to run
+        self.squery = None  # parsed storm query (not persisted)
         self.useriden = useriden # user iden to run query as
         self.recs = recs  # List[ApptRec]  list of the individual entries to calculate next time from
         self._recidxnexttime = None # index of rec who is up next
@@ -381,7 +382,7 @@ class Agenda(s_base.Base):
 
         for iden, appt in self.appts.items():
             try:
-                self.core.getStormQuery(appt.query)
+                appt.squery = self.core.getStormQuery(appt.query)
             except Exception as e:
                 logger.warning('Invalid appointment %r found in storage: %r.  Disabling.', iden, e)
                 appt.enabled = False
@@ -537,10 +538,12 @@ class Agenda(s_base.Base):
         if not query:
             raise ValueError('empty query')
 
+        squery = None
         if self.enabled:
-            self.core.getStormQuery(query)
+            squery = self.core.getStormQuery(query)
 
         appt.query = query
+        appt.squery = squery
         appt.enabled = True  # in case it was disabled for a bad query
 
         await self._storeAppt(appt)
@@ -635,7 +638,10 @@ class Agenda(s_base.Base):
             logger.info('Agenda executing for iden=%s, user=%s, query={%s}', appt.iden, user.name, appt.query)
             starttime = time.time()
             try:
-                async for _ in self.core.eval(appt.query, user=user):  # NOQA
+                if appt.squery is None:
+                    appt.squery = self.core.getStormQuery(appt.query)
+
+                async for _ in self.core.evalStormQuery(appt.squery, user=user):  # NOQA
                     count += 1
             except asyncio.CancelledError:
                 result = 'cancelled'
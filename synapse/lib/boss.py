@@ -1,4 +1,6 @@
 import asyncio
+import contextlib
+import collections
 
 import synapse.lib.base as s_base
 import synapse.lib.task as s_task
@@ -11,6 +13,10 @@ class Boss(s_base.Base):
     async def __anit__(self):
         await s_base.Base.__anit__(self)
         self.tasks = {}
+
+        self.admitted = collections.defaultdict(dict)  # name -> {iden: Task}
+        self.admitwait = collections.defaultdict(list)  # name -> [(Task, maxtasks, maxuser, Future), ...]
+
         self.onfini(self._onBossFini)
 
     async def _onBossFini(self):
@@ -49,3 +55,94 @@ class Boss(s_base.Base):
         '''
         task = self.schedCoro(coro)
         return await s_task.Task.anit(self, task, name, user, info=info)
+
+    @contextlib.asynccontextmanager
+    async def admit(self, synt, maxtasks=None, maxuser=None):
+        '''
+        Wait for a synapse task to be admitted under the given concurrency limits.
+
+        Args:
+            synt (Task): The synapse task to admit.
+            maxtasks (int): The maximum number of admitted tasks with the same name.
+            maxuser (int): The maximum number of admitted tasks with the same name and user.
+
+        Notes:
+            Waiting tasks are admitted in FIFO order, but a task which is only blocked by its
+            own user limit does not hold back tasks for other users.  Released slots are
+            reserved for the next waiter before it wakes.  A task which is already
+            admitted ( such as a nested query ) is not counted again.
+        '''
+        admitted = self.admitted[synt.name]
+
+        if synt.iden in admitted:
+            yield
+            return
+
+        waiters = self.admitwait[synt.name]
+
+        if not self._canAdmit(synt, maxtasks, maxuser):
+
+            futu = self.loop.create_future()
+            item = (synt, maxtasks, maxuser, futu)
+            waiters.append(item)
+
+            synt.info['admit'] = 'waiting'
+
+            try:
+                await futu
+
+            except asyncio.CancelledError:
+                if item in waiters:
+                    waiters.remove(item)
+                # we may have been admitted just before being cancelled
+                self._release(synt)
+                raise
+
+        synt.info.pop('admit', None)
+        admitted[synt.iden] = synt
+
+        try:
+            yield
+
+        finally:
+            self._release(synt)
+
+    def _canAdmit(self, synt, maxtasks, maxuser):
+
+        admitted = self.admitted[synt.name]
+
+        if maxtasks is not None and len(admitted) >= maxtasks:
+            return False
+
+        if maxuser is not None:
+            count = len([t for t in admitted.values() if t.user == synt.user])
+            if count >= maxuser:
+                return False
+
+        return True
+
+    def _release(self, synt):
+
+        admitted = self.admitted[synt.name]
+        if admitted.pop(synt.iden, None) is None:
+            return
+
+        waiters = self.admitwait[synt.name]
+
+        for item in list(waiters):
+
+            wsynt, maxtasks, maxuser, futu = item
+
+            if maxtasks is not None and len(admitted) >= maxtasks:
+                break
+
+            if not self._canAdmit(wsynt, maxtasks, maxuser):
+                continue
+
+            waiters.remove(item)
+            if futu.done():
+                continue
+
+            # reserve the slot before the waiter wakes
+            admitted[wsynt.iden] = wsynt
+            futu.set_result(True)
@@ -0,0 +1,160 @@
+'''
+Cheap per-method call statistics for telepath clients and servers.
+'''
+import bisect
+
+class Histogram:
+    '''
+    A fixed size histogram which counts values in power of two buckets.
+
+    Example:
+
+        hist = Histogram()
+        hist.add(0.0025)
+
+        p99 = hist.percentile(0.99)
+
+    Notes:
+        Adding a value is a single bisect into the bucket bounds, so a
+        Histogram may be updated for every call.  Percentiles are estimated
+        as the upper bound of the bucket which contains them ( capped at the
+        maximum value seen ), which is accurate to within a factor of two.
+    '''
+    def __init__(self, base=0.000001, size=32):
+
+        # base * 2**31 is ~35 minutes for the default of 1us
+        self.bounds = [base * 2 ** i for i in range(size)]
+        self.counts = [0] * (size + 1)
+
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def add(self, valu):
+        '''
+        Add a value to the histogram.
+        '''
+        self.counts[bisect.bisect_left(self.bounds, valu)] += 1
+
+        self.count += 1
+        self.total += valu
+
+        if valu > self.max:
+            self.max = valu
+
+    def percentile(self, perc):
+        '''
+        Return the estimated value at the given percentile ( 0.0 - 1.0 ).
+
+        Returns:
+            (float): The estimated value or None if the histogram is empty.
+        '''
+        if not self.count:
+            return None
+
+        need = perc * self.count
+
+        seen = 0
+        for indx, count in enumerate(self.counts):
+
+            seen += count
+            if seen >= need and count:
+
+                if indx >= len(self.bounds):
+                    return self.max
+
+                return min(self.bounds[indx], self.max)
+
+        return self.max
+
+    def pack(self):
+
+        mean = None
+        if self.count:
+            mean = self.total / self.count
+
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': mean,
+            'max': self.max,
+            'p50': self.percentile(0.50),
+            'p90': self.percentile(0.90),
+            'p99': self.percentile(0.99),
+            'p999': self.percentile(0.999),
+        }
+
+class CallStats:
+    '''
+    Per-method counts, latency histograms, byte counts and errors.
+
+    Example:
+
+        stats = CallStats()
+        stats.add('getNodeByNdef', took, rxsize=100, txsize=2000)
+
+        info = stats.pack()
+    '''
+    def __init__(self, hists=('took',)):
+        self.meths = {}
+        self.hists = hists
+
+    def add(self, name, took, rxsize=0, txsize=0, err=False, **hists):
+        '''
+        Record a call to a method.
+
+        Args:
+            name (str): The method name.
+            took (float): The number of seconds the call took.
+            rxsize (int): The number of bytes received for the call.
+            txsize (int): The number of bytes transmitted for the call.
+            err (bool): Set to True if the call raised an exception.
+            **hists: Values for any additional named histograms.
+        '''
+        info = self.meths.get(name)
+        if info is None:
+            info = {
+                'count': 0,
+                'errs': 0,
+                'rxsize': 0,
+                'txsize': 0,
+                'hists': {h: Histogram() for h in self.hists},
+            }
+            self.meths[name] = info
+
+        info['count'] += 1
+        info['rxsize'] += rxsize
+        info['txsize'] += txsize
+
+        if err:
+            info['errs'] += 1
+
+        info['hists']['took'].add(took)
+
+        for hname, valu in hists.items():
+            info['hists'][hname].add(valu)
+
+    def pack(self):
+        '''
+        Return a dict of method name to stats dicts.
+        '''
+        retn = {}
+
+        for name, info in self.meths.items():
+
+            item = {
+                'count': info['count'],
+                'errs': info['errs'],
+                'rxsize': info['rxsize'],
+                'txsize': info['txsize'],
+            }
+
+            for hname, hist in info['hists'].items():
+                item[hname] = hist.pack()
+
+            retn[name] = item
+
+        return retn
+
+    def clear(self):
+        self.meths.clear()
@@ -169,6 +169,13 @@ class CellApi(s_base.Base):
 
         raise s_exc.AuthDeny(mesg='Caller must own task or be admin.', task=iden, user=str(self.user))
 
+    @adminapi
+    async def getCallStats(self):
+        '''
+        Get per-method telepath call stats from the Cell Daemon.
+        '''
+        return self.cell.dmon.getCallStats()
+
     async def listHiveKey(self, path=None):
         if path is None:
             path = ()
@@ -1,12 +1,25 @@
+import os
 import ast
+import json
+import logging
+
 import lark  # type: ignore
 import regex  # type: ignore
 
+import lark.lexer  # type: ignore
+import lark.common  # type: ignore
+import lark.grammar  # type: ignore
+import lark.parsers.xearley  # type: ignore
+import lark.parsers.earley_forest  # type: ignore
+
 import synapse.exc as s_exc
+import synapse.common as s_common
 
 import synapse.lib.ast as s_ast
 import synapse.lib.datfile as s_datfile
 
+logger = logging.getLogger(__name__)
+
 # TL;DR:  *rules* are the internal nodes of an abstract syntax tree (AST), *terminals* are the leaves
 
 # Note: this file is coupled strongly to synapse/lib/storm.lark.  Any changes to that file will probably require
@@ -237,9 +250,159 @@ class AstConverter(lark.Transformer):
 with s_datfile.openDatFile('synapse.lib/storm.lark') as larkf:
     _grammar = larkf.read().decode()
 
-QueryParser = lark.Lark(_grammar, start='query', propagate_positions=True)
-CmdrParser = lark.Lark(_grammar, start='query', propagate_positions=True, keep_all_tokens=True)
-StormCmdParser = lark.Lark(_grammar, start='stormcmdargs', propagate_positions=True)
+# The compiled grammar analysis for each parser is cached next to the package
+LarkCachePath = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storm.lark.cache')
+
+def _larkSymEn(sym):
+    return (sym.name, sym.is_term)
+
+def _larkSymUn(info):
+    name, isterm = info
+    if isterm:
+        return lark.grammar.Terminal(name)
+    return lark.grammar.NonTerminal(name)
+
+def _larkCacheKey(grammar, opts):
+    return s_common.guid((grammar, lark.__version__, sorted(opts.items())))
+
+def _saveLarkParser(parser):
+    '''
+    Serialize the results of grammar compilation and earley analysis for a lark parser.
+
+    Notes:
+        Only the dynamic earley frontend used by storm is supported.
+    '''
+    earley = parser.parser.parser
+
+    rules = parser.rules
+    ruleindx = {id(rule): indx for (indx, rule) in enumerate(rules)}
+
+    return {
+        'options': dict(parser.options.options),
+        'terminals': [t.serialize() for t in parser.terminals],
+        'rules': [r.serialize() for r in rules],
+        'ignore': list(parser.ignore_tokens),
+        'first': [(_larkSymEn(s), [_larkSymEn(f) for f in fset]) for (s, fset) in earley.FIRST.items()],
+        'nullable': [_larkSymEn(s) for s in earley.NULLABLE],
+        'predictions': [(_larkSymEn(s), [ruleindx[id(r)] for r in preds]) for (s, preds) in earley.predictions.items()],
+    }
+
+def _loadLarkParser(info):
+    '''
+    Construct a lark parser from the output of _saveLarkParser() without re-analyzing the grammar.
+    '''
+    memo = {}
+    terminals = [lark.lexer.TerminalDef.deserialize(t, memo) for t in info['terminals']]
+    rules = [lark.grammar.Rule.deserialize(r, memo) for r in info['rules']]
+
+    parser = lark.Lark.__new__(lark.Lark)
+    parser.options = lark.lark.LarkOptions(info['options'])
+    parser.source = '<cached>'
+    parser.terminals = terminals
+    parser.rules = rules
+    parser.ignore_tokens = info['ignore']
+    parser._terminals_dict = {t.name: t for t in terminals}
+    parser.lexer_conf = lark.common.LexerConf(terminals, parser.ignore_tokens, None, parser.options.lexer_callbacks)
+    parser._prepare_callbacks()
+
+    frontend = parser.parser_class.__new__(parser.parser_class)
+    frontend.token_by_name = {t.name: t for t in terminals}
+    frontend.start = parser.options.start
+    frontend._prepare_match(parser.lexer_conf)
+
+    earley = lark.parsers.xearley.Parser.__new__(lark.parsers.xearley.Parser)
+    earley.parser_conf = lark.common.ParserConf(rules, parser._callbacks, parser.options.start)
+    earley.resolve_ambiguity = parser.options.ambiguity == 'resolve'
+    earley.debug = parser.options.debug
+    earley.FIRST = {_larkSymUn(s): {_larkSymUn(f) for f in fset} for (s, fset) in info['first']}
+    earley.NULLABLE = {_larkSymUn(s) for s in info['nullable']}
+    earley.callbacks = parser._callbacks
+    earley.predictions = {_larkSymUn(s): [rules[i] for i in preds] for (s, preds) in info['predictions']}
+    earley.TERMINALS = {sym for r in rules for sym in r.expansion if sym.is_term}
+    earley.NON_TERMINALS = {sym for r in rules for sym in r.expansion if not sym.is_term}
+
+    earley.forest_sum_visitor = None
+    if any(r.options and r.options.priority is not None for r in rules):
+        earley.forest_sum_visitor = lark.parsers.earley_forest.ForestSumVisitor
+
+    earley.term_matcher = frontend.match
+    earley.ignore = [lark.grammar.Terminal(t) for t in parser.ignore_tokens]
+    earley.complete_lex = False
+
+    frontend.parser = earley
+    parser.parser = frontend
+    return parser
+
+def _loadLarkCache():
+    try:
+        with open(LarkCachePath, 'rb') as fd:
+            return json.loads(fd.read().decode('utf8'))
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning('Ignoring invalid storm parser cache %s: %r', LarkCachePath, e)
+        return {}
+
+def _saveLarkCache(cache):
+    # write to a unique temp file and rename so concurrent importers never see a partial file
+    tmppath = f'{LarkCachePath}.{s_common.guid()}'
+    try:
+        with open(tmppath, 'wb') as fd:
+            fd.write(json.dumps(cache).encode('utf8'))
+        os.replace(tmppath, LarkCachePath)
+    except OSError as e:
+        logger.debug('Unable to save storm parser cache %s: %r', LarkCachePath, e)
+        try:
+            os.unlink(tmppath)
+        except OSError:
+            pass
+
+def getLarkParser(grammar, cache, **opts):
+    '''
+    Get a dynamic earley lark parser for the grammar, using (and updating) the given cache dict.
+
+    Args:
+        grammar (str): The lark grammar text.
+        cache (dict): A dictionary of serialized parsers by cache key.
+        **opts: Options passed to lark.Lark().
+
+    Returns:
+        lark.Lark: The parser instance.
+    '''
+    key = _larkCacheKey(grammar, opts)
+
+    info = cache.get(key)
+    if info is not None:
+        try:
+            return _loadLarkParser(info)
+        except Exception as e:
+            logger.warning('Rebuilding storm parser due to invalid cache entry: %r', e)
+
+    parser = lark.Lark(grammar, **opts)
+    cache[key] = _saveLarkParser(parser)
+    return parser
+
+def _initStormParsers():
+
+    cache = _loadLarkCache()
+    loaded = set(cache.keys())
+
+    optslist = (
+        {'start': 'query', 'propagate_positions': True},
+        {'start': 'query', 'propagate_positions': True, 'keep_all_tokens': True},
+        {'start': 'stormcmdargs', 'propagate_positions': True},
+    )
+
+    parsers = [getLarkParser(_grammar, cache, **opts) for opts in optslist]
+
+    # only rewrite the cache when something had to be built, dropping stale entries
+    keys = [_larkCacheKey(_grammar, opts) for opts in optslist]
+    if loaded != set(keys):
+        _saveLarkCache({k: cache[k] for k in keys})
+
+    return parsers
+
+QueryParser, CmdrParser, StormCmdParser = _initStormParsers()
 
 _eofre = regex.compile(r'''Terminal\('(\w+)'\)''')
 
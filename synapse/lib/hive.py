@@ -16,9 +16,19 @@ import synapse.lib.lmdbslab as s_slab
 
 logger = logging.getLogger(__name__)
 
+# the number of node values cached for get() on paths which have not been opened
+HIVE_CACHE_SIZE = 10000
+
 class Node(s_base.Base):
     '''
     A single node within the Hive tree.
+
+    Notes:
+        The kids of a Node are loaded from storage when the Node is opened
+        ( or used for a HiveDict ).  Nodes which have no kids in storage are
+        loaded when they are created.  The get(), dir() and iteration APIs
+        raise NotReady for a Node whose kids have not been loaded rather than
+        returning partial results.
     '''
     async def __anit__(self, hive, full, valu):
 
@@ -29,6 +39,9 @@ class Node(s_base.Base):
         self.hive = hive
         self.full = full
 
+        # set once the kids have been loaded from storage
+        self.loaded = False
+
         self.onfini(self._onNodeFini)
 
     async def _onNodeFini(self):
@@ -41,13 +54,20 @@ class Node(s_base.Base):
     def parent(self):
         return self.hive.nodes.get(self.full[:-1])
 
+    def _reqKidsLoaded(self):
+        if not self.loaded:
+            mesg = f'The kids of hive node {self.full!r} are not loaded ( see Hive.open() ).'
+            raise s_exc.NotReady(mesg=mesg, path=self.full)
+
     def get(self, name):
+        self._reqKidsLoaded()
         return self.kids.get(name)
 
     def dir(self):
+        self._reqKidsLoaded()
         retn = []
         for name, node in self.kids.items():
-            retn.append((name, node.valu, len(node.kids)))
+            retn.append((name, node.valu, self.hive._getKidCount(node.full)))
         return retn
 
     async def set(self, valu):
@@ -84,6 +104,7 @@ class Node(s_base.Base):
         return await HiveDict.anit(self.hive, self)
 
     def __iter__(self):
+        self._reqKidsLoaded()
         for name, node in self.kids.items():
             yield name, node
 
@@ -123,13 +144,15 @@ class Hive(s_base.Base, s_telepath.Aware):
     async def saveHiveTree(self, path=()):
         tree = {}
         root = await self.open(path)
-        self._saveHiveNode(root, tree)
+        await self._saveHiveNode(root, tree)
         return tree
 
-    def _saveHiveNode(self, node, tree):
+    async def _saveHiveNode(self, node, tree):
 
         tree['value'] = node.valu
 
+        await self._loadHiveKids(node)
+
         kids = list(node.kids.items())
         if not kids:
             return
@@ -137,7 +160,7 @@ class Hive(s_base.Base, s_telepath.Aware):
         kidtrees = {}
         for kidname, kidnode in kids:
             kidtree = kidtrees[kidname] = {}
-            self._saveHiveNode(kidnode, kidtree)
+            await self._saveHiveNode(kidnode, kidtree)
 
         tree['kids'] = kidtrees
 
@@ -216,7 +239,7 @@ class Hive(s_base.Base, s_telepath.Aware):
 
         node = self.nodes.get(full)
         if node is None:
-            return None
+            return self._storGetValu(full)
 
         return node.valu
 
@@ -234,10 +257,38 @@ class Hive(s_base.Base, s_telepath.Aware):
             list: A list of tuples. Each tuple contains the name, node value, and the number of children nodes.
         '''
         node = self.nodes.get(full)
-        if node is None:
+        if node is not None and node.loaded:
+            return node.dir()
+
+        if node is None and not self._storHasNode(full):
             return None
 
-        return node.dir()
+        return [(name, valu, self._getKidCount(full + (name,))) for name, valu in self._getKidValus(full).items()]
+
+    def _getKidValus(self, full):
+        '''
+        Return a dict of name=valu for the kids of a path from the tree and storage.
+        '''
+        retn = {}
+
+        node = self.nodes.get(full)
+        if node is not None:
+            retn.update((name, kidn.valu) for (name, kidn) in node.kids.items())
+            if node.loaded:
+                return retn
+
+        for name, valu, haskids in self._storLoadKids(full):
+            retn.setdefault(name, valu)
+
+        return retn
+
+    def _getKidCount(self, full):
+
+        node = self.nodes.get(full)
+        if node is not None and node.loaded:
+            return len(node.kids)
+
+        return len(self._getKidValus(full))
 
     async def dict(self, full):
         '''
@@ -252,9 +303,10 @@ class Hive(s_base.Base, s_telepath.Aware):
         node = await self.open(full)
         return await HiveDict.anit(self, node)
 
-    async def _initNodePath(self, base, path, valu):
+    async def _initNodePath(self, base, path, valu, loaded=False):
 
         node = await Node.anit(self, path, valu)
+        node.loaded = loaded
 
         # all node events dist up the tree
         node.link(base.dist)
@@ -264,24 +316,23 @@ class Hive(s_base.Base, s_telepath.Aware):
 
         return node
 
-    async def _loadNodeValu(self, full, valu):
+    async def _loadHiveKids(self, node):
         '''
-        Load a node from storage into the tree.
-        ( used by initialization routines to build the tree)
+        Load the kids of a node from storage into the tree.
         '''
-        node = self.root
-        for path in iterpath(full):
+        if node.loaded:
+            return
 
-            name = path[-1]
+        for name, valu, haskids in list(self._storLoadKids(node.full)):
 
-            step = node.kids.get(name)
-            if step is None:
-                step = await self._initNodePath(node, path, None)
+            # kids which were already opened are current
+            if node.kids.get(name) is not None:
+                continue
 
-            node = step
+            # a kid without kids of its own is complete
+            await self._initNodePath(node, node.full + (name,), valu, loaded=not haskids)
 
-        node.valu = valu
-        return node
+        node.loaded = True
 
     async def open(self, full):
         '''
@@ -293,7 +344,9 @@ class Hive(s_base.Base, s_telepath.Aware):
         Returns:
             Node: A Hive node.
         '''
-        return await self._getHiveNode(full)
+        node = await self._getHiveNode(full)
+        await self._loadHiveKids(node)
+        return node
 
     async def _getHiveNode(self, full):
 
@@ -309,7 +362,16 @@ class Hive(s_base.Base, s_telepath.Aware):
 
             step = node.kids.get(name)
             if step is None:
-                step = await self._initNodePath(node, path, None)
+
+                # a new node has no kids to load
+                valu = None
+                loaded = True
+
+                if not node.loaded and self._storHasNode(path):
+                    valu = self._storGetValu(path)
+                    loaded = False
+
+                step = await self._initNodePath(node, path, valu, loaded=loaded)
                 #print('STEP: %r %r' % (path, step))
                 # hive add events alert the *parent* path of edits
                 #await node.fire('hive:add', path=path[:-1], name=name, valu=None)
@@ -353,13 +415,20 @@ class Hive(s_base.Base, s_telepath.Aware):
         '''
         node = self.nodes.get(full)
         if node is None:
-            return
+
+            if not self._storHasNode(full):
+                return
+
+            node = await self._getHiveNode(full)
 
         valu = await self._popHiveNode(node)
 
         return valu
 
     async def _popHiveNode(self, node):
+
+        await self._loadHiveKids(node)
+
         for kidn in list(node.kids.values()):
             await self._popHiveNode(kidn)
 
@@ -400,6 +469,18 @@ class Hive(s_base.Base, s_telepath.Aware):
     async def _storLoadHive(self):
         pass
 
+    def _storLoadKids(self, full):
+        '''
+        Yield (name, valu, haskids) tuples for the stored kids of a path.
+        '''
+        return ()
+
+    def _storGetValu(self, full):
+        return None
+
+    def _storHasNode(self, full):
+        return False
+
     async def storNodeValu(self, full, valu):
         return valu
 
@@ -411,27 +492,87 @@ class SlabHive(Hive):
     async def __anit__(self, slab, db=None, conf=None):
         self.db = db
         self.slab = slab
+        self.valus = s_cache.LruDict(HIVE_CACHE_SIZE)
         await Hive.__anit__(self, conf=conf)
         self.slab.onfini(self.fini)
 
-    async def _storLoadHive(self):
+    def _getFirstRow(self, lmin):
+        for item in self.slab.scanByRange(lmin, db=self.db):
+            return item
+        return None
+
+    def _storLoadKids(self, full):
+
+        pref = b''
+        if full:
+            pref = getHiveKey(full) + b'\x00'
+
+        size = len(pref)
+
+        lmin = pref
+        while True:
+
+            item = self._getFirstRow(lmin)
+            if item is None or not item[0].startswith(pref):
+                return
+
+            lkey, lval = item
 
-        for lkey, lval in self.slab.scanByFull(db=self.db):
+            # a kid may only exist as the parent of deeper keys
+            name, sepr, _ = lkey[size:].partition(b'\x00')
 
-            path = tuple(lkey.decode('utf8').split('\x00'))
-            valu = s_msgpack.un(lval)
+            valu = None
+            haskids = True
 
-            await self._loadNodeValu(path, valu)
+            if not sepr:
+                valu = s_msgpack.un(lval)
+                # the descendants of a kid sort immediately after it
+                kpref = lkey + b'\x00'
+                nrow = self._getFirstRow(kpref)
+                haskids = nrow is not None and nrow[0].startswith(kpref)
+
+            yield name.decode('utf8'), valu, haskids
+
+            # skip past the descendants of the kid ( \x00 sorts before \x01 )
+            lmin = pref + name + b'\x01'
+
+    def _storGetValu(self, full):
+
+        valu = self.valus.get(full, s_common.novalu)
+        if valu is not s_common.novalu:
+            return valu
+
+        valu = None
+
+        byts = self.slab.get(getHiveKey(full), db=self.db)
+        if byts is not None:
+            valu = s_msgpack.un(byts)
+
+        self.valus[full] = valu
+        return valu
+
+    def _storHasNode(self, full):
+
+        if not full:
+            return True
+
+        lkey = getHiveKey(full)
+
+        item = self._getFirstRow(lkey)
+        if item is None:
+            return False
+
+        return item[0] == lkey or item[0].startswith(lkey + b'\x00')
 
     async def storNodeValu(self, full, valu):
         lval = s_msgpack.en(valu)
-        lkey = '\x00'.join(full).encode('utf8')
-        self.slab.put(lkey, lval, db=self.db)
+        self.slab.put(getHiveKey(full), lval, db=self.db)
+        self.valus.pop(full, None)
         return valu
 
     async def storNodeDele(self, full):
-        lkey = '\x00'.join(full).encode('utf8')
-        self.slab.pop(lkey, db=self.db)
+        self.slab.pop(getHiveKey(full), db=self.db)
+        self.valus.pop(full, None)
 
 class HiveApi(s_base.Base):
 
@@ -472,6 +613,8 @@ class HiveApi(s_base.Base):
 
             node, pode = todo.popleft()
 
+            await self.hive._loadHiveKids(node)
+
             for name, kidn in node.kids.items():
 
                 kidp = (kidn.valu, {})
@@ -654,6 +797,8 @@ class HiveDict(s_base.Base):
         self.hive = hive
         self.node = node
 
+        await hive._loadHiveKids(node)
+
         self.node.onfini(self)
 
     def get(self, name, onedit=None, default=None):
@@ -1109,6 +1254,9 @@ def iterpath(path):
     for i in range(len(path)):
         yield path[:i + 1]
 
+def getHiveKey(full):
+    return '\x00'.join(full).encode('utf8')
+
 async def openurl(url, **opts):
     prox = await s_telepath.openurl(url, **opts)
     return await TeleHive.anit(prox)
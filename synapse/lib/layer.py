@@ -17,7 +17,6 @@ import synapse.exc as s_exc
 import synapse.lib.base as s_base
 import synapse.lib.cell as s_cell
 import synapse.lib.cache as s_cache
-import synapse.lib.queue as s_queue
 
 logger = logging.getLogger(__name__)
 
@@ -98,9 +97,6 @@ class Layer(s_base.Base):
         self.iden = node.name()
         self.buidcache = s_cache.LruDict(BUID_CACHE_SIZE)
 
-        # splice windows...
-        self.windows = []
-
         self.info = await node.dict()
         self.info.setdefault('owner', 'root')
 
@@ -142,11 +138,6 @@ class Layer(s_base.Base):
         self.spliced = asyncio.Event(loop=self.loop)
         self.onfini(self.spliced.set)
 
-        self.onfini(self._onLayrFini)
-
-    async def _onLayrFini(self):
-        [(await wind.fini()) for wind in self.windows]
-
     @contextlib.contextmanager
     def disablingBuidCache(self):
         '''
@@ -156,20 +147,6 @@ class Layer(s_base.Base):
         yield
         self.buidcache = s_cache.LruDict(BUID_CACHE_SIZE)
 
-    @contextlib.asynccontextmanager
-    async def getSpliceWindow(self):
-
-        async with await s_queue.Window.anit(maxsize=10000) as wind:
-
-            async def fini():
-                self.windows.remove(wind)
-
-            wind.onfini(fini)
-
-            self.windows.append(wind)
-
-            yield wind
-
     async def getLiftRows(self, lops):
         '''
         Returns:
@@ -201,17 +178,13 @@ class Layer(s_base.Base):
 
     async def _storFireSplices(self, splices):
         '''
-        Fire events, windows, etc for splices.
+        Store splices and wake any splice subscribers.
         '''
-        indx = await self._storSplices(splices)
+        await self._storSplices(splices)
 
         self.spliced.set()
         self.spliced.clear()
 
-        items = [(indx + i, s) for (i, s) in enumerate(splices)]
-        # go fast and protect against edit-while-iter issues
-        [(await wind.puts(items)) for wind in tuple(self.windows)]
-
     async def _storSplices(self, splices):  # pragma: no cover
         '''
         Store the splices into a sequentially accessible storage structure.
@@ -1,9 +1,13 @@
+import zlib
+import time
 import socket
 import asyncio
 import logging
 
 import collections
 
+import msgpack
+
 logger = logging.getLogger(__name__)
 
 import synapse.exc as s_exc
@@ -13,15 +17,28 @@ import synapse.lib.base as s_base
 import synapse.lib.const as s_const
 import synapse.lib.msgpack as s_msgpack
 
-readsize = 10 * s_const.megabyte
+# the initial size of the receive buffer for each link
+bufsize = s_const.mebibyte
+# grow / compact the receive buffer when less than this is free
+minfree = 64 * s_const.kibibyte
+
+# the msgpack ext type code for a frame of zlib compressed messages
+zlibext = 1
+# messages smaller than this are sent uncompressed on zlib links
+zlibsize = s_const.kibibyte
+# the most bytes a compressed frame may decompress to ( the link is closed beyond this )
+zlibmax = 256 * s_const.mebibyte
+# compressed frames are decompressed in steps of at most this many bytes
+zlibstep = s_const.mebibyte
 
 async def connect(host, port, ssl=None):
     '''
     Async connect and return a Link().
     '''
     info = {'host': host, 'port': port, 'ssl': ssl}
-    reader, writer = await asyncio.open_connection(host, port, ssl=ssl)
-    return await Link.anit(reader, writer, info=info)
+    loop = asyncio.get_running_loop()
+    transport, proto = await loop.create_connection(LinkProtocol, host, port, ssl=ssl)
+    return await Link.anit(proto, info=info)
 
 async def listen(host, port, onlink, ssl=None):
     '''
@@ -29,11 +46,12 @@ async def listen(host, port, onlink, ssl=None):
 
     Returns a server object that contains the listening sockets
     '''
-    async def onconn(reader, writer):
-        link = await Link.anit(reader, writer)
-        link.schedCoro(onlink(link))
+    loop = asyncio.get_running_loop()
 
-    server = await asyncio.start_server(onconn, host=host, port=port, ssl=ssl)
+    def ctor():
+        return LinkProtocol(onlink=onlink)
+
+    server = await loop.create_server(ctor, host=host, port=port, ssl=ssl)
     return server
 
 async def unixlisten(path, onlink):
@@ -41,18 +59,21 @@ async def unixlisten(path, onlink):
     Start an PF_UNIX server listening on the given path.
     '''
     info = {'path': path, 'unix': True}
-    async def onconn(reader, writer):
-        link = await Link.anit(reader, writer, info=info)
-        link.schedCoro(onlink(link))
-    return await asyncio.start_unix_server(onconn, path=path)
+    loop = asyncio.get_running_loop()
+
+    def ctor():
+        return LinkProtocol(onlink=onlink, info=info)
+
+    return await loop.create_unix_server(ctor, path=path)
 
 async def unixconnect(path):
     '''
     Connect to a PF_UNIX server listening on the given path.
     '''
-    reader, writer = await asyncio.open_unix_connection(path=path)
     info = {'path': path, 'unix': True}
-    return await Link.anit(reader, writer, info=info)
+    loop = asyncio.get_running_loop()
+    transport, proto = await loop.create_unix_connection(LinkProtocol, path=path)
+    return await Link.anit(proto, info=info)
 
 async def linkfile(mode='wb'):
     '''
@@ -63,29 +84,180 @@ async def linkfile(mode='wb'):
     file1 = sock1.makefile(mode)
     sock1.close()
 
-    reader, writer = await asyncio.open_connection(sock=sock0)
-    link0 = await Link.anit(reader, writer, info={'unix': True})
+    loop = asyncio.get_running_loop()
+    transport, proto = await loop.create_connection(LinkProtocol, sock=sock0)
+    link0 = await Link.anit(proto, info={'unix': True})
 
     return link0, file1
 
+class LinkProtocol(asyncio.BufferedProtocol):
+    '''
+    An asyncio BufferedProtocol which receives into a reusable buffer for a Link().
+
+    Notes:
+        Received bytes are written directly into self.buf by the transport and
+        are consumed in place from self.buf[self.start:self.end].  Reading is
+        paused while the buffer is full and resumed once the Link consumes it.
+    '''
+    def __init__(self, onlink=None, info=None):
+
+        self.info = info
+        self.onlink = onlink
+
+        self.buf = bytearray(bufsize)
+        self.start = 0
+        self.end = 0
+
+        self.eof = False
+        self.lost = False
+        self.paused = False
+
+        self.transport = None
+        self.overssl = False
+
+        self.rxevnt = asyncio.Event()
+        self.txevnt = asyncio.Event()
+        self.txevnt.set()
+
+    def connection_made(self, transport):
+
+        self.transport = transport
+        self.overssl = transport.get_extra_info('sslcontext') is not None
+
+        if self.onlink is not None:
+            asyncio.get_event_loop().create_task(self._initServerLink())
+
+    async def _initServerLink(self):
+
+        info = None
+        if self.info is not None:
+            info = dict(self.info)
+
+        link = await Link.anit(self, info=info)
+        link.schedCoro(self.onlink(link))
+
+    def get_buffer(self, sizehint):
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        if len(self.buf) - self.end < minfree:
+
+            size = self.end - self.start
+
+            # compact the unread bytes to the front of the buffer
+            if self.start:
+                self.buf[:size] = self.buf[self.start:self.end]
+                self.start = 0
+                self.end = size
+
+            # only reached if more bytes arrive while reading is paused ( ssl )
+            if len(self.buf) - self.end < minfree:
+                buf = bytearray(len(self.buf) * 2)
+                buf[:size] = self.buf[:size]
+                self.buf = buf
+
+        return memoryview(self.buf)[self.end:]
+
+    def buffer_updated(self, nbytes):
+
+        self.end += nbytes
+        self.rxevnt.set()
+
+        if len(self.buf) - self.end < minfree and not self.paused:
+            self.paused = True
+            self.transport.pause_reading()
+
+    def eof_received(self):
+        self.eof = True
+        self.rxevnt.set()
+        # keep the transport open for writing ( ssl does not support half close )
+        return not self.overssl
+
+    def connection_lost(self, exc):
+        self.eof = True
+        self.lost = True
+        self.rxevnt.set()
+        self.txevnt.set()
+
+    def pause_writing(self):
+        self.txevnt.clear()
+
+    def resume_writing(self):
+        self.txevnt.set()
+
+    def size(self):
+        '''
+        Return the number of received bytes which have not been consumed.
+        '''
+        return self.end - self.start
+
+    def view(self, size=None):
+        '''
+        Return a memoryview of ( up to size ) unconsumed bytes.
+        '''
+        end = self.end
+        if size is not None:
+            end = min(end, self.start + size)
+        return memoryview(self.buf)[self.start:end]
+
+    def consume(self, size):
+        '''
+        Mark size bytes from the receive buffer as consumed.
+        '''
+        self.start += size
+
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        if self.paused and len(self.buf) - self.end + self.start >= minfree:
+            self.paused = False
+            self.transport.resume_reading()
+
+    async def wait(self):
+        '''
+        Wait for bytes to be received ( or EOF ).
+        '''
+        while not self.size() and not self.eof:
+            self.rxevnt.clear()
+            await self.rxevnt.wait()
+
+    async def drain(self):
+        '''
+        Wait for the transport write buffer to drain ( like StreamWriter.drain() ).
+        '''
+        if self.transport.is_closing():
+            # give connection_lost() a chance to run
+            await asyncio.sleep(0)
+
+        if self.lost:
+            raise ConnectionResetError('Connection lost')
+
+        if not self.txevnt.is_set():
+            await self.txevnt.wait()
+
+            if self.lost:
+                raise ConnectionResetError('Connection lost')
+
 class Link(s_base.Base):
     '''
-    A Link() is created to wrap a socket reader/writer.
+    A Link() is created to wrap a socket transport.
     '''
-    async def __anit__(self, reader, writer, info=None):
+    async def __anit__(self, proto, info=None):
 
         await s_base.Base.__anit__(self)
 
         self.iden = s_common.guid()
 
-        self.reader = reader
-        self.writer = writer
+        self.proto = proto
+        self.transport = proto.transport
 
         self.rxqu = collections.deque()
 
-        self.sock = self.writer.get_extra_info('socket')
+        # the msgpack size of the last message returned by rx()
+        self.rxsize = 0
 
-        self._drain_lock = asyncio.Lock()
+        self.sock = self.transport.get_extra_info('socket')
 
         if info is None:
             info = {}
@@ -109,32 +281,54 @@ class Link(s_base.Base):
 
         self.unpk = s_msgpack.Unpk()
 
+        # set by setZlib() to compress messages we transmit
+        self.zcomp = None
+        self.zsize = zlibsize
+
+        # compressed frames are only accepted once zlib is agreed for the link
+        self.zrx = False
+        # set by allowZlib() to begin compressing once the peer has replied
+        self.zwait = None
+        self.zmax = zlibmax
+
+        # created when the first compressed frame is received
+        self.zdecomp = None
+        self.zunpk = None
+
+        self.zinfo = {
+            'tx': {'mesgs': 0, 'size': 0, 'zsize': 0, 'time': 0.0},
+            'rx': {'mesgs': 0, 'size': 0, 'zsize': 0, 'time': 0.0},
+        }
+
         async def fini():
-            self.writer.close()
+            self.transport.close()
 
         self.onfini(fini)
 
     async def send(self, byts):
-        self.writer.write(byts)
-        # Avoid Python bug.  See https://bugs.python.org/issue29930
-        async with self._drain_lock:
-            await self.writer.drain()
+        self.transport.write(byts)
+        await self.proto.drain()
 
     async def tx(self, mesg):
         '''
         Async transmit routine which will wait for writer drain().
+
+        Returns:
+            (int): The msgpack size of the message ( before any compression ).
         '''
         if self.isfini:
             raise s_exc.IsFini()
 
         byts = s_msgpack.en(mesg)
-        try:
+        size = len(byts)
+
+        if self.zcomp is not None:
+            byts = self._zlibEncode(byts)
 
-            self.writer.write(byts)
+        try:
 
-            # Avoid Python bug.  See https://bugs.python.org/issue29930
-            async with self._drain_lock:
-                await self.writer.drain()
+            self.transport.write(byts)
+            await self.proto.drain()
 
         except Exception as e:
 
@@ -145,22 +339,43 @@ class Link(s_base.Base):
 
             raise
 
+        return size
+
     async def recv(self, size):
-        return await self.reader.read(size)
+        '''
+        Return up to size bytes ( or b'' on EOF ).
+        '''
+        await self.proto.wait()
+
+        with self.proto.view(size) as view:
+            byts = view.tobytes()
+
+        self.proto.consume(len(byts))
+        return byts
 
     async def recvsize(self, size):
-        byts = b''
-        while size:
+        '''
+        Return exactly size bytes ( or None on EOF ).
+        '''
+        byts = bytearray(size)
 
-            recv = await self.reader.read(size)
-            if not recv:
-                await self.fini()
-                return None
+        offs = 0
+        while offs < size:
 
-            size -= len(recv)
-            byts += recv
+            await self.proto.wait()
 
-        return byts
+            with self.proto.view(size - offs) as view:
+                if not view:
+                    await self.fini()
+                    return None
+
+                nbytes = len(view)
+                byts[offs:offs + nbytes] = view
+
+            self.proto.consume(nbytes)
+            offs += nbytes
+
+        return bytes(byts)
 
     async def rx(self):
 
@@ -171,18 +386,23 @@ class Link(s_base.Base):
 
             try:
 
-                byts = await self.reader.read(readsize)
-                if not byts:
+                await self.proto.wait()
+
+                size = self.proto.size()
+                if not size:
                     await self.fini()
                     return None
 
-                for size, mesg in self.feed(byts):
-                    self.rxqu.append(mesg)
+                with self.proto.view() as view:
+                    mesgs = self.feed(view)
 
-            except (BrokenPipeError, ConnectionResetError) as e:
-                logger.warning('%s', str(e))
-                await self.fini()
-                return None
+                self.proto.consume(size)
+
+                self.rxqu.extend(mesgs)
+
+                # the peer has replied so it is ready for compressed frames
+                if mesgs and self.zwait is not None:
+                    self.setZlib(*self.zwait)
 
             except asyncio.CancelledError:
                 await self.fini()
@@ -193,7 +413,8 @@ class Link(s_base.Base):
                 await self.fini()
                 return None
 
-        return self.rxqu.popleft()
+        self.rxsize, mesg = self.rxqu.popleft()
+        return mesg
 
     def get(self, name, defval=None):
         '''
@@ -211,4 +432,130 @@ class Link(s_base.Base):
         '''
         Used by Plex() to unpack bytes.
         '''
-        return self.unpk.feed(byts)
+        mesgs = []
+        for size, mesg in self.unpk.feed(byts):
+
+            if isinstance(mesg, msgpack.ExtType) and mesg.code == zlibext:
+
+                if not self.zrx:
+                    raise s_exc.LinkErr(mesg='Compressed frame received before zlib was agreed for the link.')
+
+                mesgs.extend(self._zlibDecode(mesg.data))
+                continue
+
+            mesgs.append((size, mesg))
+
+        return mesgs
+
+    def setZlib(self, level=6, size=None):
+        '''
+        Compress the messages transmitted on this Link using zlib.
+
+        Args:
+            level (int): The zlib compression level ( 1-9 ).
+            size (int): Messages smaller than size bytes are sent uncompressed.
+
+        Notes:
+            A single zlib stream is used for the life of the Link so that
+            repeated strings ( form names, prop names, idens ) compress
+            across messages.  This also allows the peer to send compressed
+            frames, so it must only be called once zlib has been agreed.
+        '''
+        self.zrx = True
+        self.zwait = None
+
+        if size is not None:
+            self.zsize = size
+
+        if self.zcomp is None:
+            self.zcomp = zlib.compressobj(level)
+
+    def allowZlib(self, level=None, size=None):
+        '''
+        Accept zlib compressed frames from the peer without compressing the messages we transmit.
+
+        Args:
+            level (int): Call setZlib() with level and size once the first message is received from the peer.
+
+        Notes:
+            This allows a link which does not handshake ( such as a telepath
+            pool link ) to send its first message uncompressed and begin
+            compressing once the peer has shown that it agreed by replying.
+        '''
+        self.zrx = True
+
+        if level is not None and self.zcomp is None:
+            self.zwait = (level, size)
+
+    def getZlibInfo(self):
+        '''
+        Get zlib compression statistics for the Link.
+
+        Returns:
+            dict: A dict of 'tx' and 'rx' stats including message counts,
+            uncompressed and compressed byte counts, the compression ratio
+            and the CPU time spent compressing or decompressing.
+        '''
+        retn = {}
+        for name, info in self.zinfo.items():
+            info = dict(info)
+            info['ratio'] = info['size'] / info['zsize'] if info['zsize'] else None
+            retn[name] = info
+
+        retn['enabled'] = self.zcomp is not None
+        return retn
+
+    def _zlibEncode(self, byts):
+
+        info = self.zinfo['tx']
+
+        if len(byts) < self.zsize:
+            return byts
+
+        t0 = time.thread_time()
+
+        zbyts = self.zcomp.compress(byts) + self.zcomp.flush(zlib.Z_SYNC_FLUSH)
+        frame = s_msgpack.en(msgpack.ExtType(zlibext, zbyts))
+
+        info['time'] += time.thread_time() - t0
+        info['mesgs'] += 1
+        info['size'] += len(byts)
+        info['zsize'] += len(zbyts)
+
+        return frame
+
+    def _zlibDecode(self, zbyts):
+
+        info = self.zinfo['rx']
+
+        if self.zdecomp is None:
+            self.zdecomp = zlib.decompressobj()
+            self.zunpk = s_msgpack.Unpk()
+
+        t0 = time.thread_time()
+
+        retn = []
+        size = 0
+        zsize = len(zbyts)
+
+        # decompress in bounded steps so a small frame can not expand without limit
+        while True:
+
+            byts = self.zdecomp.decompress(zbyts, zlibstep)
+
+            size += len(byts)
+            if size > self.zmax:
+                raise s_exc.LinkErr(mesg=f'Compressed frame exceeds the maximum size: {self.zmax}', size=size)
+
+            retn.extend(self.zunpk.feed(byts))
+
+            zbyts = self.zdecomp.unconsumed_tail
+            if not zbyts and len(byts) < zlibstep:
+                break
+
+        info['time'] += time.thread_time() - t0
+        info['mesgs'] += len(retn)
+        info['size'] += sum(size for size, mesg in retn)
+        info['zsize'] += zsize
+
+        return retn
@@ -3,11 +3,14 @@ The layer library contains the base Layer object and helpers used for
 cortex construction.
 '''
 import os
+import asyncio
 import logging
+import itertools
 
 import synapse.exc as s_exc
 import synapse.common as s_common
 
+import synapse.lib.coro as s_coro
 import synapse.lib.cache as s_cache
 import synapse.lib.const as s_const
 import synapse.lib.lmdbslab as s_lmdbslab
@@ -24,6 +27,9 @@ MAX_INDEX_LEN = 256
 # The layer map size can start much lower because the underlying slab auto-grows.
 LMDB_LAYER_DEFAULT_MAP_SIZE = 512 * s_const.mebibyte
 
+# The number of rows per chunk when bulk exporting / importing layer databases
+EXPORT_CHUNK_SIZE = 10000
+
 class LmdbLayer(s_layer.Layer):
     '''
     A layer implements btree indexed storage for a cortex.
@@ -40,6 +46,8 @@ class LmdbLayer(s_layer.Layer):
                              'doc': 'Whether to prefault and lock the data into memory'}),
         ('lmdb:map_async', {'type': 'bool', 'defval': False,
                             'doc': 'Enables map_async option in LMDB to avoid blocking on mmap syncs.'}),
+        ('lmdb:storlog', {'type': 'bool', 'defval': False,
+                          'doc': 'Log storage operations to allow physical replication by mirrors.'}),
     )
 
     async def __anit__(self, core, node):
@@ -62,6 +70,9 @@ class LmdbLayer(s_layer.Layer):
 
         map_async = self.conf.get('lmdb:map_async')
 
+        storlog = core.conf.get('layer:lmdb:storlog')
+        self.conf.setdefault('lmdb:storlog', storlog)
+
         # First check hive configuration.  If not set, use passed-in parameter (that defaults to False)
         self.lockmemory = self.conf.get('lmdb:lockmemory')
         if self.lockmemory is None:
@@ -107,6 +118,14 @@ class LmdbLayer(s_layer.Layer):
         self.offs = s_slaboffs.SlabOffs(self.layrslab, offsdb)
         self.splicelog = s_slabseqn.SlabSeqn(self.spliceslab, 'splices')
 
+        # (sops, splice offset, splice count) for each call to stor()
+        self.storlog = None
+        if self.conf.get('lmdb:storlog'):
+            self.storlog = s_slabseqn.SlabSeqn(self.spliceslab, 'stors')
+
+        self.storlogged = asyncio.Event()
+        self.onfini(self.storlogged.set)
+
         self.indxfunc = {
             'eq': self._rowsByEq,
             'pref': self._rowsByPref,
@@ -183,6 +202,17 @@ class LmdbLayer(s_layer.Layer):
                 raise s_exc.NoSuchStor(name=oper[0])
             func(oper)
 
+        if self.storlog is not None:
+
+            scount = 0
+            if splices:
+                scount = len(splices)
+
+            self.storlog.add((sops, self.splicelog.index(), scount))
+
+            self.storlogged.set()
+            self.storlogged.clear()
+
         if splices:
             await self._storFireSplices(splices)
 
@@ -742,20 +772,198 @@ class LmdbLayer(s_layer.Layer):
             yield mesg
 
     async def syncSplices(self, offs):
-
-        for item in self.splicelog.iter(offs):
+        async for item in self._syncSeqn(self.splicelog, offs, self.spliced):
             yield item
 
-        async with self.getSpliceWindow() as wind:
-            async for item in wind:
-                yield item
+    async def _syncSeqn(self, seqn, offs, evnt):
+        '''
+        Yield (indx, valu) tuples from a SlabSeqn beginning at offs and then follow it as it grows.
+
+        Notes:
+            Subscribers only hold a cursor into the log, so a slow subscriber
+            falls behind on disk rather than buffering items in memory.
+        '''
+        while not self.isfini:
+
+            count = 0
+            for indx, valu in seqn.iter(offs):
+
+                yield indx, valu
+
+                offs = indx + 1
+
+                count += 1
+                if not count % 1000:
+                    await asyncio.sleep(0)
+
+            if seqn.index() > offs:
+                continue
+
+            await s_coro.event_wait(evnt)
+
+    async def syncStors(self, offs):
+        '''
+        Yield (indx, (sops, soffs, splices)) tuples from the storage operation log beginning at offs.
+
+        Notes:
+            Once caught up, new entries are yielded as they are logged.  The
+            storage operations are already normalized and indexed, so they
+            may be applied to a mirror layer without any model work.  The
+            soffs is the splice log offset of the first splice.
+        '''
+        if self.storlog is None:
+            mesg = f'Layer {self.iden} does not log storage operations ( see lmdb:storlog ).'
+            raise s_exc.BadConfValu(mesg=mesg, name='lmdb:storlog', valu=False)
+
+        async for indx, (sops, soffs, scount) in self._syncSeqn(self.storlog, offs, self.storlogged):
+
+            splices = ()
+            if scount:
+                splices = [s for _, s in self.splicelog.slice(soffs, scount)]
+
+            yield indx, (sops, soffs, splices)
+
+    def _getExportDbs(self):
+        '''
+        Return (name, slab, db) tuples for the databases which hold the contents of the layer.
+        '''
+        return (
+            ('bybuid', self.layrslab, self.bybuid),
+            ('byprop', self.layrslab, self.byprop),
+            ('byuniv', self.layrslab, self.byuniv),
+            ('by_tp_pi', self.layrslab, self.by_tp_pi),
+            ('by_tp_tpi', self.layrslab, self.by_tp_tpi),
+            ('by_tp_ftpi', self.layrslab, self.by_tp_ftpi),
+            ('name2abrv', self.layrslab, self.name2abrv),
+            ('abrv2name', self.layrslab, self.abrv2name),
+            ('nodedata.byname', self.dataslab, self.databyname),
+            ('nodedata.bybuid', self.dataslab, self.databybuid),
+        )
+
+    async def exportDbs(self, dirn):
+        '''
+        Export the contents of the layer to a directory of sorted msgpack streams.
+
+        Args:
+            dirn (str): The directory to write the streams to.
+
+        Notes:
+            Each database is written to <name>.mpk as (lkey, lval) tuples
+            in LMDB key order along with a layer.mpk file of export info.
+            Splices and offsets are not exported.
+
+        Returns:
+            (dict): The export info.
+        '''
+        dirn = s_common.gendir(dirn)
+
+        info = {
+            'iden': self.iden,
+            'modelvers': await self.getModelVers(),
+            'nameabrv': self.metadict.get('nameabrv', 0),
+            'dbs': {},
+        }
+
+        for name, slab, db in self._getExportDbs():
+
+            count = 0
+
+            with open(os.path.join(dirn, f'{name}.mpk'), 'wb') as fd:
+
+                for lkey, lval in slab.scanByFull(db=db):
+
+                    fd.write(s_msgpack.en((lkey, lval)))
+
+                    count += 1
+                    if not count % EXPORT_CHUNK_SIZE:
+                        await asyncio.sleep(0)
+
+            info['dbs'][name] = count
+
+        s_msgpack.dumpfile(info, os.path.join(dirn, 'layer.mpk'))
+
+        return info
+
+    async def importDbs(self, dirn):
+        '''
+        Import the contents of a layer exported with exportDbs() into this empty layer.
+
+        Args:
+            dirn (str): The directory containing the exported streams.
+
+        Notes:
+            The rows are written directly to LMDB in their exported order
+            without any model normalization.  The streams for each database
+            are decoded in parallel threads while the rows are written.
+
+        Returns:
+            (dict): The export info.
+        '''
+        info = s_msgpack.loadfile(s_common.reqpath(dirn, 'layer.mpk'))
+
+        vers = await self.getModelVers()
+        if tuple(info.get('modelvers')) != tuple(vers):
+            mesg = f'Exported layer model version {info.get("modelvers")} != {vers}.'
+            raise s_exc.BadStorageVersion(mesg=mesg)
+
+        todo = [(name, slab, db) for (name, slab, db) in self._getExportDbs() if name in info['dbs']]
+
+        for name, slab, db in todo:
+            if slab.stat(db=db)['entries']:
+                mesg = f'Layer database {name} is not empty.'
+                raise s_exc.DataAlreadyExists(mesg=mesg, name=name)
+
+        await asyncio.gather(*[self._importDb(dirn, name, slab, db, info['dbs'][name]) for (name, slab, db) in todo])
+
+        self.metadict.set('nameabrv', info.get('nameabrv', 0))
+
+        self.layrslab.forcecommit()
+        self.dataslab.forcecommit()
+
+        self.buidcache = s_cache.LruDict(s_layer.BUID_CACHE_SIZE)
+
+        return info
+
+    async def _importDb(self, dirn, name, slab, db, count):
+
+        # sorted rows may be appended, but LMDB only appends the first value for a
+        # key in dupsort databases so those are written with a (cheap) sorted put
+        append = not db.dupsort
+
+        with s_common.reqfile(dirn, f'{name}.mpk') as fd:
+
+            genr = s_msgpack.iterfd(fd)
+
+            def chunk():
+                return list(itertools.islice(genr, EXPORT_CHUNK_SIZE))
+
+            added = 0
+            while True:
+
+                rows = await s_coro.executor(chunk)
+                if not rows:
+                    break
+
+                added += slab.putmulti(rows, dupdata=True, append=append, db=db)[1]
+
+                # keep the slab transaction ( and its replay log ) bounded
+                slab.forcecommit()
+
+        if added != count:
+            mesg = f'Imported {added} rows for {name} but {count} were exported.'
+            raise s_exc.InconsistentStorage(mesg=mesg, name=name)
 
     async def stat(self):
-        return {
+        stat = {
             'splicelog_indx': self.splicelog.index(),
             **self.layrslab.statinfo()
         }
 
+        if self.storlog is not None:
+            stat['storlog_indx'] = self.storlog.index()
+
+        return stat
+
     async def initdb(self, name, dupsort=False):
         db = self.layrslab.initdb(name, dupsort)
         self.dbs[name] = db
@@ -542,12 +542,31 @@ class Slab(s_base.Base):
         return valu is not None
 
     def get(self, lkey, db=_DefaultDB):
+        if db is None:
+            db = _DefaultDB
         self._acqXactForReading()
         try:
             return self.xact.get(lkey, db=db.db)
         finally:
             self._relXactForReading()
 
+    def getmulti(self, lkeys, db=_DefaultDB):
+        '''
+        Return a list of the values ( or None ) for a list of keys using a single cursor.
+        '''
+        self._acqXactForReading()
+        try:
+            retn = []
+            with self.xact.cursor(db=db.db) as curs:
+                for lkey in lkeys:
+                    if curs.set_key(lkey):
+                        retn.append(curs.value())
+                    else:
+                        retn.append(None)
+            return retn
+        finally:
+            self._relXactForReading()
+
     def last(self, db=_DefaultDB):
         '''
         Return the last key/value pair from the given db.
@@ -1,5 +1,7 @@
 import logging
+import functools
 import collections
+import contextvars
 
 import synapse.exc as s_exc
 import synapse.common as s_common
@@ -12,6 +14,34 @@ import synapse.lib.editatom as s_editatom
 
 logger = logging.getLogger(__name__)
 
+# True while the current task holds the edit lock of its snap
+EditLockHeld = contextvars.ContextVar('EditLockHeld', default=False)
+
+def editlocked(f):
+    '''
+    Decorator for Node edit methods which serializes them when concurrent tasks share a snap.
+
+    Notes:
+        Snap.editlock is only set once something (such as tee --parallel) runs storm
+        concurrently within the snap.  Nested edits ( from triggers ) and tasks spawned
+        while the lock is held re-enter without waiting.
+    '''
+    @functools.wraps(f)
+    async def wrap(self, *args, **kwargs):
+
+        lock = self.snap.editlock
+        if lock is None or EditLockHeld.get():
+            return await f(self, *args, **kwargs)
+
+        async with lock:
+            token = EditLockHeld.set(True)
+            try:
+                return await f(self, *args, **kwargs)
+            finally:
+                EditLockHeld.reset(token)
+
+    return wrap
+
 class Node:
     '''
     A Cortex hypergraph node.
@@ -181,6 +211,7 @@ class Node:
 
         return retn
 
+    @editlocked
     async def set(self, name, valu, init=False):
         '''
         Set a property on the node.
@@ -302,6 +333,7 @@ class Node:
             return self.tags.get(name[1:])
         return self.props.get(name)
 
+    @editlocked
     async def pop(self, name, init=False):
         '''
         Remove a property from a node and return the value
@@ -400,6 +432,7 @@ class Node:
 
         return retn
 
+    @editlocked
     async def addTag(self, tag, valu=(None, None)):
         '''
         Add a tag to a node.
@@ -485,6 +518,7 @@ class Node:
 
         return True
 
+    @editlocked
     async def delTag(self, tag, init=False):
         '''
         Delete a tag from the node.
@@ -540,6 +574,7 @@ class Node:
         '''
         return self.tagprops.get((tag, prop), defval)
 
+    @editlocked
     async def setTagProp(self, tag, name, valu):
         '''
         Set the value of the given tag property.
@@ -574,6 +609,7 @@ class Node:
 
         self.tagprops[tagkey] = norm
 
+    @editlocked
     async def delTagProp(self, tag, name):
 
         curv = self.tagprops.pop((tag, name), s_common.novalu)
@@ -590,6 +626,7 @@ class Node:
 
         await self.snap.stor(sops, splices)
 
+    @editlocked
     async def delete(self, force=False):
         '''
         Delete a node from the cortex.
@@ -1,16 +1,20 @@
+import os
+import copyreg
+import hashlib
+import logging
+
 import regex
+from regex import _regex
 
 import synapse.data as s_data
+import synapse.common as s_common
 
-tldlist = list(s_data.get('iana.tlds'))
-
-tldlist.sort(key=lambda x: len(x))
-tldlist.reverse()
+import synapse.lib.msgpack as s_msgpack
 
-tldcat = '|'.join(tldlist)
-fqdn_re = regex.compile(r'((?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))' % tldcat)
+logger = logging.getLogger(__name__)
 
-scrape_types = [
+# the rules which contain {tlds} are formatted with the alternation of IANA TLDs
+rules = (
     ('hash:md5', r'(?=(?:[^A-Za-z0-9]|^)([A-Fa-f0-9]{32})(?:[^A-Za-z0-9]|$))', {}),
     ('hash:sha1', r'(?=(?:[^A-Za-z0-9]|^)([A-Fa-f0-9]{40})(?:[^A-Za-z0-9]|$))', {}),
     ('hash:sha256', r'(?=(?:[^A-Za-z0-9]|^)([A-Fa-f0-9]{64})(?:[^A-Za-z0-9]|$))', {}),
@@ -18,11 +22,135 @@ scrape_types = [
     ('inet:url', r'[a-zA-Z][a-zA-Z0-9]*://[^ \'\"\t\n\r\f\v]+', {}),
     ('inet:ipv4', r'(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)', {}),
     ('inet:server', r'((?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?):[0-9]{1,5})', {}),
-    ('inet:fqdn', r'(?:[^a-z0-9_.-]|^)((?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))(?:[^a-z0-9_.-]|$)' % tldcat, {}),
-    ('inet:email', r'(?:[^a-z0-9_.+-]|^)([a-z0-9_\.\-+]{1,256}@(?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))(?:[^a-z0-9_.-]|$)' % tldcat, {}),
-]
+    ('inet:fqdn', r'(?:[^a-z0-9_.-]|^)((?:[a-z0-9_-]{1,63}\.){1,10}(?:{tlds}))(?:[^a-z0-9_.-]|$)', {}),
+    ('inet:email', r'(?:[^a-z0-9_.+-]|^)([a-z0-9_\.\-+]{1,256}@(?:[a-z0-9_-]{1,63}\.){1,10}(?:{tlds}))(?:[^a-z0-9_.-]|$)', {}),
+)
+
+_tldlist = None
+_regexes = {}
+
+def getTldList():
+    '''
+    Return the IANA TLD list ( longest first ) loading it on first use.
+    '''
+    global _tldlist
+
+    if _tldlist is None:
+        tlds = list(s_data.get('iana.tlds'))
+        tlds.sort(key=lambda x: len(x))
+        tlds.reverse()
+        _tldlist = tlds
+
+    return _tldlist
+
+def _getRuleText(rule):
+    if '{tlds}' not in rule:
+        return rule
+    return rule.replace('{tlds}', '|'.join(getTldList()))
+
+def _getCachePath(text, flags):
+    byts = '\x00'.join((regex.__version__, str(flags), text)).encode('utf8')
+    return s_common.getSynPath('cache', 'regex', hashlib.sha256(byts).hexdigest() + '.mpk')
+
+def _compileRegex(text, flags=0):
+    '''
+    Compile a regular expression using a compiled copy cached in the synapse directory.
+
+    Notes:
+        The regex module reduces a compiled pattern to the arguments for
+        _regex.compile() ( including the compiled pattern code ), so loading
+        a large pattern ( such as an alternation of every TLD ) from the cache
+        is much faster than compiling it.  The arguments are stored using
+        msgpack after their sha256 ( which is checked before they are passed
+        to _regex.compile() ) and the cache is keyed by the regex version,
+        flags and pattern text.
+    '''
+    path = None
+
+    try:
+
+        path = _getCachePath(text, flags)
+
+        with open(path, 'rb') as fd:
+            byts = fd.read()
+
+        # the compiled code is not validated by _regex.compile() so the args must be intact
+        if hashlib.sha256(byts[32:]).digest() == byts[:32]:
+
+            args = s_msgpack.un(byts[32:])
+
+            regx = _regex.compile(*args)
+            if regx.pattern == text and regx.flags & flags == flags:
+                return regx
+
+        logger.warning(f'Ignoring invalid regex cache file: {path}')
+
+    except FileNotFoundError:
+        pass
+
+    except Exception as e:
+        logger.warning(f'Error loading regex cache file {path}: {e}')
+
+    regx = regex.compile(text, flags)
+
+    if path is None:
+        return regx
+
+    try:
+        func, args = copyreg.dispatch_table[regex.Pattern](regx)
+        byts = s_msgpack.en(args)
+        byts = hashlib.sha256(byts).digest() + byts
+
+        s_common.gendir(os.path.dirname(path))
+
+        # write to a temp file and rename so concurrent processes never read a partial file
+        temp = f'{path}.{os.getpid()}'
+        with open(temp, 'wb') as fd:
+            fd.write(byts)
+
+        os.replace(temp, path)
+
+    except Exception as e:  # pragma: no cover
+        logger.warning(f'Error saving regex cache file {path}: {e}')
+
+    return regx
+
+def getRegex(name):
+    '''
+    Return the compiled regular expression for a scrape rule ( compiling it on first use ).
+    '''
+    regx = _regexes.get(name)
+    if regx is not None:
+        return regx
+
+    for rulename, rule, opts in rules:
+        if rulename == name:
+            regx = _regexes[name] = _compileRegex(_getRuleText(rule), regex.IGNORECASE)
+            return regx
+
+    return None
+
+def __getattr__(name):
+    # the module level tld list and regexes are only built when used
+    if name == 'tldlist':
+        return getTldList()
+
+    if name == 'tldcat':
+        return '|'.join(getTldList())
+
+    if name == 'fqdn_re':
+        regx = _regexes.get('fqdn_re')
+        if regx is None:
+            regx = _regexes['fqdn_re'] = _compileRegex(r'((?:[a-z0-9_-]{1,63}\.){1,10}(?:%s))' % '|'.join(getTldList()))
+        return regx
+
+    if name == 'scrape_types':
+        return [(rulename, _getRuleText(rule), opts) for (rulename, rule, opts) in rules]
+
+    if name == 'regexes':
+        return {rulename: getRegex(rulename) for (rulename, rule, opts) in rules}
 
-regexes = {name: regex.compile(rule, regex.IGNORECASE) for (name, rule, opts) in scrape_types}
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 def scrape(text, ptype=None):
     '''
@@ -36,9 +164,9 @@ def scrape(text, ptype=None):
         (str, str): Yield tuples of type, valu strings.
     '''
 
-    for ruletype, rule, info in scrape_types:
+    for ruletype, rule, info in rules:
         if ptype and ptype != ruletype:
             continue
-        regx = regexes.get(ruletype)
+        regx = getRegex(ruletype)
         for valu in regx.findall(text):
             yield (ruletype, valu)
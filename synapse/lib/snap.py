@@ -65,6 +65,8 @@ class Snap(s_base.Base):
 
         self.debug = False      # Set to true to enable debug output.
         self.write = False      # True when the snap has a write lock on a layer.
+        self.editlock = None    # Set to an asyncio.Lock() once storm runs concurrently within the snap.
+        self.budget = None      # A storm.Budget() which limits queries run within the snap.
 
         self.tagcache = s_cache.FixedCache(self._addTagNode, size=10000)
         self.buidcache = collections.deque(maxlen=100000)  # Keeps alive the most recently accessed node objects
@@ -160,6 +162,9 @@ class Snap(s_base.Base):
         if node is not None:
             return node
 
+        if self.budget is not None:
+            self.budget.addRow()
+
         props = {}
         proplayr = {}
         for layr in self.layers:
@@ -655,6 +660,10 @@ class Snap(s_base.Base):
         '''
         for layeridx, layr in enumerate(self.layers):
             async for x in layr.getLiftRows(lops):
+
+                if self.budget is not None:
+                    self.budget.addRow()
+
                 yield layeridx, x
 
     async def getRowNodes(self, rows, rawprop, cmpf=None):
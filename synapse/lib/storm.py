@@ -15,6 +15,66 @@ import synapse.lib.stormtypes as s_stormtypes
 
 logger = logging.getLogger(__name__)
 
+class Budget:
+    '''
+    Resource limits for a single storm query.
+
+    Args:
+        rows (int): The maximum number of storage rows lifted by the query.
+        nodes (int): The maximum number of nodes yielded by the query.
+        time (int): The maximum run time of the query in milliseconds.
+    '''
+    def __init__(self, rows=None, nodes=None, time=None):
+
+        self.rows = rows
+        self.nodes = nodes
+        self.time = time
+
+        self.rowcount = 0
+        self.nodecount = 0
+
+        self.tick = s_common.now()
+
+        self.maxtick = None
+        if time is not None:
+            self.maxtick = self.tick + time
+
+        # the outermost runtime is responsible for counting nodes
+        self.runt = None
+
+    def pack(self):
+        return {
+            'rows': self.rows,
+            'nodes': self.nodes,
+            'time': self.time,
+            'rowcount': self.rowcount,
+            'nodecount': self.nodecount,
+            'took': s_common.now() - self.tick,
+        }
+
+    def _raise(self, name, limit):
+        mesg = f'Storm query exceeded its {name} budget of {limit}.'
+        raise s_exc.StormBudgetExceeded(mesg=mesg, name=name, limit=limit)
+
+    def addRow(self):
+        self.rowcount += 1
+        if self.rows is not None and self.rowcount > self.rows:
+            self._raise('rows', self.rows)
+
+        # queries which consume their nodes ( such as spin ) are limited by the work they do
+        self.check()
+
+    def addNode(self):
+        self.nodecount += 1
+        if self.nodes is not None and self.nodecount > self.nodes:
+            self._raise('nodes', self.nodes)
+
+        self.check()
+
+    def check(self):
+        if self.maxtick is not None and s_common.now() > self.maxtick:
+            self._raise('time', self.time)
+
 class Runtime:
     '''
     A Runtime represents the instance of a running query.
@@ -49,6 +109,10 @@ class Runtime:
 
         self.elevated = False
 
+        self.budget = snap.budget
+        if self.budget is not None and self.budget.runt is None:
+            self.budget.runt = self
+
         # used by the digraph projection logic
         self._graph_done = {}
         self._graph_want = collections.deque()
@@ -68,7 +132,8 @@ class Runtime:
         self.elevated = True
 
     def tick(self):
-        pass
+        if self.budget is not None:
+            self.budget.check()
 
     def cancel(self):
         self.task.cancel()
@@ -162,7 +227,12 @@ class Runtime:
                 self.opts.setdefault(name, valu)
 
             async for node, path in query.iterNodePaths(self, genr=genr):
+
                 self.tick()
+
+                if self.budget is not None and self.budget.runt is self:
+                    self.budget.addNode()
+
                 yield node, path
 
 class Parser(argparse.ArgumentParser):
@@ -917,15 +987,36 @@ class TeeCmd(Cmd):
         # Also emit the inbound node
         inet:ipv4=1.2.3.4 | tee --join { -> * } { <- * }
 
+        # Run the queries concurrently, emitting results as they arrive
+        inet:ipv4=1.2.3.4 | tee --parallel --unordered { -> * } { <- * }
+
+    Notes:
+
+        When --parallel is used, each query starts with the variables of the
+        inbound path and any variables they set are merged back into the path
+        in the order the queries are given once all of them have completed.
+        Node edits made by the concurrent queries are serialized.
     '''
     name = 'tee'
 
+    # the number of results buffered for each query ( or shared when unordered ) with --parallel
+    qsize = 1000
+
     def getArgParser(self):
         pars = Cmd.getArgParser(self)
 
         pars.add_argument('--join', '-j', default=False, action='store_true',
                           help='Emit inbound nodes after processing storm queries.')
 
+        pars.add_argument('--parallel', '-p', default=False, action='store_true',
+                          help='Run the storm queries for each node concurrently.')
+
+        pars.add_argument('--concurrency', type=int, default=8,
+                          help='The maximum number of queries to run at once with --parallel.')
+
+        pars.add_argument('--unordered', default=False, action='store_true',
+                          help='Emit --parallel results as they arrive rather than in query order.')
+
         pars.add_argument('query', nargs='*',
                           help='Specify a query to execute on the input nodes.')
 
@@ -937,13 +1028,93 @@ class TeeCmd(Cmd):
             raise s_exc.StormRuntimeError(mesg='Tee command must take at least one query as input.',
                                           name=self.name)
 
+        if self.opts.concurrency < 1:
+            raise s_exc.StormRuntimeError(mesg='Tee --concurrency must be greater than 0.',
+                                          name=self.name)
+
+        queries = [query[1:-1] for query in self.opts.query]
+
+        if self.opts.parallel and runt.snap.editlock is None:
+            runt.snap.editlock = asyncio.Lock()
+
         async for node, path in genr:  # type: s_node.Node, s_node.Path
 
-            for query in self.opts.query:
-                query = query[1:-1]
-                # This does update path with any vars set in the last npath (node.storm behavior)
-                async for nnode, npath in node.storm(query, user=runt.user, path=path):
-                    yield nnode, npath
+            if self.opts.parallel:
+                async for item in self._runParallel(runt, node, path, queries):
+                    yield item
+
+            else:
+                for query in queries:
+                    # This does update path with any vars set in the last npath (node.storm behavior)
+                    async for nnode, npath in node.storm(query, user=runt.user, path=path):
+                        yield nnode, npath
 
             if self.opts.join:
                 yield node, path
+
+    async def _runParallel(self, runt, node, path, queries):
+
+        size = len(queries)
+
+        sema = asyncio.Semaphore(self.opts.concurrency)
+
+        # each query gets its own copy of the path variables
+        qpaths = [s_node.Path(path.runt, dict(path.vars), path.nodes) for _ in queries]
+
+        # in ordered mode each query gets a bounded queue which is drained in query order
+        if self.opts.unordered:
+            outqs = [asyncio.Queue(maxsize=self.qsize)] * size
+        else:
+            outqs = [asyncio.Queue(maxsize=self.qsize) for _ in queries]
+
+        async def runq(indx):
+            outq = outqs[indx]
+            try:
+                async for item in node.storm(queries[indx], user=runt.user, path=qpaths[indx]):
+                    await outq.put((indx, 'item', item))
+
+                await outq.put((indx, 'done', None))
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as e:
+                await outq.put((indx, 'err', e))
+
+            finally:
+                sema.release()
+
+        tasks = []
+
+        async def launch():
+            # queries are started in order so a query waiting on its full queue
+            # never holds the semaphore needed by the query being emitted
+            for indx in range(size):
+                await sema.acquire()
+                tasks.append(asyncio.create_task(runq(indx)))
+
+        launcher = asyncio.create_task(launch())
+
+        try:
+
+            curr = 0
+            while curr < size:
+
+                indx, mesg, item = await outqs[curr].get()
+
+                if mesg == 'err':
+                    raise item
+
+                if mesg == 'done':
+                    curr += 1
+                    continue
+
+                yield item
+
+        finally:
+            launcher.cancel()
+            for task in tasks:
+                task.cancel()
+
+        for qpath in qpaths:
+            path.vars.update(qpath.vars)
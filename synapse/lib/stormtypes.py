@@ -11,6 +11,7 @@ import synapse.common as s_common
 import synapse.lib.node as s_node
 import synapse.lib.time as s_time
 import synapse.lib.cache as s_cache
+import synapse.lib.const as s_const
 
 def intify(x):
     if isinstance(x, str):
@@ -166,8 +167,12 @@ class LibBytes(Lib):
     def addLibFuncs(self):
         self.locls.update({
             'put': self._libBytesPut,
+            'read': self._libBytesRead,
         })
 
+    # the most bytes which $lib.bytes.read() will return
+    maxread = 16 * s_const.mebibyte
+
     async def _libBytesPut(self, byts):
         '''
         Save the given bytes variable to the axon.
@@ -182,10 +187,40 @@ class LibBytes(Lib):
             mesg = '$lib.bytes.put() requires a bytes argument'
             raise s_exc.BadArg(mesg=mesg)
 
-        await self.runt.snap.core.axready.wait()
-        size, sha2 = await self.runt.snap.core.axon.put(byts)
+        axon = await self.runt.snap.core.getAxon()
+        size, sha2 = await axon.put(byts)
         return (size, s_common.ehex(sha2))
 
+    async def _libBytesRead(self, sha256, offset, size):
+        '''
+        Read size bytes starting at offset from a file in the axon.
+
+        Returns:
+            The bytes read ( which may be less than size at the end of the file ).
+
+        Example:
+            $head = $lib.bytes.read($sha256, 0, 512)
+        '''
+        # reading from the axon requires the same permission as axon.get()
+        self.runt.allowed('axon', 'get')
+
+        offset = intify(offset)
+        size = intify(size)
+
+        if size > self.maxread:
+            mesg = f'$lib.bytes.read() size may not be larger than {self.maxread}'
+            raise s_exc.BadArg(mesg=mesg, size=size)
+
+        sha256 = s_common.uhex(sha256)
+
+        axon = await self.runt.snap.core.getAxon()
+
+        chunks = []
+        async for byts in axon.read(sha256, offset=offset, size=size):
+            chunks.append(byts)
+
+        return b''.join(chunks)
+
 class LibTime(Lib):
 
     def addLibFuncs(self):
@@ -60,6 +60,9 @@ class Triggers:
             if self.cond == 'prop:set' and self.prop is None:
                 raise s_exc.BadOptValu(mesg='missing prop parameter')
 
+            # the parsed storm query (not persisted)
+            self.query = None
+
         def en(self):
             return s_msgpack.en(dataclasses.asdict(self))
 
@@ -83,7 +86,12 @@ class Triggers:
             with s_provenance.claim('trig', cond=self.cond, form=self.form, tag=self.tag, prop=self.prop):
 
                 try:
-                    await s_common.aspin(node.storm(self.storm, opts=opts, user=user))
+                    if self.query is None:
+                        self.query = node.snap.core.getStormQuery(self.storm)
+
+                    with node.snap.getStormRuntime(opts=opts, user=user) as runt:
+                        runt.addInput(node)
+                        await s_common.aspin(runt.iterStormQuery(self.query))
                 except asyncio.CancelledError: # pragma: no cover
                     raise
                 except Exception:
@@ -219,8 +227,8 @@ class Triggers:
     def _load_rule(self, iden, ver, cond, user, query, enabled, info):
         rule = Triggers.Rule(ver, cond, user, query, enabled, **info)
 
-        # Make sure the query parses
-        self.core.getStormQuery(rule.storm)
+        # Make sure the query parses and keep it around
+        rule.query = self.core.getStormQuery(rule.storm)
 
         self._rules[iden] = rule
 
@@ -265,8 +273,7 @@ class Triggers:
         if rule is None:
             raise s_exc.NoSuchIden(iden=iden)
 
-        self.core.getStormQuery(query)
-
+        rule.query = self.core.getStormQuery(query)
         rule.storm = query
         self.core.slab.put(iden.encode(), rule.en(), db=self.trigdb)
 
@@ -335,6 +335,7 @@ def phnode(valu):
     return (valu, {}, {})
 
 phonetree = (None, {}, {})
+phonetree_init = False
 
 def formPhoneNode(node, valu):
     retn = node[2].get(valu)
@@ -344,6 +345,9 @@ def formPhoneNode(node, valu):
     return retn
 
 def initPhoneTree():
+
+    global phonetree_init
+
     for pref, info in prefixes:
         node = phonetree
         for c in pref:
@@ -354,6 +358,8 @@ def initPhoneTree():
 
         node[1].update(info)
 
+    phonetree_init = True
+
 def getPhoneInfo(numb):
     '''
     Walk the phone info tree to find the best-match info for the given number.
@@ -364,6 +370,10 @@ def getPhoneInfo(numb):
         country = info.get('cc')
 
     '''
+    # the tree is built on first use rather than at import
+    if not phonetree_init:
+        initPhoneTree()
+
     text = str(numb)
 
     info = {}
@@ -382,5 +392,3 @@ def getPhoneInfo(numb):
         node = chld
 
     return info
-
-initPhoneTree()
@@ -3,6 +3,7 @@ An RMI framework for synapse.
 '''
 
 import os
+import time
 import asyncio
 import logging
 import collections
@@ -13,8 +14,11 @@ import synapse.common as s_common
 import synapse.lib.base as s_base
 import synapse.lib.coro as s_coro
 import synapse.lib.link as s_link
+import synapse.lib.const as s_const
 import synapse.lib.queue as s_queue
+import synapse.lib.msgpack as s_msgpack
 import synapse.lib.certdir as s_certdir
+import synapse.lib.callstats as s_callstats
 import synapse.lib.threads as s_threads
 import synapse.lib.urlhelp as s_urlhelp
 
@@ -208,6 +212,109 @@ class GenrMethod(Method):
         todo = (self.name, args, kwargs)
         return GenrIter(self.proxy, todo, self.share)
 
+class PoolCall:
+    '''
+    A t2 call which has exclusive use of a pooled link until it is done.
+    '''
+    def __init__(self, proxy, link):
+        self.link = link
+        self.proxy = proxy
+
+        self.rxsize = 0
+        self.txsize = 0
+
+    async def tx(self, mesg):
+        self.txsize += await self.link.tx(mesg)
+
+    async def rx(self):
+        mesg = await self.link.rx()
+        self.rxsize += self.link.rxsize
+        return mesg
+
+    async def done(self):
+        await self.proxy._putPoolLink(self.link)
+
+    async def abort(self):
+        await self.link.fini()
+
+class MuxCall:
+    '''
+    A t2 call which shares a MuxLink with other in-flight calls.
+    '''
+    def __init__(self, mux, iden):
+        self.mux = mux
+        self.iden = iden
+        self.queue = asyncio.Queue()
+
+        # rxsize is updated by the MuxLink as it routes messages
+        self.rxsize = 0
+        self.txsize = 0
+
+    async def tx(self, mesg):
+        mesg[1]['call'] = self.iden
+        self.txsize += await self.mux.link.tx(mesg)
+
+    async def rx(self):
+        return await self.queue.get()
+
+    async def done(self):
+        self.mux.close(self.iden)
+
+    async def abort(self):
+
+        self.mux.close(self.iden)
+
+        # let the server stop any generator for the call
+        if not self.mux.link.isfini:
+            await self.mux.link.tx(('t2:cancel', {'call': self.iden}))
+
+class MuxLink(s_base.Base):
+    '''
+    A pooled link which carries many t2 calls and routes responses by call id.
+    '''
+    async def __anit__(self, link, wake):
+
+        await s_base.Base.__anit__(self)
+
+        self.link = link
+        self.wake = wake
+        self.calls = {}
+
+        async def fini():
+            for call in list(self.calls.values()):
+                call.queue.put_nowait(None)
+            self.wake.set()
+            await self.link.fini()
+
+        self.onfini(fini)
+        self.link.onfini(self.fini)
+
+        self.schedCoro(self._rxLoop())
+
+    async def _rxLoop(self):
+
+        while not self.isfini:
+
+            mesg = await self.link.rx()
+            if mesg is None:
+                await self.fini()
+                return
+
+            call = self.calls.get(mesg[1].get('call'))
+            if call is not None:
+                call.rxsize += self.link.rxsize
+                call.queue.put_nowait(mesg)
+
+    def open(self):
+        iden = s_common.guid()
+        call = MuxCall(self, iden)
+        self.calls[iden] = call
+        return call
+
+    def close(self, iden):
+        if self.calls.pop(iden, None) is not None:
+            self.wake.set()
+
 class Proxy(s_base.Base):
     '''
     A telepath Proxy is used to call remote APIs on a shared object.
@@ -248,6 +355,25 @@ class Proxy(s_base.Base):
         self.sess = None
         self.links = collections.deque()
 
+        # the flow control window granted to the server for generator results
+        self.credititems = 10000
+        self.creditbytes = 16 * s_const.mebibyte
+
+        # set by the handshake if the server supports many calls per link
+        self.mux = False
+        self.muxlinks = []
+        self.muxlock = asyncio.Lock()
+        self.muxwake = asyncio.Event()
+
+        self.maxlinks = 4
+        self.maxinflight = 256
+
+        # the zlib level negotiated by the handshake ( or None )
+        self.zlib = None
+
+        # per-method stats for the t2 calls made by this proxy
+        self.callstats = s_callstats.CallStats()
+
         self.synack = None
         self.syndone = asyncio.Event()
 
@@ -335,6 +461,11 @@ class Proxy(s_base.Base):
 
             link = await s_link.connect(host, port, ssl=ssl)
 
+        # the server enables zlib for a pool link when it receives the first
+        # t2:init so we only begin compressing once it has replied
+        if self.zlib is not None:
+            link.allowZlib(level=self.zlib)
+
         self.onfini(link)
 
         return link
@@ -415,58 +546,143 @@ class Proxy(s_base.Base):
                     'todo': todo,
                     'name': name,
                     'sess': self.sess,
+                    'credit': {'items': self.credititems, 'bytes': self.creditbytes},
         })
 
-        link = await self.getPoolLink()
+        tick = time.perf_counter()
+        call = await self._getTaskCall()
 
-        await link.tx(mesg)
+        def addstat(err=False):
+            self.callstats.add(todo[0], time.perf_counter() - tick, rxsize=call.rxsize, txsize=call.txsize, err=err)
 
-        mesg = await link.rx()
-        if mesg is None:
-            return
+        try:
+
+            await call.tx(mesg)
+
+            mesg = await call.rx()
+            if mesg is None:
+                addstat(err=True)
+                await call.abort()
+                return
+
+        except (Exception, asyncio.CancelledError):
+            addstat(err=True)
+            await call.abort()
+            raise
 
         if mesg[0] == 't2:fini':
-            await self._putPoolLink(link)
+            await call.done()
             retn = mesg[1].get('retn')
+            addstat(err=not retn[0])
             return s_common.result(retn)
 
         if mesg[0] == 't2:genr':
 
             async def genrloop():
 
+                err = False
+
+                # grant more credit once half the window has been consumed
+                used = {'items': 0, 'bytes': 0}
+
+                async def consumed(size):
+
+                    used['items'] += 1
+                    used['bytes'] += size
+
+                    if used['items'] >= self.credititems // 2 or used['bytes'] >= self.creditbytes // 2:
+                        await call.tx(('t2:credit', used.copy()))
+                        used['items'] = 0
+                        used['bytes'] = 0
+
                 try:
 
                     while True:
 
-                        mesg = await link.rx()
+                        mesg = await call.rx()
                         if mesg is None:
+                            err = True
                             return
 
-                        assert mesg[0] == 't2:yield'
+                        if mesg[0] == 't2:yields':
+                            retns = [(s_msgpack.un(byts), len(byts)) for byts in mesg[1].get('items')]
 
-                        retn = mesg[1].get('retn')
-                        if retn is None:
-                            await self._putPoolLink(link)
-                            return
+                        else:
+                            assert mesg[0] == 't2:yield'
+                            retns = ((mesg[1].get('retn'), 0),)
+
+                        for retn, size in retns:
+
+                            if retn is None:
+                                await call.done()
+                                return
 
-                        # if this is an exception, it's the end...
-                        if not retn[0]:
-                            await self._putPoolLink(link)
+                            # if this is an exception, it's the end...
+                            if not retn[0]:
+                                err = True
+                                await call.done()
 
-                        yield s_common.result(retn)
+                            yield s_common.result(retn)
+
+                            await consumed(size)
 
                 except GeneratorExit:
-                    # if they bail early on the genr, fini the link
-                    await link.fini()
+                    # if they bail early on the genr, abort the call
+                    await call.abort()
+
+                finally:
+                    addstat(err=err)
 
             return s_coro.GenrHelp(genrloop())
 
         if mesg[0] == 't2:share':
             iden = mesg[1].get('iden')
             sharinfo = mesg[1].get('sharinfo')
-            await self._putPoolLink(link)
+            await call.done()
+            addstat()
             return await Share.anit(self, iden, sharinfo)
 
+    async def _getTaskCall(self):
+        '''
+        Return a PoolCall or ( if the server supports it ) a MuxCall for a t2 task.
+        '''
+        if not self.mux:
+            link = await self.getPoolLink()
+            return PoolCall(self, link)
+
+        mux = await self._getMuxLink()
+        return mux.open()
+
+    async def _getMuxLink(self):
+        '''
+        Return the least busy MuxLink, opening links up to maxlinks and
+        waiting while every link has maxinflight calls.
+        '''
+        while True:
+
+            if self.isfini:
+                raise s_exc.IsFini()
+
+            async with self.muxlock:
+
+                self.muxlinks = [m for m in self.muxlinks if not m.isfini]
+
+                if self.muxlinks:
+                    mux = min(self.muxlinks, key=lambda m: len(m.calls))
+                    if len(mux.calls) < self.maxinflight:
+                        return mux
+
+                if len(self.muxlinks) < self.maxlinks:
+                    link = await self._initPoolLink()
+                    mux = await MuxLink.anit(link, self.muxwake)
+                    self.onfini(mux)
+                    self.muxlinks.append(mux)
+                    return mux
+
+                self.muxwake.clear()
+
+            await self.muxwake.wait()
+
     async def task(self, todo, name=None):
 
         if self.isfini:
@@ -494,12 +710,37 @@ class Proxy(s_base.Base):
         finally:
             self.tasks.pop(task.iden, None)
 
-    async def handshake(self, auth=None):
+    def _getCallStats(self):
+        '''
+        Get per-method stats for the calls made by this Proxy.
+
+        Notes:
+            Latencies are measured from sending t2:init until the result
+            ( or the last generator item ) is received, and include the
+            network and server time.  Compare with the server side
+            getCallStats() to see where the time goes.
+        '''
+        return self.callstats.pack()
+
+    def _getZlibInfo(self):
+        '''
+        Return a list of zlib compression stats for each of our links.
+        '''
+        links = [self.link]
+        links.extend(self.links)
+        links.extend(m.link for m in self.muxlinks)
+        return [(link.iden, link.getZlibInfo()) for link in links if not link.isfini]
+
+    async def handshake(self, auth=None, batch=True, zlib=None):
 
         mesg = ('tele:syn', {
             'auth': auth,
             'vers': televers,
             'name': self.name,
+            # we can receive generator items in t2:yields batches
+            'batch': batch,
+            # request zlib compression at the given level
+            'zlib': zlib,
         })
 
         await self.link.tx(mesg)
@@ -510,6 +751,8 @@ class Proxy(s_base.Base):
             raise s_exc.LinkShutDown(mesg=mesg)
 
         self.sess = self.synack[1].get('sess')
+        self.mux = self.synack[1].get('mux', False)
+        self.zlib = self.synack[1].get('zlib')
         self.sharinfo = self.synack[1].get('sharinfo', {})
         self.methinfo = self.sharinfo.get('meths', {})
 
@@ -543,6 +786,9 @@ class Proxy(s_base.Base):
         retn = self.synack[1].get('retn')
         valu = s_common.result(retn)
 
+        if self.zlib is not None:
+            self.link.setZlib(self.zlib)
+
         self.schedCoro(rxloop())
 
         return valu
@@ -636,6 +882,14 @@ async def openurl(url, **opts):
         url (str): A telepath URL.
         **opts (dict): Telepath connect options.
 
+    Notes:
+        The "links" and "inflight" options ( or URL query parameters ) set the
+        maximum number of pooled links and the maximum calls in flight per link.
+
+        The "zlib" option ( or URL query parameter ) requests zlib compression
+        of larger messages at the given level ( 1-9 ) for links to servers
+        which support it.  This is useful for bulk transfers over slow links.
+
     Returns:
         (synapse.telepath.Proxy): A telepath proxy object.
 
@@ -715,8 +969,17 @@ async def openurl(url, **opts):
     prox = await Proxy.anit(link, name)
     prox.onfini(link)
 
+    # pool size and in-flight call limits for multiplexed links
+    query = info.get('query', {})
+    prox.maxlinks = int(info.get('links', query.get('links', prox.maxlinks)))
+    prox.maxinflight = int(info.get('inflight', query.get('inflight', prox.maxinflight)))
+
+    zlib = info.get('zlib', query.get('zlib'))
+    if zlib is not None:
+        zlib = int(zlib)
+
     try:
-        await prox.handshake(auth=auth)
+        await prox.handshake(auth=auth, batch=info.get('batch', True), zlib=zlib)
 
     except Exception:
         await prox.fini()
@@ -1,3 +1,5 @@
+import os
+import asyncio
 import hashlib
 import logging
 import unittest.mock as mock
@@ -70,6 +72,7 @@ class AxonTest(s_t_utils.SynTest):
         self.false(await axon.has(bbufhash))
 
         self.eq((bbufhash,), await axon.wants((bbufhash, asdfhash)))
+        self.eq((False, True, False), await axon.hasmulti((bbufhash, asdfhash, pennhash)))
 
         async with await axon.upload() as fd:
             await fd.write(bbuf)
@@ -81,6 +84,28 @@ class AxonTest(s_t_utils.SynTest):
 
         self.eq((), await axon.wants((bbufhash, asdfhash)))
 
+        logger.info('read() tests')
+
+        async def read(sha256, offset=0, size=None):
+            return b''.join([b async for b in axon.read(sha256, offset=offset, size=size)])
+
+        self.eq(abuf, await read(asdfhash))
+        self.eq(b'asdf', await read(asdfhash, 4))
+        self.eq(b'df', await read(asdfhash, 2, 2))
+        self.eq(b'', await read(asdfhash, 2, 0))
+        self.eq(b'', await read(asdfhash, 8))
+        self.eq(b'', await read(asdfhash, 100, 10))
+
+        # reads which start in and span chunks
+        offs = s_axon.CHUNK_SIZE - 3
+        self.eq(bbuf[offs:offs + 10], await read(bbufhash, offs, 10))
+        self.eq(bbuf[s_axon.CHUNK_SIZE:s_axon.CHUNK_SIZE + 5], await read(bbufhash, s_axon.CHUNK_SIZE, 5))
+        self.eq(bbuf[-7:], await read(bbufhash, len(bbuf) - 7, 100))
+        self.eq(bbuf[offs:], await read(bbufhash, offs))
+
+        await self.agenraises(s_exc.NoSuchFile, axon.read(pennhash))
+        await self.agenraises(s_exc.BadArg, axon.read(asdfhash, offset=-1))
+
         logger.info('put() / puts() tests')
         # These don't add new data; but exercise apis to load data
         retn = await axon.put(abuf)
@@ -167,11 +192,156 @@ class AxonTest(s_t_utils.SynTest):
         if isinstance(fd, s_axon.UpLoad):
             self.true(fd.fd.closed)
 
+        logger.info('Concurrent upload streams')
+        sbufs = [s_common.guid(i).encode() * 4096 for i in range(4)]
+        sretns = [(len(b), hashlib.sha256(b).digest()) for b in sbufs]
+
+        async with await axon.upload() as fd:
+
+            streams = [await fd.stream() for b in sbufs]
+
+            async def upstream(stream, byts):
+                for chunk in s_common.chunks(byts, 100000):
+                    await fd.write(chunk, stream=stream)
+                return await fd.save(stream=stream)
+
+            retn = await asyncio.gather(*[upstream(s, b) for s, b in zip(streams, sbufs)])
+            self.eq(retn, sretns)
+
+            await self.asyncraises(s_exc.NoSuchIden, fd.write(b'newp', stream='newp'))
+
+            await fd.close(streams[0])
+            await self.asyncraises(s_exc.NoSuchIden, fd.save(stream=streams[0]))
+
+            # the default stream is still usable
+            await fd.write(abuf)
+            self.eq(asdfretn, await fd.save())
+
+        self.eq((), await axon.wants([r[1] for r in sretns]))
+
+        # concurrent puts of the same bytes only save them once
+        nbuf = b'newp' * 100000
+        retn = await axon.puts([nbuf, nbuf, abuf])
+        self.eq(retn, ((400000, hashlib.sha256(nbuf).digest()), (400000, hashlib.sha256(nbuf).digest()), asdfretn))
+
+        info = await axon.metrics()
+        self.eq(67108899 + 4 * 131072 + 400000, info.get('size:bytes'))
+        self.eq(11, info.get('file:count'))
+
     async def test_axon_base(self):
         async with self.getTestAxon() as axon:
             self.isin('axon', axon.dmon.shared)
             await self.runAxonTestBase(axon)
 
+    async def test_axon_blobstor_files(self):
+
+        with self.getTestDir() as dirn:
+
+            async with await s_axon.Axon.anit(dirn, conf={'blobstor': 'files'}) as axon:
+
+                self.isinstance(axon.blobstor, s_axon.FileBlobStor)
+                await self.runAxonTestBase(axon)
+
+                path = axon.blobstor._blobPath(bbufhash)
+                self.true(path.startswith(os.path.join(dirn, 'blobs', s_common.ehex(bbufhash)[:2])))
+                self.eq(len(bbuf), os.stat(path).st_size)
+
+                # no temp files are left behind
+                self.eq([], os.listdir(axon.blobstor.tmpdir))
+
+                # a failed upload does not leave a partial blob
+                def genr():
+                    yield b'visi'
+                    raise s_exc.BadArg()
+
+                sha256 = hashlib.sha256(b'newp').digest()
+                await self.asyncraises(s_exc.BadArg, axon.save(sha256, genr()))
+                self.false(await axon.has(sha256))
+                self.false(await axon.blobstor.has(sha256))
+                self.eq([], os.listdir(axon.blobstor.tmpdir))
+
+            with self.raises(s_exc.BadConfValu):
+                await s_axon.Axon.anit(dirn, conf={'blobstor': 'newp'})
+
+    async def test_axon_compress(self):
+
+        with self.getTestDir() as dirn:
+
+            async with await s_axon.Axon.anit(dirn, conf={'compress': 'zlib'}) as axon:
+
+                await self.runAxonTestBase(axon)
+
+                info = await axon.metrics()
+                self.lt(info.get('size:stored'), info.get('size:bytes') / 100)
+
+                # chunks which do not compress are stored raw
+                rand = os.urandom(100000)
+                size, randhash = await axon.put(rand)
+                valu = axon.blobstor.slab.get(randhash + (0).to_bytes(8, 'big'), db=axon.blobstor.blobs)
+                self.eq(valu[0], s_axon.CODEC_RAW)
+                self.eq(rand, b''.join([b async for b in axon.get(randhash)]))
+
+                valu = axon.blobstor.slab.get(bbufhash + (0).to_bytes(8, 'big'), db=axon.blobstor.blobs)
+                self.eq(valu[0], s_axon.CODEC_ZLIB)
+
+            # blobs saved with and without compression may be read from one axon
+            async with await s_axon.Axon.anit(dirn) as axon:
+
+                self.eq(bbuf, b''.join([b async for b in axon.get(bbufhash)]))
+                self.eq(bbuf[-7:], b''.join([b async for b in axon.read(bbufhash, len(bbuf) - 7)]))
+
+                rawhash = (await axon.put(b'hehe' * 1000))[1]
+
+            async with await s_axon.Axon.anit(dirn, conf={'compress': 'lzma'}) as axon:
+
+                size, lzmahash = await axon.put(b'haha' * 1000)
+                valu = axon.blobstor.slab.get(lzmahash + (0).to_bytes(8, 'big'), db=axon.blobstor.blobs)
+                self.eq(valu[0], s_axon.CODEC_LZMA)
+
+                self.eq(b'hehe' * 1000, b''.join([b async for b in axon.get(rawhash)]))
+                self.eq(b'haha' * 1000, b''.join([b async for b in axon.get(lzmahash)]))
+                self.eq(b'ahah', b''.join([b async for b in axon.read(lzmahash, 1, 4)]))
+                self.eq(b'ahah', b''.join(axon.blobstor.iterBlob(lzmahash, offset=1, end=5)))
+
+                info = await axon.metrics()
+                self.eq(info.get('size:bytes'), 67108899 + 4 * 131072 + 400000 + 100000 + 8000)
+
+        with self.getTestDir() as dirn:
+            with self.raises(s_exc.BadConfValu):
+                await s_axon.Axon.anit(dirn, conf={'compress': 'newp'})
+
+    async def test_axon_read_chunks(self):
+
+        async with self.getTestAxon() as axon:
+
+            # files saved from other sources may have irregular chunks
+            chunks = (b'a' * 10, b'', b'b' * 3, b'c' * 100, b'd')
+            byts = b''.join(chunks)
+            sha256 = hashlib.sha256(byts).digest()
+
+            self.eq(len(byts), await axon.save(sha256, iter(chunks)))
+
+            for offs in range(len(byts)):
+                for size in (1, 5, 20, 200):
+                    self.eq(byts[offs:offs + size], b''.join([b async for b in axon.read(sha256, offs, size)]))
+
+            # files saved without chunk offsets are still readable
+            blobstor = axon.blobstor
+            for lkey, lval in list(blobstor.slab.scanByPref(sha256, db=blobstor.offsets)):
+                blobstor.slab.delete(lkey, db=blobstor.offsets)
+
+            self.eq(byts[12:20], b''.join([b async for b in axon.read(sha256, 12, 8)]))
+
+    async def test_axon_upload_order(self):
+
+        async with self.getTestAxon() as axon:
+
+            # a large write hashed in a thread is not overtaken by a small write
+            big = b'v' * s_axon.HASH_THREAD_SIZE
+            async with await axon.upload() as fd:
+                await asyncio.gather(fd.write(big), fd.write(abuf), fd.write(pbuf))
+                self.eq((len(big) + 17, hashlib.sha256(big + abuf + pbuf).digest()), await fd.save())
+
     async def test_axon_proxy(self):
         async with self.getTestAxon() as axon:
             async with axon.getLocalProxy() as prox:
@@ -186,7 +356,9 @@ class AxonTest(s_t_utils.SynTest):
             async with await s_telepath.openurl(aurl) as prox:  # type: s_axon.AxonApi
                 # Ensure the user can't do things with bytes they don't have permissions too.
                 await self.agenraises(s_exc.AuthDeny, prox.get(asdfhash))
+                await self.agenraises(s_exc.AuthDeny, prox.read(asdfhash))
                 await self.asyncraises(s_exc.AuthDeny, prox.has(asdfhash))
+                await self.asyncraises(s_exc.AuthDeny, prox.hasmulti((asdfhash,)))
                 await self.agenraises(s_exc.AuthDeny, prox.hashes(0))
                 await self.agenraises(s_exc.AuthDeny, prox.history(0))
                 await self.asyncraises(s_exc.AuthDeny, prox.wants((asdfhash,)))
@@ -281,13 +281,14 @@ class CmdCronTest(s_t_utils.SynTest):
                     self.true(outp.expect('Missing query'))
 
                     await cmdr.runCmdLine("at +5 minutes {[graph:node='*' :type=at1]}")
-                    unixtime += 5 * MINSECS
+                    unixtime += 5 * MINSECS + 1
                     await cmdr.runCmdLine('cron list')
                     await self.agenlen(1, core.eval('graph:node:type=at1'))
 
                     await cmdr.runCmdLine("at +1 day +7 days {[graph:node='*' :type=at2]}")
                     guid = outp.mesgs[-1].strip().rsplit(' ', 1)[-1]
-                    unixtime += DAYSECS
+                    unixtime += DAYSECS + 1
+                    await cmdr.runCmdLine('cron list')
                     await self.agenlen(1, core.eval('graph:node:type=at2'))
                     unixtime += 6 * DAYSECS + 1
                     await cmdr.runCmdLine('cron list')
@@ -2,7 +2,10 @@ import time
 import shutil
 import asyncio
 
+from unittest import mock
+
 import synapse.exc as s_exc
+import synapse.axon as s_axon
 import synapse.common as s_common
 import synapse.cortex as s_cortex
 import synapse.telepath as s_telepath
@@ -1259,6 +1262,76 @@ class CortexBasicTest(s_t_utils.SynTest):
                     self.eq(offs, 3)
                     await self.agenlen(3, core.storm('test:str'))
 
+                    metrics = core.getFeedMetrics().get(iden)
+                    self.eq(metrics['type'], 'com.test.record')
+                    self.eq(metrics['offs'], 3)
+                    self.eq(metrics['lag:count'], 0)
+                    self.eq(metrics['count'], 3)
+                    self.eq(metrics['chunks'], 3)
+                    self.gt(metrics['bytes'], 0)
+                    self.gt(metrics['rate'], 0)
+
+                    async with core.getLocalProxy() as prox:
+                        self.eq(3, (await prox.getFeedMetrics())[iden]['count'])
+
+    async def test_feed_conf_filter(self):
+
+        async with self.getTestCryo() as cryo:
+
+            host, port = await cryo.dmon.listen('tcp://127.0.0.1:0/')
+
+            cryo.insecure = True
+
+            tname = 'tank:blahblah'
+            tank_addr = f'tcp://{host}:{port}/*/{tname}'
+
+            conf = {
+                'feeds': [
+                    {'type': 'com.test.record',
+                     'cryotank': tank_addr,
+                     'filter': [[(), '^=', 'b']],
+                     }
+                ],
+            }
+
+            async with await s_telepath.openurl(tank_addr) as tank:
+                iden = await tank.iden()
+
+            with self.getTestDir() as dirn, mock.patch('synapse.cortex.FEED_WAIT', 0.1):
+
+                async with self.getTestCore(dirn=dirn, conf=conf) as core:
+
+                    waiter = core.waiter(1, 'core:feed:loop')
+
+                    async with await s_telepath.openurl(tank_addr) as tank:
+                        await tank.puts(['a', 'b', 'c', 'bb', 'd'])
+
+                    self.true(await waiter.wait(4))
+
+                    # the offset resumes after the last record scanned by the tank
+                    offs = await core.view.layers[0].getOffset(iden)
+                    self.eq(offs, 5)
+
+                    self.eq(['b', 'bb'], sorted([n.ndef[1] for n in await core.nodes('test:str')]))
+
+                    metrics = core.getFeedMetrics().get(iden)
+                    self.eq(metrics['count'], 2)
+                    self.eq(metrics['offs'], 5)
+                    self.eq(metrics['lag:count'], 0)
+
+                    # records which do not match advance the offset without being ingested
+                    async with await s_telepath.openurl(tank_addr) as tank:
+                        await tank.puts(['x', 'y', 'z'])
+
+                    for i in range(50):
+                        if await core.view.layers[0].getOffset(iden) == 8:
+                            break
+                        await asyncio.sleep(0.1)
+
+                    self.eq(8, await core.view.layers[0].getOffset(iden))
+                    self.eq(8, core.getFeedMetrics().get(iden)['offs'])
+                    self.eq(2, core.getFeedMetrics().get(iden)['count'])
+
     async def test_cortex_coreinfo(self):
 
         async with self.getTestCoreAndProxy() as (core, prox):
@@ -1384,6 +1457,75 @@ class CortexBasicTest(s_t_utils.SynTest):
                 node = await snap.getNodeByNdef(('test:str', 'teehee'))
                 self.eq(node.ndef, ('test:str', 'teehee'))
 
+    async def test_splice_sync_pipeline(self):
+
+        async with self.getTestCore() as core0:
+
+            conf = {
+                'splice:sync': core0.getLocalUrl(),
+            }
+
+            # force several small batches to be in flight at once
+            with mock.patch('synapse.cortex.PUSH_SIZE_MAX', 5):
+
+                async with self.getTestCore(conf=conf) as core1:
+
+                    await core1.nodes('[ test:int=1 test:int=2 test:int=3 test:int=4 test:int=5 ]')
+                    await core1.nodes('test:int | [ :loc=us +#foo ]')
+                    await core1.nodes('test:int=3 | delnode')
+                    await core1.nodes('test:int=4 | [ -#foo ]')
+
+                    iden = core1.getCellIden()
+                    indx = (await core1.view.layers[0].stat())['splicelog_indx']
+
+                    for i in range(100):
+                        if await core0.getFeedOffs(iden) == indx:
+                            break
+                        await asyncio.sleep(0.05)
+
+                    self.eq(indx, await core0.getFeedOffs(iden))
+
+                    # new splices are pushed without waiting for a poll interval
+                    waiter = core1.waiter(1, 'core:splice:sync:sent')
+                    await core1.nodes('[ test:int=6 ]')
+                    self.nn(await waiter.wait(timeout=2))
+
+            self.len(4, await core0.nodes('test:int:loc=us'))
+            self.len(3, await core0.nodes('test:int#foo'))
+            self.len(0, await core0.nodes('test:int=3'))
+            self.len(1, await core0.nodes('test:int=6'))
+
+    async def test_cortex_ordered_feed(self):
+
+        async with self.getTestCoreAndProxy() as (core, prox):
+
+            iden = s_common.guid()
+
+            nodes0 = [(('test:int', 1), {}), (('test:int', 2), {})]
+            nodes1 = [(('test:int', 3), {}), (('test:int', 4), {})]
+
+            # a later chunk waits for the earlier one
+            task = core.schedCoro(prox.addOrderedFeedData('syn.nodes', nodes1, (iden, 2)))
+
+            await asyncio.sleep(0.1)
+            self.false(task.done())
+            self.len(0, await core.nodes('test:int'))
+
+            self.eq(2, await prox.addOrderedFeedData('syn.nodes', nodes0, (iden, 0)))
+            self.eq(4, await asyncio.wait_for(task, timeout=2))
+            self.len(4, await core.nodes('test:int'))
+
+            # chunks which have already been added are skipped
+            self.eq(4, await prox.addOrderedFeedData('syn.nodes', nodes0, (iden, 0)))
+
+            nodes2 = nodes1 + [(('test:int', 5), {})]
+            self.eq(5, await prox.addOrderedFeedData('syn.nodes', nodes2, (iden, 2)))
+            self.eq(5, await core.getFeedOffs(iden))
+            self.len(5, await core.nodes('test:int'))
+
+            with mock.patch('synapse.cortex.FEED_WAIT', 0.1):
+                await self.asyncraises(s_exc.TimeOut, prox.addOrderedFeedData('syn.nodes', nodes0, (iden, 10)))
+
     async def test_onadd(self):
         arg_hit = {}
 
@@ -2295,6 +2437,132 @@ class CortexBasicTest(s_t_utils.SynTest):
 
             self.nn(await core.getNodeByNdef(('test:str', 'foo')))
 
+    async def test_cortex_storm_querycache(self):
+
+        async with self.getTestCore() as core:
+
+            text = '[ test:str=foo ]'
+            query = core.getStormQuery(text)
+            self.true(query is core.getStormQuery(text))
+            self.true(query is core.querycache.get(text))
+
+            await self.agenraises(s_exc.BadSyntax, core.eval('| | newp'))
+            self.none(core.querycache.get('| | newp'))
+
+            nodes = await alist(core.evalStormQuery(query))
+            self.len(1, nodes)
+            self.eq(nodes[0].ndef, ('test:str', 'foo'))
+
+            # triggers keep their parsed query
+            rootiden = core.auth.getUserByName('root').iden
+            iden = core.triggers.add(rootiden, 'node:add', '[ test:int=1 ]', info={'form': 'test:str'})
+            rule = core.triggers._rules.get(iden)
+            self.true(rule.query is core.getStormQuery('[ test:int=1 ]'))
+
+            core.querycache.clear()
+            await self.agenlen(1, core.eval('[ test:str=bar ]'))
+            await self.agenlen(1, core.eval('test:int=1'))
+            self.none(core.querycache.get('[ test:int=1 ]'))
+
+            core.triggers.mod(iden, '[ test:int=2 ]')
+            self.eq(rule.query.text, '[ test:int=2 ]')
+
+    async def test_cortex_storm_budget(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ test:int=1 test:int=2 test:int=3 test:int=4 ]')
+
+            self.none(core.getStormBudget(None))
+
+            await core.setStormBudget({'nodes': 2})
+
+            msgs = await alist(core.streamstorm('test:int'))
+            errs = [m[1] for m in msgs if m[0] == 'err']
+            self.len(1, errs)
+            self.eq(errs[0][0], 'StormBudgetExceeded')
+            self.eq(errs[0][1].get('name'), 'nodes')
+            self.len(2, [m for m in msgs if m[0] == 'node'])
+
+            await self.agenraises(s_exc.StormBudgetExceeded, core.eval('test:int'))
+
+            # per-user budgets override the global defaults
+            visi = await core.auth.addUser('visi')
+            await visi.setAdmin(True)
+            await core.setStormBudget({'nodes': 10, 'rows': 2}, user=visi.iden)
+
+            self.len(1, await core.nodes('test:int=1', user=visi))
+            await self.agenraises(s_exc.StormBudgetExceeded, core.eval('test:int', user=visi))
+
+            budget = core.getStormBudget(visi)
+            self.eq(budget.nodes, 10)
+            self.eq(budget.rows, 2)
+
+            # sub-queries count toward the same budget
+            await core.setStormBudget({'nodes': 100, 'rows': 8})
+            self.len(4, await core.nodes('test:int'))
+            await self.agenraises(s_exc.StormBudgetExceeded, core.eval('test:int | tee { test:int }'))
+
+            await core.setStormBudget({'time': 10})
+            await self.agenraises(s_exc.StormBudgetExceeded, core.eval('test:int | sleep 0.1'))
+
+            # queries which yield no nodes are limited by the rows they lift
+            tick = time.time()
+            await self.agenraises(s_exc.StormBudgetExceeded, core.eval('test:int | sleep 0.05 | spin'))
+            self.lt(time.time() - tick, 0.15)
+
+            await core.setStormBudget(None)
+            await core.setStormBudget(None, user=visi.iden)
+            self.eq({}, core.getStormBudgets())
+            self.len(4, await core.nodes('test:int | sleep 0.01'))
+
+            with self.raises(s_exc.BadArg):
+                await core.setStormBudget({'newp': 10})
+
+            with self.raises(s_exc.BadArg):
+                await core.setStormBudget({'nodes': 0})
+
+            with self.raises(s_exc.BadArg):
+                await core.setStormBudget({'user:queries': 1}, user=visi.iden)
+
+            with self.raises(s_exc.NoSuchUser):
+                await core.setStormBudget({'nodes': 1}, user='newp')
+
+            # admission control
+            await core.setStormBudget({'queries': 1})
+
+            evnt = asyncio.Event()
+
+            async def slowquery():
+                async for node in core.eval('test:int=1'):
+                    await evnt.wait()
+
+            task = core.schedCoro(slowquery())
+            await asyncio.sleep(0.01)
+
+            fast = core.schedCoro(core.nodes('test:int=2'))
+            await asyncio.sleep(0.01)
+            self.false(fast.done())
+            self.len(1, core.boss.admitwait['storm'])
+
+            evnt.set()
+            await asyncio.wait_for(task, timeout=2)
+            self.len(1, await asyncio.wait_for(fast, timeout=2))
+
+            self.len(0, core.boss.admitted['storm'])
+
+        with self.getTestDir() as dirn:
+
+            async with await s_cortex.Cortex.anit(dirn) as core:
+                await core.setStormBudget({'nodes': 1, 'user:queries': 2})
+
+            async with await s_cortex.Cortex.anit(dirn) as core:
+                self.eq(core.getStormBudgets(), {'global': {'nodes': 1, 'user:queries': 2}})
+
+                async with core.getLocalProxy() as prox:
+                    await prox.setStormBudget(None)
+                    self.eq({}, await prox.getStormBudgets())
+
     async def test_cortex_storm_vars(self):
 
         async with self.getTestCore() as core:
@@ -2451,6 +2719,12 @@ class CortexBasicTest(s_t_utils.SynTest):
             self.eq(counts.get('test:str'), 1)
             self.eq(counts, core_counts)
 
+            startup = nstat.get('startup')
+            self.gt(startup.get('took'), 0)
+            for name in ('cell', 'hive', 'model', 'layers', 'views', 'agenda', 'modules'):
+                self.ge(startup['phases'].get(name), 0)
+            self.le(sum(startup['phases'].values()), startup.get('took'))
+
     async def test_offset(self):
         async with self.getTestCoreAndProxy() as (realcore, core):
             iden = s_common.guid()
@@ -3221,6 +3495,97 @@ class CortexBasicTest(s_t_utils.SynTest):
                     await evnt.wait()
                     self.len(1, (await core01.nodes('inet:ipv4=7.7.7.7')))
 
+    async def test_cortex_mirror_stors(self):
+
+        conf = {'layer:lmdb:storlog': True}
+
+        async def waitsync(core00, core01):
+            layr00 = core00.getLayer()
+            layr01 = core01.getLayer()
+            for i in range(100):
+                if layr00.storlog.index() == layr01.storlog.index():
+                    return
+                await asyncio.sleep(0.05)
+            raise Exception('mirror did not catch up')
+
+        with self.getTestDir() as dirn:
+
+            path00 = s_common.gendir(dirn, 'core00')
+            path01 = s_common.gendir(dirn, 'core01')
+
+            async with self.getTestCore(dirn=path00, conf=conf) as core00:
+                await core00.nodes('[ inet:ipv4=1.2.3.4 ]')
+                self.isin('storlog_indx', await core00.getLayer().stat())
+
+            s_tools_backup.backup(path00, path01)
+
+            async with self.getTestCore(dirn=path00, conf=conf) as core00:
+
+                await core00.addTagProp('score', ('int', {}), {})
+                await core00.nodes('[ inet:ipv4=5.5.5.5 +#foo:score=10 ]')
+
+                url = core00.getLocalUrl()
+
+                async with self.getTestCore(dirn=path01, conf=conf) as core01:
+
+                    await core01.addTagProp('score', ('int', {}), {})
+                    await core01.initCoreMirror(url)
+
+                    await core00.nodes('[ inet:fqdn=vertex.link :issuffix=1 ]')
+                    await core00.nodes('inet:ipv4=1.2.3.4 | delnode')
+
+                    await waitsync(core00, core01)
+
+                    self.len(1, await core01.nodes('inet:fqdn=vertex.link +:issuffix=1'))
+                    self.len(1, await core01.nodes('inet:ipv4=5.5.5.5 +#foo:score=10'))
+                    self.len(0, await core01.nodes('inet:ipv4=1.2.3.4'))
+
+                    self.eq(core00.counts, core01.counts)
+
+                    # splices are logged on the mirror as well
+                    stat00 = await core00.getLayer().stat()
+                    stat01 = await core01.getLayer().stat()
+                    self.eq(stat00['splicelog_indx'], stat01['splicelog_indx'])
+
+                await core00.nodes('[ inet:ipv4=6.6.6.6 ]')
+
+                # come back up and resume from the local storage operation log
+                async with self.getTestCore(dirn=path01, conf=conf) as core01:
+                    await core01.initCoreMirror(url)
+                    await waitsync(core00, core01)
+                    self.len(1, await core01.nodes('inet:ipv4=6.6.6.6'))
+
+                    async with core00.getLocalProxy() as prox:
+                        self.true(await prox.hasLayerStorLog(core00.getLayer().iden))
+
+            # a mirror whose splice log does not line up with the upstream is refused
+            path02 = s_common.gendir(dirn, 'core02')
+            s_tools_backup.backup(path00, path02)
+
+            async with self.getTestCore(dirn=path02) as core02:
+                self.none(core02.getLayer().storlog)
+                await core02.nodes('[ inet:ipv4=7.7.7.7 ]')
+
+            async with self.getTestCore(dirn=path00, conf=conf) as core00:
+
+                url = core00.getLocalUrl()
+                await core00.nodes('[ inet:ipv4=8.8.8.8 ]')
+
+                async with self.getTestCore(dirn=path02, conf=conf) as core02:
+
+                    with self.getAsyncLoggerStream('synapse.cortex', 'mirror refused') as stream:
+                        await core02.initCoreMirror(url)
+                        self.true(await stream.wait(10))
+
+                    self.len(0, await core02.nodes('inet:ipv4=8.8.8.8'))
+
+        # layers without a storage operation log may not be synced physically
+        async with self.getTestCore() as core:
+            self.false(core.hasLayerStorLog(core.getLayer().iden))
+            with self.raises(s_exc.BadConfValu):
+                async for item in core.syncLayerStors(core.getLayer().iden, 0):
+                    pass
+
     async def test_norms(self):
         async with self.getTestCoreAndProxy() as (core, prox):
             # getPropNorm base tests
@@ -3471,12 +3836,32 @@ class CortexBasicTest(s_t_utils.SynTest):
         async with self.getTestCore() as core:
             # By default, a cortex has a local Axon instance available
             await core.axready.wait()
+            self.eq(core.axon, await core.getAxon())
             size, sha2 = await core.axon.put(b'asdfasdf')
             self.eq(size, 8)
             self.eq(s_common.ehex(sha2), '2413fb3709b05939f04cf2e92f7d0897fc2596f9ad0b8a9ea855c7bfebaae892')
         self.true(core.axon.isfini)
         self.false(core.axready.is_set())
 
+        # a local axon which is still being opened at fini is shut down once it is ready
+        axons = []
+        anit = s_axon.Axon.anit
+        opening = asyncio.Event()
+
+        async def slowanit(*args, **kwargs):
+            opening.set()
+            await asyncio.sleep(0.2)
+            axons.append(await anit(*args, **kwargs))
+            return axons[-1]
+
+        with mock.patch.object(s_axon.Axon, 'anit', slowanit):
+            async with self.getTestCore() as core:
+                await opening.wait()
+                self.false(core.axready.is_set())
+
+        self.len(1, axons)
+        self.true(axons[0].isfini)
+
         with self.getTestDir() as dirn:
 
             async with self.getTestAxon(dirn=dirn) as axon:
@@ -1,7 +1,15 @@
 
+import os
+import asyncio
+import unittest.mock as mock
+
+import synapse.exc as s_exc
 import synapse.common as s_common
 import synapse.cryotank as s_cryotank
 
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.lmdbslab as s_lmdbslab
+import synapse.lib.slabseqn as s_slabseqn
 
 import synapse.tests.utils as s_t_utils
 from synapse.tests.utils import alist
@@ -88,3 +96,311 @@ class CryoTest(s_t_utils.SynTest):
                 self.len(2, await alist(prox.slice(0, 9999)))
 
                 self.len(1, await alist(prox.metrics(0)))
+
+    async def test_cryo_slice_filter(self):
+
+        recs = (
+            (('inet:fqdn', 'vertex.link'), {'props': {'zone': 'vertex.link', 'host': 'vertex'}}),
+            (('inet:ipv4', 0x01020304), {'props': {'asn': 10}}),
+            (('inet:fqdn', 'woot.com'), {'props': {'zone': 'woot.com', 'host': 'woot'}}),
+            'hehe',
+            {'type': 'haha', 'valu': 20},
+        )
+
+        async with self.getTestCryoAndProxy() as (cryo, prox):
+
+            await prox.puts('foo', recs)
+
+            filt = (((0, 0), '=', 'inet:fqdn'),)
+            items = await alist(prox.slice('foo', 0, filt=filt))
+            self.eq([0, 2], [i[0] for i in items])
+            self.eq(recs[2], items[1][1])
+
+            # size limits the number of matching items
+            items = await alist(prox.slice('foo', 0, 1, filt=filt))
+            self.eq([0], [i[0] for i in items])
+
+            filt = (((0, 0), '=', 'inet:fqdn'), ((1, 'props', 'zone'), '^=', 'woot'))
+            items = await alist(prox.slice('foo', 0, filt=filt))
+            self.eq([2], [i[0] for i in items])
+
+            filt = (((1, 'props', 'asn'), 'in', (10, 20)),)
+            self.eq([1], [i[0] for i in await alist(prox.slice('foo', 0, filt=filt))])
+
+            filt = (((0,), '^=', ('inet:fqdn',)),)
+            self.eq([0, 2], [i[0] for i in await alist(prox.slice('foo', 0, filt=filt))])
+
+            filt = (((), 'type', 'str'),)
+            self.eq([(3, 'hehe')], await alist(prox.slice('foo', 0, filt=filt)))
+
+            filt = (('type', '=', 'haha'),)
+            self.eq([(4, {'type': 'haha', 'valu': 20})], await alist(prox.slice('foo', 0, filt=filt)))
+
+            filt = (('type', '!=', 'haha'),)
+            self.eq([], await alist(prox.slice('foo', 0, filt=filt)))
+
+            # projection yields a tuple of values ( None for missing )
+            filt = (((0, 0), '=', 'inet:fqdn'),)
+            proj = ((0, 1), (1, 'props', 'host'), (1, 'newp'))
+            items = await alist(prox.slice('foo', 1, filt=filt, proj=proj))
+            self.eq([(2, ('woot.com', 'woot', None))], items)
+
+            items = await alist(prox.slice('foo', 3, proj=('type',)))
+            self.eq([(3, (None,)), (4, ('haha',))], items)
+
+            # the direct tank share supports filters
+            async with cryo.getLocalProxy(share='cryotank/foo') as tank:
+                items = await alist(tank.slice(0, filt=(((), 'type', 'dict'),), proj=('valu',)))
+                self.eq([(4, (20,))], items)
+
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, filt=(('type', 'newp', 10),)))
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, filt=(('type', '='),)))
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, filt=(((), 'type', 'newp'),)))
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, filt=(((), '^=', 10),)))
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, filt=(((), 'in', 10),)))
+            await self.agenraises(s_exc.BadArg, prox.slice('foo', 0, proj=({'newp': 1},)))
+
+    async def test_cryo_tank_rows(self):
+
+        async with self.getTestCryo() as cryo:
+
+            async with cryo.getLocalProxy(share='cryotank/foo') as prox:
+
+                self.none(await prox.last())
+
+                await prox.puts(cryodata)
+
+                rows = await alist(prox.rows(0))
+                self.eq([(0, s_msgpack.en(cryodata[0])), (1, s_msgpack.en(cryodata[1]))], rows)
+
+                iden = s_common.guid()
+                self.len(1, await alist(prox.rows(1, 10, iden=iden)))
+                self.eq(1, await prox.offset(iden))
+
+                self.eq((1, cryodata[1]), await prox.last())
+
+    async def test_cryo_tank_segments(self):
+
+        with self.getTestDir() as dirn:
+
+            conf = {'segment:size': 3, 'retention:segments': 3}
+
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                self.eq(0, tank.index())
+                self.none(tank.last())
+
+                self.eq(5, await tank.puts(range(5)))
+                self.eq(5, await tank.puts(range(5, 10)))
+
+                # 0-2 was removed when the segment at 9 was added
+                info = await tank.info()
+                self.eq(10, info['indx'])
+                self.eq(7, info['stat']['entries'])
+                self.eq([(3, 3), (6, 3), (9, 1)], [s[:2] for s in info['segs']])
+
+                self.false(os.path.isdir(tank._getSegPath(0)))
+                self.true(os.path.isdir(tank._getSegPath(3)))
+
+                # the metrics for the removed segment are removed with it
+                metrics = await alist(tank.metrics(0))
+                self.eq([1, 2, 3, 4], [m[0] for m in metrics])
+                self.eq([5, 6, 9, 10], [m[1]['indx'] for m in metrics])
+
+                items = await alist(tank.slice(0))
+                self.eq(list(range(3, 10)), [i[0] for i in items])
+                self.eq(list(range(3, 10)), [i[1] for i in items])
+
+                self.eq([(4, 4), (5, 5)], await alist(tank.slice(4, 2)))
+                self.eq([(9, 9)], await alist(tank.slice(9)))
+                self.eq([], await alist(tank.slice(10)))
+
+                rows = await alist(tank.rows(5, 3))
+                self.eq([(5, s_msgpack.en(5)), (6, s_msgpack.en(6)), (7, s_msgpack.en(7))], rows)
+
+                self.eq((9, 9), tank.last())
+
+                # segments added while slicing are followed
+                genr = tank.slice(8)
+                self.eq((8, 8), await genr.__anext__())
+                await tank.puts((10, 11, 12))
+                self.eq([9, 10, 11, 12], [i[0] async for i in genr])
+
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                self.eq(13, tank.index())
+                self.eq([6, 9, 12], [s.start for s in tank.segs])
+                self.eq(list(range(6, 13)), [i[1] for i in await alist(tank.slice(0))])
+
+                await tank.puts((13,))
+                self.eq(14, tank.index())
+
+            # lowering the retention drops segments when the tank is opened
+            async with await s_cryotank.CryoTank.anit(dirn, conf={'segment:size': 3, 'retention:segments': 1}) as tank:
+                self.eq([12], [s.start for s in tank.segs])
+                self.eq([(12, 12), (13, 13)], await alist(tank.slice(0)))
+
+                self.eq([6, 7], [m[0] for m in await alist(tank.metrics(0))])
+                self.eq(8, tank._metrics.index())
+
+    async def test_cryo_tank_segments_readers(self):
+
+        with self.getTestDir() as dirn:
+
+            conf = {'segment:size': 10, 'retention:segments': 2}
+
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                await tank.puts(range(20))
+
+                # segments removed while they are being read are deleted when the reader is done
+                genr = tank.slice(0)
+                self.eq([(0, 0), (1, 1), (2, 2)], [await genr.__anext__() for i in range(3)])
+
+                await tank.puts(range(20, 35))
+                self.eq([20, 30], [s.start for s in tank.segs])
+                self.true(os.path.isdir(tank._getSegPath(0)))
+                self.false(os.path.isdir(tank._getSegPath(10)))
+
+                items = [i[0] async for i in genr]
+                self.eq(list(range(3, 10)) + list(range(20, 35)), items)
+
+                for i in range(20):
+                    if not os.path.isdir(tank._getSegPath(0)):
+                        break
+                    await asyncio.sleep(0.1)
+                self.false(os.path.isdir(tank._getSegPath(0)))
+                self.len(0, tank.oldsegs)
+
+                # segments still being read when the tank is fini'd are deleted
+                genr = tank.slice(20)
+                self.eq((20, 20), await genr.__anext__())
+                await tank.puts(range(35, 45))
+                self.eq([30, 40], [s.start for s in tank.segs])
+                self.true(os.path.isdir(tank._getSegPath(20)))
+
+            self.false(os.path.isdir(tank._getSegPath(20)))
+
+    async def test_cryo_tank_segments_time(self):
+
+        with self.getTestDir() as dirn:
+
+            conf = {'segment:time': 1000, 'retention:time': 5000}
+
+            tick = s_common.now()
+            with mock.patch('synapse.common.now', return_value=tick):
+
+                async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                    await tank.puts((0, 1))
+
+                    with mock.patch('synapse.common.now', return_value=tick + 2000):
+                        await tank.puts((2, 3))
+
+                    with mock.patch('synapse.common.now', return_value=tick + 3000):
+                        await tank.puts((4,))
+
+                    self.eq([0, 2, 4], [s.start for s in tank.segs])
+
+                    # the first segment was closed at +2000
+                    with mock.patch('synapse.common.now', return_value=tick + 7500):
+                        await tank.puts((5,))
+
+                    self.eq([2, 4, 5], [s.start for s in tank.segs])
+                    self.eq([2, 3, 4, 5], [i[1] for i in await alist(tank.slice(0))])
+
+    async def test_cryo_tank_segments_legacy(self):
+
+        with self.getTestDir() as dirn:
+
+            # create a tank which stores items in tank.lmdb
+            path = s_common.gendir(dirn, 'tank.lmdb')
+            async with await s_lmdbslab.Slab.anit(path) as slab:
+                s_slabseqn.SlabSeqn(slab, 'items').save(cryodata)
+
+            conf = {'segment:size': 2, 'retention:segments': 2}
+            async with await s_cryotank.CryoTank.anit(dirn, conf=conf) as tank:
+
+                self.eq([0], [s.start for s in tank.segs])
+                self.none(tank.segs[0].path)
+                self.eq(cryodata, [i[1] for i in await alist(tank.slice(0))])
+
+                await tank.puts(cryodata)
+                self.eq([0, 2], [s.start for s in tank.segs])
+                self.eq(cryodata + cryodata, [i[1] for i in await alist(tank.slice(0))])
+
+                await tank.puts(cryodata)
+                self.eq([2, 4], [s.start for s in tank.segs])
+                self.false(tank.slab.dbexists('items'))
+                self.eq([2, 3, 4, 5], [i[0] for i in await alist(tank.slice(0))])
+
+    async def test_cryo_tank_wait(self):
+
+        async with self.getTestCryoAndProxy() as (cryo, prox):
+
+            await prox.init('foo')
+            tank = await cryo.init('foo')
+
+            # nothing arrives before the timeout
+            self.eq([], await alist(prox.waitSlice('foo', 0, timeout=0.01)))
+            self.eq([], await alist(prox.waitRows('foo', 0, timeout=0.01)))
+            self.false(await tank.waitItems(0, timeout=0.01))
+
+            async def puts():
+                await asyncio.sleep(0.05)
+                await prox.puts('foo', cryodata)
+
+            task = cryo.schedCoro(puts())
+            items = await alist(prox.waitSlice('foo', 0, timeout=5))
+            self.eq(cryodata, [i[1] for i in items])
+            await task
+
+            self.true(await tank.waitItems(1, timeout=0.01))
+
+            task = cryo.schedCoro(puts())
+            rows = await alist(prox.waitRows('foo', 2, 10, timeout=5))
+            self.eq([2, 3], [r[0] for r in rows])
+            self.eq(s_msgpack.en(cryodata[0]), rows[0][1])
+            await task
+
+            # a filtered wait ignores new items which do not match
+            filt = (((0,), '=', 'baz'),)
+            async with cryo.getLocalProxy(share='cryotank/foo') as tprox:
+
+                async def putsfilt():
+                    await asyncio.sleep(0.05)
+                    await tank.puts((('hehe', {}),))
+                    await asyncio.sleep(0.05)
+                    await tank.puts(cryodata)
+
+                task = cryo.schedCoro(putsfilt())
+                items = await alist(tprox.waitSlice(4, timeout=5, filt=filt))
+                self.eq([(6, cryodata[1])], items)
+                await task
+
+                self.eq([], await alist(tprox.waitSlice(7, timeout=0.01, filt=filt)))
+
+                # the scanned offset lets a filtered consumer resume past the items which did not match
+                self.eq([(7, None)], await alist(tprox.waitSlice(7, timeout=0.01, filt=filt, scanned=True)))
+                self.eq([(1, cryodata[1]), (2, None)], await alist(tprox.waitSlice(0, 1, filt=filt, scanned=True)))
+
+                newp = (((0,), '=', 'newp'),)
+                self.eq([(7, None)], await alist(tprox.waitSlice(4, timeout=0.01, filt=newp, scanned=True)))
+
+                # follow yields existing items and then new ones as they are added
+                iden = s_common.guid()
+                genr = tprox.follow(5, iden=iden, filt=filt).__aiter__()
+                self.eq((6, cryodata[1]), await genr.__anext__())
+
+                task = cryo.schedCoro(puts())
+                self.eq((8, cryodata[1]), await genr.__anext__())
+                await task
+
+                self.eq(9, await tprox.offset(iden))
+                await genr.aclose()
+
+            # fini wakes up waiters
+            task = cryo.schedCoro(tank.waitItems(100))
+            await asyncio.sleep(0)
+            await tank.fini()
+            self.false(await task)
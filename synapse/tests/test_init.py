@@ -1,8 +1,47 @@
 
+import os
+import sys
+import json
+import subprocess
+
+import synapse
+
 import synapse.tests.utils as s_t_utils
 
+# the maximum number of seconds to import a module in a new process
+# ( about twice the slowest median from scripts/benchmark_import_time.py )
+IMPORT_BUDGET = 2.0
+
+# modules which should only be imported on first use
+lazymods = (
+    'aiohttp',
+    'synapse.lib.scrape',
+    'synapse.lib.stormhttp',
+    'synapse.lookup.phonenum',
+)
+
+importcode = '''
+import sys
+import json
+import time
+tick = time.perf_counter()
+import %s
+print(json.dumps([time.perf_counter() - tick, [n for n in %r if n in sys.modules]]))
+'''
+
 class InitTest(s_t_utils.SynTest):
-    pass
+
+    def test_init_import_budget(self):
+
+        dirn = os.path.dirname(os.path.dirname(synapse.__file__))
+
+        for name in ('synapse.cortex', 'synapse.tools.cmdr', 'synapse.tools.feed', 'synapse.tools.backup'):
+
+            outp = subprocess.check_output([sys.executable, '-c', importcode % (name, lazymods)], cwd=dirn)
+            took, loaded = json.loads(outp)
+
+            self.eq((), loaded)
+            self.lt(took, IMPORT_BUDGET)
 
     '''
     def test_init_modules(self):
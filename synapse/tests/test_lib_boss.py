@@ -34,3 +34,41 @@ class BossTest(s_test.SynTest):
             await synt0.kill()
 
             self.len(1, boss.ps())
+
+    async def test_boss_admit(self):
+
+        async with await s_boss.Boss.anit() as boss:
+
+            evnt = asyncio.Event()
+            order = []
+
+            async def query(name, user, maxtasks=None, maxuser=None):
+                synt = await boss.promote('query', user)
+                async with boss.admit(synt, maxtasks=maxtasks, maxuser=maxuser):
+                    order.append(name)
+                    # nested admission for the same task does not wait
+                    async with boss.admit(synt, maxtasks=maxtasks, maxuser=maxuser):
+                        await evnt.wait()
+
+            t0 = boss.schedCoro(query('a0', 'visi', maxtasks=2, maxuser=1))
+            t1 = boss.schedCoro(query('a1', 'visi', maxtasks=2, maxuser=1))
+            t2 = boss.schedCoro(query('b0', 'hehe', maxtasks=2, maxuser=1))
+            t3 = boss.schedCoro(query('c0', 'haha', maxtasks=2, maxuser=1))
+
+            await asyncio.sleep(0.01)
+
+            # a1 is held by the per-user limit but does not block b0
+            self.eq(order, ['a0', 'b0'])
+            self.len(2, boss.admitwait['query'])
+
+            # a cancelled waiter gives up its place
+            t3.cancel()
+            await asyncio.sleep(0.01)
+            self.len(1, boss.admitwait['query'])
+
+            evnt.set()
+            await asyncio.wait_for(asyncio.gather(t0, t1, t2), timeout=2)
+
+            self.eq(order, ['a0', 'b0', 'a1'])
+            self.len(0, boss.admitted['query'])
+            self.len(0, boss.admitwait['query'])
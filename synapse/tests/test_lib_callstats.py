@@ -0,0 +1,61 @@
+import synapse.lib.callstats as s_callstats
+
+import synapse.tests.utils as s_t_utils
+
+class CallStatsTest(s_t_utils.SynTest):
+
+    def test_callstats_histogram(self):
+
+        hist = s_callstats.Histogram()
+        self.none(hist.percentile(0.5))
+        self.none(hist.pack()['mean'])
+
+        for i in range(99):
+            hist.add(0.001)
+
+        hist.add(1.0)
+
+        self.eq(100, hist.count)
+        self.eq(1.0, hist.max)
+
+        # percentiles are accurate to within a factor of two
+        p50 = hist.percentile(0.5)
+        self.true(0.001 <= p50 < 0.002)
+        self.true(0.001 <= hist.percentile(0.99) < 0.002)
+        self.eq(1.0, hist.percentile(1.0))
+
+        info = hist.pack()
+        self.eq(100, info['count'])
+        self.eq(p50, info['p50'])
+        self.eq(1.0, info['p999'])
+        self.isin('mean', info)
+
+        # values beyond the last bucket are reported as the max
+        hist = s_callstats.Histogram(size=4)
+        hist.add(10000)
+        self.eq(10000, hist.percentile(0.5))
+
+    def test_callstats_meths(self):
+
+        stats = s_callstats.CallStats(hists=('took', 'wait'))
+
+        stats.add('foo', 0.01, rxsize=10, txsize=100, wait=0.001)
+        stats.add('foo', 0.02, rxsize=10, txsize=100, err=True, wait=0.001)
+        stats.add('bar', 0.5, wait=0.2)
+
+        info = stats.pack()
+
+        self.eq(2, info['foo']['count'])
+        self.eq(1, info['foo']['errs'])
+        self.eq(20, info['foo']['rxsize'])
+        self.eq(200, info['foo']['txsize'])
+        self.eq(2, info['foo']['took']['count'])
+        self.eq(0.02, info['foo']['took']['max'])
+        self.eq(2, info['foo']['wait']['count'])
+
+        self.eq(1, info['bar']['count'])
+        self.eq(0, info['bar']['errs'])
+        self.eq(0.2, info['bar']['wait']['max'])
+
+        stats.clear()
+        self.eq({}, stats.pack())
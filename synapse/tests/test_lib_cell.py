@@ -7,6 +7,7 @@ import synapse.telepath as s_telepath
 import synapse.lib.cell as s_cell
 
 import synapse.tests.utils as s_t_utils
+from synapse.tests.utils import alist
 
 class EchoAuthApi(s_cell.CellApi):
 
@@ -180,6 +181,49 @@ class CellTest(s_t_utils.SynTest):
             async with await s_telepath.openurl(url) as prox:
                 self.eq(iden, await prox.getCellIden())
 
+    async def test_cell_callstats(self):
+
+        async with self.getTestCore() as core:
+
+            async with core.getLocalProxy() as prox:
+
+                await prox.getCellIden()
+                await prox.getCellIden()
+
+                self.len(2, await alist(prox.eval('[ test:str=foo test:str=bar ]')))
+
+                with self.raises(s_exc.NoSuchForm):
+                    await prox.addNode('newp:newp', 'newp')
+
+                with self.raises(s_exc.NoSuchMeth):
+                    await prox.newpMethod()
+
+                # client side stats from the proxy
+                stats = prox._getCallStats()
+
+                self.eq(2, stats['getCellIden']['count'])
+                self.eq(0, stats['getCellIden']['errs'])
+                self.gt(stats['getCellIden']['rxsize'], 0)
+                self.gt(stats['getCellIden']['txsize'], 0)
+                self.nn(stats['getCellIden']['took']['p50'])
+
+                self.eq(1, stats['eval']['count'])
+                self.eq(1, stats['addNode']['errs'])
+
+                # server side stats from the cell daemon
+                stats = await prox.getCallStats()
+
+                self.eq(2, stats['getCellIden']['count'])
+                self.gt(stats['getCellIden']['rxsize'], 0)
+                self.gt(stats['getCellIden']['txsize'], 0)
+                self.nn(stats['getCellIden']['wait']['p99'])
+
+                self.eq(1, stats['eval']['count'])
+                self.eq(1, stats['addNode']['errs'])
+
+                # the daemon does not record stats for methods which do not exist
+                self.notin('newpMethod', stats)
+
     async def test_cell_nonstandard_admin(self):
         boot = {
             'auth:admin': 'pennywise:cottoncandy',
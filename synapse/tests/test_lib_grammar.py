@@ -1,3 +1,4 @@
+import json
 import unittest
 
 import lark  # type: ignore
@@ -1011,6 +1012,40 @@ class GrammarTest(s_t_utils.SynTest):
 
             self.eq(str(tree), _ParseResults[i])
 
+    def test_parser_cache(self):
+
+        with s_datfile.openDatFile('synapse.lib/storm.lark') as larkf:
+            grammar = larkf.read().decode()
+
+        cache = {}
+        opts = {'start': 'query', 'propagate_positions': True}
+
+        built = s_grammar.getLarkParser(grammar, cache, **opts)
+        self.len(1, cache)
+
+        # the second request is constructed from the cached analysis
+        loaded = s_grammar.getLarkParser(grammar, cache, **opts)
+        self.eq(loaded.source, '<cached>')
+
+        for query in _Queries[::20]:
+            self.eq(str(built.parse(query)), str(loaded.parse(query)))
+
+        # cache entries survive a json round trip
+        cache = json.loads(json.dumps(cache))
+        loaded = s_grammar.getLarkParser(grammar, cache, **opts)
+        self.eq(loaded.source, '<cached>')
+        self.eq(str(built.parse(_Queries[0])), str(loaded.parse(_Queries[0])))
+
+        # a corrupt entry is rebuilt
+        key = list(cache.keys())[0]
+        cache[key] = {'newp': 'newp'}
+        with self.getLoggerStream('synapse.lib.grammar', 'Rebuilding storm parser') as stream:
+            rebuilt = s_grammar.getLarkParser(grammar, cache, **opts)
+            self.true(stream.wait(1))
+
+        self.ne(rebuilt.source, '<cached>')
+        self.isin('rules', cache[key])
+
     def test_stormcmdargs(self):
         q = '''add {inet:fqdn | graph 2 --filter { -#nope } } inet:f-M +1 { [ graph:node='*' :type=m1]}'''
         correct = (
@@ -218,6 +218,80 @@ class HiveTest(s_test.SynTest):
 
             self.eq(names, ('bar', 'baz', 'faz'))
 
+    async def test_hive_lazy(self):
+
+        with self.getTestDir() as dirn:
+
+            async with self.getTestHiveFromDirn(dirn) as hive:
+                await hive.set(('foo', 'bar', 'baz'), 10)
+                await hive.set(('foo', 'bar', 'faz'), 20)
+                await hive.set(('foo', 'bar', 'faz', 'deep'), 30)
+                await hive.set(('foo', 'bara'), 'hehe')
+                await hive.set(('hehe', 'haha'), 'hoho')
+
+            async with self.getTestHiveFromDirn(dirn) as hive:
+
+                # nothing but the root is loaded at startup
+                self.len(1, hive.nodes)
+
+                self.eq(10, await hive.get(('foo', 'bar', 'baz')))
+                self.eq(30, await hive.get(('foo', 'bar', 'faz', 'deep')))
+                self.none(await hive.get(('foo', 'bar')))
+                self.len(1, hive.nodes)
+
+                self.none(hive.dir(('newp',)))
+                self.eq([('foo', None, 2), ('hehe', None, 1)], hive.dir(()))
+                self.eq([('baz', 10, 0), ('faz', 20, 1)], hive.dir(('foo', 'bar')))
+
+                edits = []
+                async def onedit(mesg):
+                    edits.append(mesg)
+
+                hive.onedit(('foo', 'bar', 'faz'), onedit)
+
+                node = await hive.open(('foo', 'bar'))
+                self.eq(('baz', 'faz'), tuple(sorted(n for (n, k) in node)))
+                self.eq(20, node.get('faz').valu)
+
+                # opened nodes and their kids are loaded ( but not the rest of the tree )
+                self.nn(hive.nodes.get(('foo', 'bar', 'faz')))
+                self.none(hive.nodes.get(('foo', 'bar', 'faz', 'deep')))
+                self.none(hive.nodes.get(('hehe', 'haha')))
+
+                # kids without kids of their own are complete
+                self.eq([], list(node.get('baz')))
+
+                # kids with kids of their own must be opened rather than returning partial results
+                faz = node.get('faz')
+                self.raises(s_exc.NotReady, faz.get, 'deep')
+                self.raises(s_exc.NotReady, faz.dir)
+                with self.raises(s_exc.NotReady):
+                    list(faz)
+
+                self.eq(faz, await hive.open(('foo', 'bar', 'faz')))
+                self.eq(30, faz.get('deep').valu)
+
+                self.eq([('baz', 10, 0), ('faz', 20, 1)], hive.dir(('foo', 'bar')))
+
+                self.eq(20, await hive.set(('foo', 'bar', 'faz'), 21))
+                self.eq(21, await hive.get(('foo', 'bar', 'faz')))
+
+                tree = await hive.saveHiveTree(('foo',))
+                self.eq(30, tree['kids']['bar']['kids']['faz']['kids']['deep']['value'])
+
+                # popping a path which was never opened removes the subtree
+                self.eq('hoho', await hive.pop(('hehe', 'haha')))
+                self.none(await hive.pop(('hehe', 'haha')))
+
+                self.eq(21, await hive.pop(('foo', 'bar', 'faz')))
+                self.eq(('hive:set', 'hive:pop'), tuple(m[0] for m in edits))
+
+            async with self.getTestHiveFromDirn(dirn) as hive:
+                self.none(await hive.get(('hehe', 'haha')))
+                self.none(await hive.get(('foo', 'bar', 'faz', 'deep')))
+                self.eq([('baz', 10, 0)], hive.dir(('foo', 'bar')))
+                self.eq('hehe', await hive.get(('foo', 'bara')))
+
     async def test_hive_pop(self):
 
         async with self.getTestHive() as hive:
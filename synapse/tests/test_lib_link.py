@@ -112,3 +112,124 @@ class LinkTest(s_test.SynTest):
         await coro
 
         self.eq(b'asdfqwer', byts)
+
+    async def test_link_rx_buffer(self):
+
+        evnt = asyncio.Event()
+        byts = s_common.buid() * 200000
+
+        async def onlink(link):
+
+            # messages larger than the receive buffer
+            await link.tx(('big', byts))
+
+            # more data than the receive buffer holds while the reader waits
+            for i in range(1000):
+                await link.tx(('item', {'i': i, 'byts': byts[:10000]}))
+
+            await link.tx(('fini', {}))
+            await evnt.wait()
+            await link.fini()
+
+        serv = await s_link.listen('127.0.0.1', 0, onlink)
+        host, port = serv.sockets[0].getsockname()
+
+        link = await s_link.connect(host, port)
+
+        mesg = await link.rx()
+        self.eq(mesg, ('big', byts))
+
+        await asyncio.sleep(0.1)
+        self.true(link.proto.paused)
+
+        for i in range(1000):
+            mesg = await link.rx()
+            self.eq(mesg[1]['i'], i)
+            self.len(10000, mesg[1]['byts'])
+
+        self.eq(('fini', {}), await link.rx())
+        self.false(link.proto.paused)
+        self.eq(link.proto.size(), 0)
+
+        evnt.set()
+        self.none(await link.rx())
+        self.true(link.isfini)
+
+        serv.close()
+
+    async def test_link_zlib(self):
+
+        evnt = asyncio.Event()
+        item = {'form': 'inet:ipv4', 'props': {'asn': 10, 'loc': 'us'}, 'pad': 'x' * 1000}
+
+        async def onlink(link):
+            link.setZlib(level=6, size=1000)
+
+            for i in range(100):
+                await link.tx(('item', item))
+
+            # small messages are sent uncompressed
+            await link.tx(('fini', {}))
+            await evnt.wait()
+            await link.fini()
+
+        serv = await s_link.listen('127.0.0.1', 0, onlink)
+        host, port = serv.sockets[0].getsockname()
+
+        link = await s_link.connect(host, port)
+        link.allowZlib()
+
+        for i in range(100):
+            self.eq(('item', item), await link.rx())
+
+        self.eq(('fini', {}), await link.rx())
+
+        info = link.getZlibInfo()
+        self.false(info['enabled'])
+        self.eq(100, info['rx']['mesgs'])
+        self.gt(info['rx']['ratio'], 10)
+        self.eq(info['tx']['mesgs'], 0)
+        self.none(info['tx']['ratio'])
+
+        evnt.set()
+        self.none(await link.rx())
+
+        serv.close()
+
+    async def test_link_zlib_refused(self):
+
+        item = ('item', {'pad': 'x' * 10000})
+
+        async def onlink(link):
+            link.setZlib(level=6)
+            await link.tx(item)
+            await link.waitfini(5)
+
+        serv = await s_link.listen('127.0.0.1', 0, onlink)
+        host, port = serv.sockets[0].getsockname()
+
+        # compressed frames are refused unless zlib was agreed for the link
+        link = await s_link.connect(host, port)
+        with self.getAsyncLoggerStream('synapse.lib.link', 'zlib was agreed') as stream:
+            self.none(await link.rx())
+            self.true(await stream.wait(1))
+        self.true(link.isfini)
+
+        # frames which decompress beyond the maximum size close the link
+        link = await s_link.connect(host, port)
+        link.allowZlib()
+        link.zmax = 1000
+        with self.getAsyncLoggerStream('synapse.lib.link', 'exceeds the maximum size') as stream:
+            self.none(await link.rx())
+            self.true(await stream.wait(1))
+        self.true(link.isfini)
+
+        # a link which allows zlib begins compressing once the peer replies
+        link = await s_link.connect(host, port)
+        link.allowZlib(level=6)
+        self.false(link.getZlibInfo()['enabled'])
+        self.eq(item, await link.rx())
+        self.true(link.getZlibInfo()['enabled'])
+        await link.fini()
+
+        serv.close()
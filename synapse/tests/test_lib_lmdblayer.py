@@ -1,3 +1,5 @@
+import asyncio
+
 import synapse.tests.utils as s_test
 
 class LmdbLayerTest(s_test.SynTest):
@@ -11,3 +13,37 @@ class LmdbLayerTest(s_test.SynTest):
             self.eq(b'\x00\x00\x00\x00\x00\x00\x00\x01', layr.getNameAbrv('whip'))
             self.eq('visi', layr.getAbrvName(b'\x00\x00\x00\x00\x00\x00\x00\x00'))
             self.eq('whip', layr.getAbrvName(b'\x00\x00\x00\x00\x00\x00\x00\x01'))
+
+    async def test_lib_lmdblayer_syncsplices(self):
+
+        async with self.getTestCore() as core:
+
+            layr = core.view.layers[0]
+
+            offs = layr.splicelog.index()
+            await layr.stor((), splices=[('test:splice', {'i': 0})])
+
+            genr = layr.syncSplices(offs)
+
+            indx, mesg = await genr.__anext__()
+            self.eq(indx, offs)
+            self.eq(mesg, ('test:splice', {'i': 0}))
+
+            # a burst well past the old in-memory window size does not drop a slow subscriber
+            await layr.stor((), splices=[('test:splice', {'i': i}) for i in range(1, 15000)])
+
+            for i in range(1, 15000):
+                indx, mesg = await genr.__anext__()
+                self.eq(indx, offs + i)
+                self.eq(mesg[1]['i'], i)
+
+            # once caught up it follows the log live
+            task = asyncio.ensure_future(genr.__anext__())
+            await asyncio.sleep(0.01)
+            self.false(task.done())
+
+            await layr.stor((), splices=[('test:splice', {'i': 15000})])
+            indx, mesg = await asyncio.wait_for(task, timeout=2)
+            self.eq(indx, offs + 15000)
+
+            await genr.aclose()
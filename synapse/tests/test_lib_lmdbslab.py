@@ -47,6 +47,9 @@ class LmdbSlabTest(s_t_utils.SynTest):
 
             self.eq(b'hehe', slab.get(b'\x00\x01', db=foo))
 
+            self.eq(slab.getmulti((b'\x00\x03', b'\x00\x09', b'\x00\x01'), db=foo), [b'hoho', None, b'hehe'])
+            self.eq(slab.getmulti((), db=foo), [])
+
             items = list(slab.scanByPref(b'\x00', db=foo))
             self.eq(items, ((b'\x00\x01', b'hehe'), (b'\x00\x02', b'haha'), (b'\x00\x03', b'hoho')))
 
@@ -1,3 +1,7 @@
+import os
+import glob
+from unittest import mock
+
 import synapse.lib.scrape as s_scrape
 
 import synapse.tests.utils as s_t_utils
@@ -43,3 +47,63 @@ class ScrapeTest(s_t_utils.SynTest):
         nodes.remove(('inet:email', 'BOB@WOOT.COM'))
         nodes.remove(('inet:email', 'visi@vertex.link'))
         self.len(0, nodes)
+
+    def test_scrape_cache(self):
+
+        with self.getTestSynDir() as dirn, mock.patch.object(s_scrape, '_regexes', {}):
+
+            regx = s_scrape.getRegex('inet:fqdn')
+            self.eq(regx, s_scrape.getRegex('inet:fqdn'))
+            self.none(s_scrape.getRegex('newp:newp'))
+
+            paths = glob.glob(os.path.join(dirn, 'cache', 'regex', '*.mpk'))
+            self.len(1, paths)
+
+            # the compiled regex is loaded from the cache file
+            s_scrape._regexes.clear()
+            with mock.patch('regex.compile', side_effect=Exception('newp')):
+                regx = s_scrape.getRegex('inet:fqdn')
+                self.eq(regx.findall(' vertex.link '), ['vertex.link'])
+
+            # cached args which do not match their hash are not compiled
+            with open(paths[0], 'rb') as fd:
+                byts = fd.read()
+
+            with open(paths[0], 'wb') as fd:
+                fd.write(byts[:-1] + bytes((byts[-1] ^ 1,)))
+
+            s_scrape._regexes.clear()
+            with self.getLoggerStream('synapse.lib.scrape', 'Ignoring invalid regex cache file') as stream:
+                regx = s_scrape.getRegex('inet:fqdn')
+                self.true(stream.wait(1))
+
+            self.eq(regx.findall(' vertex.link '), ['vertex.link'])
+            with open(paths[0], 'rb') as fd:
+                self.eq(byts, fd.read())
+
+            # invalid cache files are replaced
+            with open(paths[0], 'wb') as fd:
+                fd.write(b'newp')
+
+            s_scrape._regexes.clear()
+            with self.getLoggerStream('synapse.lib.scrape', 'regex cache') as stream:
+                regx = s_scrape.getRegex('inet:fqdn')
+                self.true(stream.wait(1))
+
+            self.eq(regx.findall(' vertex.link '), ['vertex.link'])
+            self.eq(regx, s_scrape.regexes.get('inet:fqdn'))
+
+            self.isin('vertex.link', s_scrape.fqdn_re.findall('visi@vertex.link'))
+            self.isin('link', s_scrape.tldlist)
+            self.isin('|link|', s_scrape.tldcat)
+            self.len(len(s_scrape.rules), s_scrape.scrape_types)
+
+            with self.raises(AttributeError):
+                s_scrape.newp
+
+            # an unusable synapse directory does not prevent scraping
+            s_scrape._regexes.clear()
+            with mock.patch('synapse.common.getSynPath', side_effect=PermissionError('newp')):
+                with self.getLoggerStream('synapse.lib.scrape', 'regex cache') as stream:
+                    self.eq(list(s_scrape.scrape(' vertex.link ', ptype='inet:fqdn')), [('inet:fqdn', 'vertex.link')])
+                    self.true(stream.wait(1))
@@ -1,8 +1,12 @@
 import asyncio
 
+from unittest import mock
+
 import synapse.exc as s_exc
 import synapse.common as s_common
 
+import synapse.lib.storm as s_storm
+
 import synapse.tests.utils as s_t_utils
 from synapse.tests.utils import alist
 
@@ -504,3 +508,57 @@ class StormTest(s_t_utils.SynTest):
             # Sad path
             q = 'inet:ipv4=1.2.3.4 | tee'
             await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
+
+            # Parallel execution keeps the query order by default
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --join { -> * } { <- * } { -> edge:refs:n2 :n1 -> * }'
+            nodes = await core.nodes(q)
+            self.len(4, nodes)
+            self.eq(nodes[0].ndef, ('inet:asn', 0))
+            self.eq(nodes[1].ndef[0], ('inet:dns:a'))
+            self.eq(nodes[2].ndef[0], ('media:news'))
+            self.eq(nodes[3].ndef, ('inet:ipv4', 0x01020304))
+
+            # A slow first query does not hold back results when unordered
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --unordered { sleep 0.2 | max .created | -> * } { <- * }'
+            nodes = await core.nodes(q)
+            self.len(2, nodes)
+            self.eq(nodes[0].ndef[0], ('inet:dns:a'))
+            self.eq(nodes[1].ndef, ('inet:asn', 0))
+
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --concurrency 1 { sleep 0.2 | max .created | -> * } { <- * }'
+            nodes = await core.nodes(q)
+            self.len(2, nodes)
+            self.eq(nodes[0].ndef, ('inet:asn', 0))
+            self.eq(nodes[1].ndef[0], ('inet:dns:a'))
+
+            # later queries wait on their bounded buffers while an earlier query runs
+            await core.nodes('[ test:int=1001 test:int=1002 test:int=1003 test:int=1004 ]')
+            with mock.patch.object(s_storm.TeeCmd, 'qsize', 1):
+                for conc in (1, 3):
+                    q = 'inet:ipv4=1.2.3.4 | tee --parallel --concurrency %d { sleep 0.1 | max .created | -> inet:asn } { test:int>1000 } { <- * }' % conc
+                    nodes = await core.nodes(q)
+                    self.len(7, nodes)
+                    self.eq(nodes[0].ndef, ('inet:asn', 0))
+                    self.eq(nodes[1].ndef, ('inet:ipv4', 0x01020304))
+                    self.eq([n.ndef[1] for n in nodes[2:6]], [1001, 1002, 1003, 1004])
+                    self.eq(nodes[6].ndef[0], ('inet:dns:a'))
+
+            # vars set by the queries are merged back in query order
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --join { $x=1 $y=1 | spin } { $y=2 | spin } | [ :loc=$lib.str.concat($x, $y) ]'
+            nodes = await core.nodes(q)
+            self.len(1, nodes)
+            self.eq(nodes[0].get('loc'), '12')
+
+            # concurrent tag edits on the same node are serialized
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel { [ +#foo=2015 ] } { [ +#foo=2018 ] } { [ +#foo.bar ] }'
+            await core.nodes(q)
+            nodes = await core.nodes('inet:ipv4=1.2.3.4')
+            self.eq(nodes[0].getTag('foo'), (1420070400000, 1514764800001))
+            self.nn(nodes[0].getTag('foo.bar'))
+
+            # errors in any query are raised
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel { -> * } { [ :asn=newp ] }'
+            await self.asyncraises(s_exc.BadPropValu, core.nodes(q))
+
+            q = 'inet:ipv4=1.2.3.4 | tee --parallel --concurrency 0 { -> * }'
+            await self.asyncraises(s_exc.StormRuntimeError, core.nodes(q))
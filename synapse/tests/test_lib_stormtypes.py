@@ -735,6 +735,26 @@ class StormTypesTest(s_test.SynTest):
             byts = b''.join([b async for b in core.axon.get(bkey)])
             self.eq(b'asdfasdf', byts)
 
+            opts = {'vars': {'sha256': '2413fb3709b05939f04cf2e92f7d0897fc2596f9ad0b8a9ea855c7bfebaae892'}}
+            text = '($size, $sha2) = $lib.bytes.put($lib.bytes.read($sha256, 2, 4)) [ test:int=$size test:str=$sha2 ]'
+
+            nodes = await core.nodes(text, opts=opts)
+            self.len(2, nodes)
+            self.eq(nodes[0].ndef, ('test:int', 4))
+            self.eq(nodes[1].ndef, ('test:str', 'd2fd3930d274b202fe8e7cb431e38a8b64ec396e15f5717e60493234b0de210a'))
+
+            with self.raises(s_exc.BadArg):
+                await core.nodes('$lib.bytes.read($sha256, 0, 999999999)', opts=opts)
+
+            visi = await core.auth.addUser('visi')
+
+            text = '$lib.print($lib.bytes.read($sha256, 0, 4))'
+            await self.agenraises(s_exc.AuthDeny, core.eval(text, opts=opts, user=visi))
+
+            await visi.addRule((True, ('axon', 'get')))
+            msgs = await alist(core.streamstorm(text, opts=opts, user=visi))
+            self.stormIsInPrint("b'asdf'", msgs)
+
     async def test_storm_lib_base64(self):
 
         async with self.getTestCore() as core:
@@ -75,6 +75,48 @@ class Foo:
         yield 20
         raise s_exc.SynErr(mesg='derp')
 
+    def genrmany(self, n):
+        for i in range(n):
+            yield {'i': i, 'pad': 'x' * 100}
+
+    async def corogenrmany(self, n, boom=False):
+        for i in range(n):
+            yield {'i': i, 'pad': 'x' * 100}
+        if boom:
+            raise s_exc.SynErr(mesg='derp')
+
+    async def corogenrcount(self, n):
+        self.produced = 0
+        for i in range(n):
+            self.produced += 1
+            yield i
+
+    def genrcount(self, n):
+        self.produced = 0
+        for i in range(n):
+            self.produced += 1
+            yield i
+
+    async def sleepecho(self, x, delay):
+        await asyncio.sleep(delay)
+        return x
+
+    async def corogenrforever(self):
+        self.genrfini = False
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+                await asyncio.sleep(0.01)
+        finally:
+            self.genrfini = True
+
+    async def corogenrwait(self):
+        yield 'ready'
+        await self.waitevnt.wait()
+        yield 'done'
+
     def raze(self):
         # test that SynErr makes it through
         raise s_exc.NoSuchMeth(name='haha')
@@ -240,6 +282,9 @@ class TeleTest(s_t_utils.SynTest):
             acm = self.getTestCoreAndProxy()
             core, proxy = s_glob.sync(acm.__aenter__())
 
+            # exercise the exclusive pool links used with servers which do not multiplex
+            proxy.mux = False
+
             form = 'test:int'
 
             q = '[' + ' '.join([f'{form}={i}' for i in range(10)]) + ' ]'
@@ -413,6 +458,204 @@ class TeleTest(s_t_utils.SynTest):
 
             await self.asyncraises(s_exc.IsFini, asyncio.wait_for(task, timeout=2))
 
+    async def test_telepath_batch(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            dmon.batchitems = 10
+            dmon.batchbytes = 500
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            url = 'tcp://127.0.0.1/foo'
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+
+                self.true(all(sess.batch for sess in dmon.sessions.values()))
+
+                items = await alist(prox.corogenrmany(105))
+                self.eq([i['i'] for i in items], list(range(105)))
+
+                self.eq([], await alist(prox.corogenrmany(0)))
+
+                genr = await prox.genrmany(55)
+                self.eq([i['i'] for i in await genr.list()], list(range(55)))
+
+                # items yielded before an exception are not lost
+                items = []
+                with self.raises(s_exc.SynErr):
+                    async for item in prox.corogenrmany(15, boom=True):
+                        items.append(item)
+                self.len(15, items)
+
+                # a slow generator does not hold back the items which are ready
+                foo.waitevnt = asyncio.Event()
+
+                aitr = prox.corogenrwait().__aiter__()
+                self.eq('ready', await asyncio.wait_for(aitr.__anext__(), timeout=2))
+                foo.waitevnt.set()
+                self.eq('done', await asyncio.wait_for(aitr.__anext__(), timeout=2))
+                await self.asyncraises(StopAsyncIteration, aitr.__anext__())
+
+                # the link may still be used after an early break
+                async for item in prox.corogenrmany(100):
+                    break
+                self.eq(55, len(await (await prox.genrmany(55)).list()))
+
+            async with await s_telepath.openurl(url, port=addr[1], batch=False) as prox:
+                self.false(all(sess.batch for sess in dmon.sessions.values()))
+                items = await alist(prox.corogenrmany(25))
+                self.eq([i['i'] for i in items], list(range(25)))
+
+    async def test_telepath_zlib(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            url = 'tcp://127.0.0.1/foo?zlib=6'
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+
+                self.eq(6, prox.zlib)
+                self.true(all(sess.zlib == 6 for sess in dmon.sessions.values()))
+
+                items = await alist(prox.corogenrmany(1000))
+                self.eq([i['i'] for i in items], list(range(1000)))
+
+                self.eq(30, await prox.bar(10, 20))
+                self.eq('x' * 10000, await prox.echo('x' * 10000))
+
+                infos = prox._getZlibInfo()
+                self.true(all(info['enabled'] for iden, info in infos))
+
+                self.gt(sum(info['rx']['mesgs'] for iden, info in infos), 0)
+                self.gt(sum(info['rx']['size'] for iden, info in infos),
+                        sum(info['rx']['zsize'] for iden, info in infos) * 5)
+
+                # the 10k echo request was compressed
+                self.gt(sum(info['tx']['mesgs'] for iden, info in infos), 0)
+
+            # the server may refuse compression
+            dmon.zlib = False
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+                self.none(prox.zlib)
+                self.eq(30, await prox.bar(10, 20))
+                self.false(any(info['enabled'] for iden, info in prox._getZlibInfo()))
+
+    async def test_telepath_credit(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            dmon.batchitems = 10
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            url = 'tcp://127.0.0.1/foo'
+
+            for batch in (True, False):
+
+                async with await s_telepath.openurl(url, port=addr[1], batch=batch) as prox:
+
+                    prox.credititems = 20
+
+                    for meth in (prox.corogenrcount, prox.genrcount):
+
+                        genr = meth(1000)
+                        if isinstance(genr, s_telepath.GenrIter):
+                            genr = genr.__aiter__()
+                        else:
+                            genr = (await genr).__aiter__()
+
+                        self.eq(0, await genr.__anext__())
+
+                        # the server stops producing once the window is used
+                        await asyncio.sleep(0.05)
+                        self.le(foo.produced, 20)
+
+                        # consuming half the window grants more credit
+                        for i in range(1, 15):
+                            self.eq(i, await genr.__anext__())
+
+                        await asyncio.sleep(0.05)
+                        self.le(foo.produced, 30)
+                        self.gt(foo.produced, 20)
+
+                        items = [i async for i in genr]
+                        self.eq(items, list(range(15, 1000)))
+
+                    # byte credit also limits batched results
+                    prox.credititems = 10000
+                    prox.creditbytes = 100
+
+                    items = await alist(prox.corogenrcount(1000))
+                    self.eq(items, list(range(1000)))
+
+    async def test_telepath_mux(self):
+
+        foo = Foo()
+
+        async with self.getTestDmon() as dmon:
+
+            addr = await dmon.listen('tcp://127.0.0.1:0')
+            dmon.share('foo', foo)
+
+            url = 'tcp://127.0.0.1/foo'
+            async with await s_telepath.openurl(url, port=addr[1]) as prox:
+
+                self.true(prox.mux)
+
+                # many calls are in flight at once on a single link
+                coros = [prox.sleepecho(i, 0.2) for i in range(200)]
+                self.eq(list(range(200)), await asyncio.wait_for(asyncio.gather(*coros), timeout=2))
+                self.len(1, prox.muxlinks)
+                self.len(0, prox.muxlinks[0].calls)
+
+                # generators and calls are interleaved on the link
+                async for item in prox.corogenrmany(3):
+                    self.eq(10, await prox.echo(10))
+
+                # breaking from a generator cancels it on the server
+                async for item in prox.corogenrforever():
+                    if item == 2:
+                        break
+
+                await asyncio.sleep(0.1)
+                self.true(foo.genrfini)
+                self.len(1, prox.muxlinks)
+                self.false(prox.muxlinks[0].link.isfini)
+
+                await self.asyncraises(s_exc.NoSuchMeth, prox.raze())
+
+                # calls beyond the in-flight limit open more links and then wait
+                prox.maxlinks = 2
+                prox.maxinflight = 10
+
+                coros = [prox.sleepecho(i, 0.1) for i in range(50)]
+                self.eq(list(range(50)), await asyncio.wait_for(asyncio.gather(*coros), timeout=5))
+                self.len(2, prox.muxlinks)
+
+                # calls in flight on a link which goes away are not left waiting
+                task = prox.schedCoro(prox.sleepecho(1, 10))
+                await asyncio.sleep(0.05)
+
+                for mux in list(prox.muxlinks):
+                    await mux.link.fini()
+
+                self.none(await asyncio.wait_for(task, timeout=2))
+                self.eq(20, await prox.echo(20))
+
+            async with await s_telepath.openurl(url + '?links=3', port=addr[1], inflight=5) as prox:
+                self.eq(3, prox.maxlinks)
+                self.eq(5, prox.maxinflight)
+
     async def test_telepath_blocking(self):
         ''' Make sure that async methods on the same proxy don't block each other '''
 
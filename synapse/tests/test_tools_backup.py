@@ -1,8 +1,15 @@
 import os
 
+from unittest import mock
+
+import synapse.exc as s_exc
+import synapse.common as s_common
+import synapse.cortex as s_cortex
+
 import synapse.tests.utils as s_t_utils
 
 import synapse.tools.backup as s_backup
+import synapse.tools.restore as s_restore
 
 class BackupTest(s_t_utils.SynTest):
 
@@ -50,3 +57,81 @@ class BackupTest(s_t_utils.SynTest):
 
                 # We expect the data.mdb file to be in the fpset
                 self.isin(f'/layers/{core.iden}/layer.lmdb/data.mdb', fpset)
+
+    async def test_backup_throttled(self):
+
+        async with self.getTestCore() as core:
+
+            await core.nodes('[ inet:ipv4=1.2.3.4 ]')
+            await core.fini()
+
+            with self.getTestDir() as dirn2:
+
+                argv = (core.dirn, dirn2, '--rate', '100', '--parallel', '2')
+                self.eq(0, s_backup.main(argv))
+
+                self.compare_dirs(core.dirn, dirn2, skipfns=['lock.mdb'])
+
+                async with self.getTestCore(dirn=dirn2) as core2:
+                    self.len(1, await core2.nodes('inet:ipv4=1.2.3.4'))
+
+    async def test_backup_incremental(self):
+
+        for conf in ({'layer:lmdb:storlog': True}, {}):
+
+            with self.getTestDir() as dirn:
+
+                coredir = s_common.gendir(dirn, 'core')
+                s_common.yamlsave(conf, coredir, 'cell.yaml')
+                fulldir = os.path.join(dirn, 'full')
+                incr00 = os.path.join(dirn, 'incr00')
+                incr01 = os.path.join(dirn, 'incr01')
+
+                async with self.getTestCore(dirn=coredir) as core:
+                    await core.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 ]')
+
+                self.eq(0, s_backup.main((coredir, fulldir)))
+
+                async with self.getTestCore(dirn=coredir) as core:
+                    await core.nodes('[ inet:fqdn=vertex.link +#foo ]')
+                    await core.nodes('inet:ipv4=5.6.7.8 | delnode')
+
+                self.eq(0, s_backup.main((coredir, incr00, '--incremental', fulldir)))
+
+                async with self.getTestCore(dirn=coredir) as core:
+                    await core.nodes('inet:ipv4=1.2.3.4 [ :asn=10 ]')
+                    counts = dict(core.counts)
+
+                self.eq(0, s_backup.main((coredir, incr01, '--incremental', incr00, '--rate', '100')))
+
+                mode = 'stors' if conf else 'splices'
+                manifest = s_common.yamlload(incr01, s_backup.MANIFEST)
+                self.eq(mode, list(manifest['layers'].values())[0]['mode'])
+
+                # increments must be restored in order
+                outp = self.getTestOutp()
+                with self.raises(s_exc.InconsistentStorage):
+                    await s_restore.main((fulldir, incr01), outp=outp)
+
+                # the restore must not start sync, feed or cron loops from the backup cell.yaml
+                fullconf = s_common.yamlload(fulldir, 'cell.yaml')
+                s_common.yamlsave(dict(fullconf, **{'splice:sync': 'tcp://127.0.0.1:1/', 'cron:enable': True}),
+                                  fulldir, 'cell.yaml')
+
+                confs = []
+                def initPushLoop(self):
+                    confs.append((self.conf.get('splice:sync'), self.conf.get('cron:enable')))
+
+                outp = self.getTestOutp()
+                with mock.patch.object(s_cortex.Cortex, '_initPushLoop', initPushLoop):
+                    self.eq(0, await s_restore.main((fulldir, incr00, incr01), outp=outp))
+                outp.expect('Restored 2 increments')
+                self.eq(confs, [(None, False)])
+
+                s_common.yamlsave(fullconf, fulldir, 'cell.yaml')
+
+                async with self.getTestCore(dirn=fulldir) as core:
+                    self.len(1, await core.nodes('inet:ipv4=1.2.3.4 +:asn=10'))
+                    self.len(0, await core.nodes('inet:ipv4=5.6.7.8'))
+                    self.len(1, await core.nodes('inet:fqdn=vertex.link +#foo'))
+                    self.eq(counts, core.counts)
@@ -0,0 +1,52 @@
+import os
+import hashlib
+
+import synapse.axon as s_axon
+
+import synapse.tests.utils as s_t_utils
+import synapse.tools.blobmove as s_blobmove
+
+class BlobMoveTest(s_t_utils.SynTest):
+
+    async def test_tools_blobmove(self):
+
+        bufs = (b'visi', b'', b'x' * (s_axon.CHUNK_SIZE + 10))
+
+        with self.getTestDir() as dirn:
+
+            async with await s_axon.Axon.anit(dirn) as axon:
+                retn = await axon.puts(bufs)
+
+            outp = self.getTestOutp()
+            self.eq(0, await s_blobmove.main((dirn, 'files', '--delete'), outp=outp))
+            outp.expect('Moved 3 blobs to files')
+
+            self.false(os.path.isdir(os.path.join(dirn, 'blob.lmdb')))
+
+            async with await s_axon.Axon.anit(dirn) as axon:
+
+                self.eq('files', axon.conf.get('blobstor'))
+                self.isinstance(axon.blobstor, s_axon.FileBlobStor)
+
+                for byts, (size, sha256) in zip(bufs, retn):
+                    self.eq(byts, b''.join([b async for b in axon.get(sha256)]))
+
+                self.eq(b'xxx', b''.join([b async for b in axon.read(retn[2][1], s_axon.CHUNK_SIZE, 3)]))
+
+            outp = self.getTestOutp()
+            self.eq(0, await s_blobmove.main((dirn, 'files'), outp=outp))
+            outp.expect('Axon already uses the files blobstor.')
+
+            # and back again
+            outp = self.getTestOutp()
+            self.eq(0, await s_blobmove.main((dirn, 'lmdb'), outp=outp))
+            outp.expect('Moved 3 blobs to lmdb')
+
+            async with await s_axon.Axon.anit(dirn) as axon:
+
+                self.isinstance(axon.blobstor, s_axon.LmdbBlobStor)
+
+                for byts, (size, sha256) in zip(bufs, retn):
+                    self.eq(byts, b''.join([b async for b in axon.get(sha256)]))
+
+                self.eq(b'xxx', b''.join([b async for b in axon.read(retn[2][1], s_axon.CHUNK_SIZE, 3)]))
@@ -0,0 +1,60 @@
+import os
+
+import synapse.exc as s_exc
+import synapse.cortex as s_cortex
+import synapse.common as s_common
+
+import synapse.tests.utils as s_t_utils
+import synapse.tools.layerdump as s_layerdump
+
+class LayerDumpTest(s_t_utils.SynTest):
+
+    async def test_tools_layerdump(self):
+
+        with self.getTestDir() as dirn:
+
+            path00 = s_common.gendir(dirn, 'core00')
+            path01 = s_common.gendir(dirn, 'core01')
+            dumpdir = os.path.join(dirn, 'dump')
+
+            async with await s_cortex.Cortex.anit(path00) as core00:
+                await core00.addTagProp('score', ('int', {}), {})
+                await core00.nodes('[ inet:ipv4=1.2.3.4 inet:ipv4=5.6.7.8 :asn=10 +#foo.bar:score=20 ]')
+                await core00.nodes('[ inet:fqdn=vertex.link inet:fqdn=woot.com .seen=2019 +#foo ]')
+                nodes = await core00.nodes('inet:fqdn=vertex.link')
+                await nodes[0].setData('hehe', {'haha': 1})
+                counts = dict(core00.counts)
+
+            outp = self.getTestOutp()
+            self.eq(0, await s_layerdump.main(('export', path00, dumpdir), outp=outp))
+            outp.expect('...exported')
+
+            async with await s_cortex.Cortex.anit(path01) as core01:
+                await core01.addTagProp('score', ('int', {}), {})
+
+            outp = self.getTestOutp()
+            self.eq(0, await s_layerdump.main(('load', path01, dumpdir), outp=outp))
+            outp.expect('...imported')
+
+            async with await s_cortex.Cortex.anit(path01) as core01:
+
+                self.eq(counts, core01.counts)
+
+                self.len(2, await core01.nodes('inet:ipv4:asn=10'))
+                self.len(2, await core01.nodes('#foo.bar:score=20'))
+                self.len(2, await core01.nodes('inet:ipv4#foo.bar:score>10'))
+                self.len(2, await core01.nodes('inet:fqdn.seen@=2019'))
+                self.len(4, await core01.nodes('#foo'))
+
+                nodes = await core01.nodes('inet:fqdn=vertex.link')
+                self.eq({'haha': 1}, await nodes[0].getData('hehe'))
+
+                # the layer is still writable with the imported abbreviations
+                await core01.addTagProp('rank', ('int', {}), {})
+                await core01.nodes('inet:ipv4=1.2.3.4 [ +#baz:rank=1 ]')
+                self.len(1, await core01.nodes('#baz:rank=1'))
+                self.len(2, await core01.nodes('#foo.bar:score=20'))
+
+                # loading into a populated layer is refused
+                with self.raises(s_exc.DataAlreadyExists):
+                    await core01.getLayer().importDbs(dumpdir)
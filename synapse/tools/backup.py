@@ -4,16 +4,62 @@ import time
 import shutil
 import logging
 import argparse
+import threading
+import concurrent.futures
 
 import lmdb
 import lmdb.tool
 
+import synapse.exc as s_exc
 import synapse.common as s_common
 
+import synapse.lib.msgpack as s_msgpack
+
 logger = logging.getLogger(__name__)
 
-def backup(srcdir, dstdir):
+# the number of bytes read from an lmdb copy at a time when rate limiting
+COPY_CHUNK_SIZE = 16 * 1024 * 1024
+
+# the name of the manifest file written to incremental backups
+MANIFEST = 'backup.yaml'
+
+class Throttle:
+    '''
+    Limit the combined IO rate of one or more threads to a number of bytes per second.
+    '''
+    def __init__(self, rate):
+        self.rate = rate
+        self.size = 0
+        self.tick = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self, size):
+
+        if self.rate is None:
+            return
+
+        with self.lock:
+            self.size += size
+            delay = self.size / self.rate - (time.monotonic() - self.tick)
+
+        if delay > 0:
+            time.sleep(delay)
+
+def backup(srcdir, dstdir, rate=None, parallel=4):
+    '''
+    Make a full backup of a ( potentially running ) cell directory.
+
+    Args:
+        srcdir (str): The cell directory to backup.
+        dstdir (str): The backup target directory.
+        rate (int): An optional IO rate limit in bytes per second for all copies.
+        parallel (int): The number of groups of lmdb environments to copy at once.
 
+    Notes:
+        The lmdb environments within one directory ( such as the splices, layer
+        and nodedata for a layer ) are copied in order with splices.lmdb first,
+        so the splice and storage operation logs never get ahead of the layer.
+    '''
     tick = s_common.now()
 
     srcdir = s_common.reqdir(srcdir)
@@ -22,6 +68,8 @@ def backup(srcdir, dstdir):
     logger.info(f'Starting backup of [{srcdir}]')
     logger.info(f'Destination dir: [{dstdir}]')
 
+    groups = {}
+
     for root, dnames, fnames in os.walk(srcdir, topdown=True):
 
         relpath = os.path.relpath(root, start=srcdir)
@@ -33,7 +81,7 @@ def backup(srcdir, dstdir):
 
             if name.endswith('.lmdb'):
                 dnames.remove(name)
-                backup_lmdb(srcpath, dstpath)
+                groups.setdefault(root, []).append((srcpath, dstpath))
                 continue
 
             logger.info(f'making dir:{dstpath}')
@@ -49,12 +97,23 @@ def backup(srcdir, dstdir):
             logger.info(f'copying: {srcpath} -> {dstpath}')
             shutil.copy(srcpath, dstpath)
 
+    throttle = Throttle(rate)
+
+    def copygroup(paths):
+        paths.sort(key=lambda x: os.path.basename(x[0]) != 'splices.lmdb')
+        for srcpath, dstpath in paths:
+            backup_lmdb(srcpath, dstpath, throttle=throttle)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(parallel, 1)) as pool:
+        # raise any exceptions from the copies
+        [f.result() for f in [pool.submit(copygroup, paths) for paths in groups.values()]]
+
     tock = s_common.now()
 
     logger.info(f'Backup complete. Took [{tock-tick:.2f}] for [{srcdir}]')
     return
 
-def backup_lmdb(envpath, dstdir):
+def backup_lmdb(envpath, dstdir, throttle=None):
 
     datafile = os.path.join(envpath, 'data.mdb')
     stat = os.stat(datafile)
@@ -72,26 +131,244 @@ def backup_lmdb(envpath, dstdir):
         readonly='READ'
     )
 
-    lmdb.tool.ENV = env
     tick = time.time()
 
-    # use the builtin lmdb command
-    ret = lmdb.tool.cmd_copy(opts, args[1:])
-    logger.warning(f'lmdb ret: {ret}')
+    if throttle is None or throttle.rate is None:
+        # copy directly rather than with lmdb.tool.cmd_copy() which uses a global env
+        logger.info(f'Running copy to {dstdir!r}....')
+        s_common.gendir(dstdir)
+        env.copy(dstdir, compact=True)
+
+    else:
+        _copyThrottled(env, dstdir, throttle)
 
     tock = time.time()
     logger.info(f'backup took: {tock-tick:.2f} seconds')
     env.close()
 
+def _copyThrottled(env, dstdir, throttle):
+    '''
+    Compact copy an lmdb environment through a pipe so the copy proceeds at the throttled rate.
+    '''
+    logger.info(f'Running throttled copy to {dstdir!r}....')
+
+    s_common.gendir(dstdir)
+
+    rfd, wfd = os.pipe()
+
+    errs = []
+
+    def copy():
+        try:
+            env.copyfd(wfd, compact=True)
+        except Exception as e:  # pragma: no cover
+            errs.append(e)
+        finally:
+            os.close(wfd)
+
+    thrd = threading.Thread(target=copy, daemon=True)
+    thrd.start()
+
+    with os.fdopen(rfd, 'rb') as fd, open(os.path.join(dstdir, 'data.mdb'), 'wb') as outp:
+
+        while True:
+
+            byts = fd.read(COPY_CHUNK_SIZE)
+            if not byts:
+                break
+
+            outp.write(byts)
+            throttle.wait(len(byts))
+
+    thrd.join()
+
+    if errs:  # pragma: no cover
+        raise errs[0]
+
+def _openLogEnv(path):
+    return lmdb.open(path, subdir=True, max_dbs=128, create=False, readonly=True, lock=True)
+
+def _openLogDb(env, name):
+    try:
+        return env.open_db(name.encode(), create=False)
+    except lmdb.NotFoundError:
+        return None
+
+def _getLogIndx(env, name):
+    '''
+    Return the next offset for a SlabSeqn log in an lmdb environment ( or None if the log does not exist ).
+    '''
+    db = _openLogDb(env, name)
+    if db is None:
+        return None
+
+    with env.begin(db=db) as xact:
+        curs = xact.cursor()
+        if not curs.last():
+            return 0
+        return s_common.int64un(curs.key()) + 1
+
+def _getLayerOffsets(dirn):
+    '''
+    Return a dict of {iden: {'splices': offs, 'stors': offs}} for the layer logs in a cell directory.
+    '''
+    retn = {}
+
+    layrdir = os.path.join(dirn, 'layers')
+    if not os.path.isdir(layrdir):
+        return retn
+
+    for iden in sorted(os.listdir(layrdir)):
+
+        path = os.path.join(layrdir, iden, 'splices.lmdb')
+        if not os.path.isdir(path):
+            continue
+
+        env = _openLogEnv(path)
+        try:
+            retn[iden] = {
+                'splices': _getLogIndx(env, 'splices') or 0,
+                'stors': _getLogIndx(env, 'stors'),
+            }
+        finally:
+            env.close()
+
+    return retn
+
+def _dumpLogRows(env, name, offs, path, throttle):
+    '''
+    Write the (indx, byts) rows from a SlabSeqn log beginning at offs to a msgpack file.
+
+    Returns:
+        (int): The next offset.
+    '''
+    db = _openLogDb(env, name)
+
+    with env.begin(db=db) as xact, open(path, 'wb') as fd:
+
+        if db is None:
+            return offs
+
+        curs = xact.cursor()
+        if not curs.set_range(s_common.int64en(offs)):
+            return offs
+
+        for lkey, byts in curs.iternext():
+            offs = s_common.int64un(lkey) + 1
+            item = s_msgpack.en((offs - 1, byts))
+            fd.write(item)
+            throttle.wait(len(item))
+
+    return offs
+
+def incremental(srcdir, basedir, dstdir, rate=None):
+    '''
+    Make an incremental backup of a ( potentially running ) cortex directory.
+
+    Args:
+        srcdir (str): The cortex directory to backup.
+        basedir (str): The previous full or incremental backup.
+        dstdir (str): The directory for the increment.
+        rate (int): An optional IO rate limit in bytes per second.
+
+    Notes:
+        The increment holds the storage operation log ( for layers with
+        lmdb:storlog enabled ) or the splice log entries for each layer since
+        the previous backup.  Use synapse.tools.restore to replay increments
+        onto the full backup.
+
+        Only layer changes are included.  Changes to the hive ( auth, cron,
+        triggers, queues, etc ) and to node data are not part of increments
+        and require a new full backup.
+
+    Returns:
+        (dict): The increment manifest.
+    '''
+    srcdir = s_common.reqdir(srcdir)
+    basedir = s_common.reqdir(basedir)
+
+    prevs = None
+
+    path = os.path.join(basedir, MANIFEST)
+    if os.path.isfile(path):
+        prevs = s_common.yamlload(path).get('offsets')
+    else:
+        prevs = _getLayerOffsets(basedir)
+
+    dstdir = s_common.gendir(dstdir)
+
+    logger.info(f'Starting incremental backup of [{srcdir}] from [{basedir}]')
+
+    throttle = Throttle(rate)
+
+    info = {
+        'time': s_common.now(),
+        'base': basedir,
+        'layers': {},
+        'offsets': {},
+    }
+
+    for iden, offs in _getLayerOffsets(srcdir).items():
+
+        prev = prevs.get(iden)
+        if prev is None:
+            mesg = f'Layer {iden} is not in the base backup ( make a new full backup ).'
+            raise s_exc.BadArg(mesg=mesg, iden=iden)
+
+        mode = 'splices'
+        if offs.get('stors') is not None and prev.get('stors') is not None:
+            mode = 'stors'
+
+        layrdir = s_common.gendir(dstdir, 'layers', iden)
+
+        env = _openLogEnv(os.path.join(srcdir, 'layers', iden, 'splices.lmdb'))
+
+        try:
+
+            # splices are always included since the storage operations refer to them
+            nexts = {'splices': _dumpLogRows(env, 'splices', prev['splices'], os.path.join(layrdir, 'splices.mpk'), throttle)}
+
+            nexts['stors'] = None
+            if mode == 'stors':
+                nexts['stors'] = _dumpLogRows(env, 'stors', prev['stors'], os.path.join(layrdir, 'stors.mpk'), throttle)
+
+        finally:
+            env.close()
+
+        logger.info(f'layer {iden} ({mode}): {prev} -> {nexts}')
+
+        info['layers'][iden] = {'mode': mode, 'prev': prev}
+        info['offsets'][iden] = nexts
+
+    s_common.yamlsave(info, dstdir, MANIFEST)
+
+    logger.info(f'Incremental backup complete for [{srcdir}]')
+    return info
+
 def main(argv):
     args = parse_args(argv)
-    backup(args.srcdir, args.dstdir)
+
+    rate = None
+    if args.rate is not None:
+        rate = int(args.rate * 1024 * 1024)
+
+    if args.incremental is not None:
+        incremental(args.srcdir, args.incremental, args.dstdir, rate=rate)
+        return 0
+
+    backup(args.srcdir, args.dstdir, rate=rate, parallel=args.parallel)
     return 0
 
 def parse_args(argv):
     parser = argparse.ArgumentParser()
     parser.add_argument('srcdir', help='Path to the synapse directory to backup.')
     parser.add_argument('dstdir', help='Path to the backup target directory.')
+    parser.add_argument('--incremental', default=None, metavar='BASEDIR',
+                        help='Backup the layer logs since the given full or incremental backup.')
+    parser.add_argument('--rate', default=None, type=float,
+                        help='Limit the backup IO rate to the given number of MiB per second.')
+    parser.add_argument('--parallel', default=4, type=int,
+                        help='The number of lmdb environment groups to copy in parallel.')
     args = parser.parse_args(argv)
     return args
 
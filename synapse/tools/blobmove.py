@@ -0,0 +1,96 @@
+import os
+import sys
+import shutil
+import asyncio
+
+import synapse.exc as s_exc
+import synapse.axon as s_axon
+import synapse.common as s_common
+
+import synapse.lib.cmd as s_cmd
+import synapse.lib.output as s_output
+
+# the paths used by each blob storage backend within the axon dir
+blobpaths = {
+    'lmdb': 'blob.lmdb',
+    'files': 'blobs',
+}
+
+async def move(dirn, name, outp=s_output.stdout, delete=False):
+    '''
+    Move the blobs for an ( offline ) Axon to the named blob storage backend.
+
+    Returns:
+        (int): The number of blobs moved.
+    '''
+    if name not in s_axon.blobstors:
+        raise s_exc.BadArg(mesg=f'Invalid blobstor name: {name}', name=name)
+
+    count = 0
+    stored = 0
+
+    async with await s_axon.Axon.anit(dirn) as axon:
+
+        srcname = axon.conf.get('blobstor')
+        if srcname == name:
+            outp.printf(f'Axon already uses the {name} blobstor.')
+            return 0
+
+        outp.printf(f'Moving blobs from {srcname} to {name}')
+
+        async with await axon._openBlobStor(name) as dest:
+
+            for sha256, byts in axon.axonslab.scanByFull(db=axon.sizes):
+
+                size = int.from_bytes(byts, 'big')
+
+                # blobs are saved atomically ( files ) or idempotently ( lmdb )
+                # so an interrupted move may simply be run again.
+                valu, vstored = await dest.save(sha256, axon.blobstor.iterBlob(sha256))
+                if valu != size:
+                    mesg = f'Size mismatch moving {s_common.ehex(sha256)}: {valu} != {size}'
+                    raise s_exc.InconsistentStorage(mesg=mesg)
+
+                stored += vstored
+                count += 1
+                if count % 1000 == 0:
+                    outp.printf(f'...moved {count} blobs')
+
+            await axon.axonmetrics.set('size:stored', stored)
+
+    # only switch the config once every blob has been moved
+    s_common.yamlmod({'blobstor': name}, dirn, 'cell.yaml')
+
+    outp.printf(f'Moved {count} blobs to {name}')
+
+    if delete:
+        path = os.path.join(dirn, blobpaths.get(srcname))
+        outp.printf(f'Removing {path}')
+        shutil.rmtree(path, ignore_errors=True)
+
+    return count
+
+async def main(argv, outp=s_output.stdout):
+
+    pars = makeargparser()
+    try:
+        opts = pars.parse_args(argv)
+    except s_exc.ParserExit as e:  # pragma: no cover
+        return e.get('status')
+
+    await move(opts.axondir, opts.blobstor, outp=outp, delete=opts.delete)
+    return 0
+
+def makeargparser():
+    desc = '''
+    Move the blobs of an Axon ( which must not be running ) between blob storage backends.
+    '''
+    pars = s_cmd.Parser('blobmove', description=desc)
+    pars.add_argument('axondir', help='The Axon directory.')
+    pars.add_argument('blobstor', choices=sorted(s_axon.blobstors), help='The blob storage backend to move to.')
+    pars.add_argument('--delete', default=False, action='store_true',
+                      help='Remove the previous blob storage once all blobs are moved.')
+    return pars
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,94 @@
+import os
+import sys
+import asyncio
+
+import synapse.exc as s_exc
+import synapse.cortex as s_cortex
+import synapse.common as s_common
+
+import synapse.lib.cmd as s_cmd
+import synapse.lib.output as s_output
+import synapse.lib.msgpack as s_msgpack
+
+async def export(coredir, dumpdir, iden=None, outp=s_output.stdout):
+    '''
+    Export a layer of an ( offline ) Cortex to a directory of sorted msgpack streams.
+
+    Returns:
+        (dict): The layer export info.
+    '''
+    async with await s_cortex.Cortex.anit(coredir) as core:
+
+        layr = core.getLayer(iden)
+        if layr is None:
+            raise s_exc.NoSuchLayer(iden=iden)
+
+        outp.printf(f'Exporting layer {layr.iden} to {dumpdir}')
+
+        info = await layr.exportDbs(dumpdir)
+
+        # form counts are kept by the cortex rather than the layer
+        s_msgpack.dumpfile(dict(core.counts), os.path.join(dumpdir, 'formcounts.mpk'))
+
+    for name, count in info['dbs'].items():
+        outp.printf(f'...exported {count} rows from {name}')
+
+    return info
+
+async def load(dumpdir, coredir, iden=None, outp=s_output.stdout):
+    '''
+    Import a layer export into an empty layer of an ( offline ) Cortex.
+
+    Returns:
+        (dict): The layer export info.
+    '''
+    async with await s_cortex.Cortex.anit(coredir) as core:
+
+        layr = core.getLayer(iden)
+        if layr is None:
+            raise s_exc.NoSuchLayer(iden=iden)
+
+        outp.printf(f'Importing {dumpdir} into layer {layr.iden}')
+
+        info = await layr.importDbs(dumpdir)
+
+        path = os.path.join(dumpdir, 'formcounts.mpk')
+        if os.path.isfile(path):
+            for form, valu in s_msgpack.loadfile(path).items():
+                core.pokeFormCount(form, valu)
+
+    for name, count in info['dbs'].items():
+        outp.printf(f'...imported {count} rows into {name}')
+
+    return info
+
+async def main(argv, outp=s_output.stdout):
+
+    pars = makeargparser()
+    try:
+        opts = pars.parse_args(argv)
+    except s_exc.ParserExit as e:  # pragma: no cover
+        return e.get('status')
+
+    if opts.mode == 'export':
+        await export(opts.coredir, opts.dumpdir, iden=opts.layer, outp=outp)
+    else:
+        await load(opts.dumpdir, opts.coredir, iden=opts.layer, outp=outp)
+
+    return 0
+
+def makeargparser():
+    desc = '''
+    Export a Cortex layer to sorted msgpack streams, or bulk load an export into a new Cortex.
+
+    The Cortex must not be running.  Loading requires an empty layer with the same model version.
+    '''
+    pars = s_cmd.Parser('layerdump', description=desc)
+    pars.add_argument('mode', choices=('export', 'load'), help='Export a layer or load an export.')
+    pars.add_argument('coredir', help='The Cortex directory.')
+    pars.add_argument('dumpdir', help='The directory containing the layer export.')
+    pars.add_argument('--layer', default=None, help='The layer iden ( defaults to the main layer ).')
+    return pars
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))
@@ -0,0 +1,181 @@
+import os
+import sys
+import asyncio
+import itertools
+
+import synapse.exc as s_exc
+import synapse.cortex as s_cortex
+import synapse.common as s_common
+
+import synapse.lib.cmd as s_cmd
+import synapse.lib.output as s_output
+import synapse.lib.msgpack as s_msgpack
+import synapse.lib.slabseqn as s_slabseqn
+
+import synapse.tools.backup as s_backup
+
+# the number of splices per addFeedData() call when replaying splices
+SPLICE_CHUNK_SIZE = 1000
+
+# the restored cortex must not sync, feed, archive splices or run cron jobs
+# from the backup cell.yaml while increments are being applied
+RESTORE_CONF = {
+    'feeds': (),
+    'cron:enable': False,
+    'splice:sync': None,
+    'splice:cryotank': None,
+}
+
+def _iterLogRows(path):
+    if not os.path.isfile(path):
+        return
+    for indx, byts in s_msgpack.iterfile(path):
+        yield indx, s_msgpack.un(byts)
+
+def _getRestoreIden(mode):
+    # layer offsets are tracked by iden
+    return s_common.guid(('restore', mode))
+
+async def _getRestoreOffs(layr, mode):
+    offs = await layr.getOffset(_getRestoreIden(mode))
+    if offs:
+        return offs
+
+    # nothing has been restored yet so the layer logs are from the full backup
+    if mode == 'stors':
+        return s_slabseqn.SlabSeqn(layr.spliceslab, 'stors').index()
+
+    return layr.splicelog.index()
+
+async def _restoreStors(core, layr, dirn):
+
+    splices = _iterLogRows(os.path.join(dirn, 'splices.mpk'))
+
+    count = 0
+    for indx, (sops, soffs, scount) in _iterLogRows(os.path.join(dirn, 'stors.mpk')):
+
+        items = []
+        if scount:
+
+            for sindx, splice in splices:
+
+                if sindx < soffs:
+                    continue
+
+                items.append(splice)
+                if len(items) >= scount:
+                    break
+
+        if len(items) != scount:
+            mesg = f'Increment is missing splices for storage operation {indx}.'
+            raise s_exc.InconsistentStorage(mesg=mesg, indx=indx)
+
+        await core._storLayerSops(layr, sops, items)
+
+        count += 1
+        if not count % 1000:
+            await asyncio.sleep(0)
+
+    return count
+
+async def _restoreSplices(core, dirn):
+
+    count = 0
+    splices = (s for _, s in _iterLogRows(os.path.join(dirn, 'splices.mpk')))
+
+    while True:
+
+        items = list(itertools.islice(splices, SPLICE_CHUNK_SIZE))
+        if not items:
+            return count
+
+        await core.addFeedData('syn.splice', items)
+        count += len(items)
+
+async def restore(basedir, incrdirs, outp=s_output.stdout):
+    '''
+    Replay incremental backups in order onto an ( offline ) full backup of a Cortex.
+
+    Args:
+        basedir (str): The full backup directory to restore the increments into.
+        incrdirs (list): The incremental backup directories in the order they were made.
+
+    Notes:
+        Layers with storage operation logs have their sops applied directly.
+        Otherwise the splices are replayed through the feed API, which only
+        applies to the main layer.
+
+        The Cortex is opened with cron, feeds and splice sync disabled so
+        that only the increments modify the layers.
+
+    Returns:
+        (int): The number of increments restored.
+    '''
+    async with await s_cortex.Cortex.anit(basedir, conf=dict(RESTORE_CONF)) as core:
+
+        for incrdir in incrdirs:
+
+            info = s_common.yamlload(incrdir, s_backup.MANIFEST)
+            if info is None:
+                raise s_exc.NoSuchFile(name=os.path.join(incrdir, s_backup.MANIFEST))
+
+            outp.printf(f'Restoring increment {incrdir}')
+
+            for iden, linfo in info['layers'].items():
+
+                layr = core.getLayer(iden)
+                if layr is None:
+                    raise s_exc.NoSuchLayer(iden=iden)
+
+                mode = linfo['mode']
+
+                if mode == 'splices' and layr is not core.getLayer():
+                    outp.printf(f'...skipping layer {iden} ( splices may only be replayed to the main layer )')
+                    continue
+
+                offs = await _getRestoreOffs(layr, mode)
+                prev = linfo['prev'][mode]
+
+                if offs != prev:
+                    mesg = f'Increment {incrdir} begins at {mode} offset {prev} but layer {iden} is at {offs}' \
+                           ' ( increments must be restored in order ).'
+                    raise s_exc.InconsistentStorage(mesg=mesg, iden=iden)
+
+                dirn = os.path.join(incrdir, 'layers', iden)
+
+                if mode == 'stors':
+                    count = await _restoreStors(core, layr, dirn)
+                else:
+                    count = await _restoreSplices(core, dirn)
+
+                await layr.setOffset(_getRestoreIden(mode), info['offsets'][iden][mode])
+
+                outp.printf(f'...restored {count} {mode} to layer {iden}')
+
+    return len(incrdirs)
+
+async def main(argv, outp=s_output.stdout):
+
+    pars = makeargparser()
+    try:
+        opts = pars.parse_args(argv)
+    except s_exc.ParserExit as e:  # pragma: no cover
+        return e.get('status')
+
+    count = await restore(opts.basedir, opts.incrdirs, outp=outp)
+    outp.printf(f'Restored {count} increments')
+    return 0
+
+def makeargparser():
+    desc = '''
+    Restore incremental backups ( from synapse.tools.backup --incremental ) onto a full backup of a Cortex.
+
+    The Cortex in the full backup directory must not be running.
+    '''
+    pars = s_cmd.Parser('restore', description=desc)
+    pars.add_argument('basedir', help='The full backup directory.')
+    pars.add_argument('incrdirs', nargs='+', help='The incremental backup directories in order.')
+    return pars
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(asyncio.run(main(sys.argv[1:])))